@@ -5,6 +5,10 @@ from guardian.admin import GuardedModelAdmin
 from guardian.shortcuts import get_users_with_perms
 from .models import Article, ArticleUserObjectPermission, ArticleGroupObjectPermission
 from utils.permission_manager import ArticlePermissionManager
+from utils.cache import invalidate_article_caches
+from utils.search_index import get_search_index
+from utils.search_suggest import get_search_suggester
+from utils.trending import get_trending_engine
 
 User = get_user_model()
 
@@ -59,7 +63,12 @@ class ArticleAdmin(GuardedModelAdmin):
         """
         批量发布文章
         """
+        articles = list(queryset.only("pk", "author_id"))
         updated = queryset.update(status=Article.Status.PUBLISHED)
+        # 批量 update 不会触发信号，手动使缓存失效并更新搜索索引和搜索建议
+        invalidate_article_caches(*articles)
+        get_search_index().index_articles(article.pk for article in articles)
+        get_search_suggester().invalidate()
         self.message_user(request, f"成功发布 {updated} 篇文章")
 
     make_published.short_description = "发布选中的文章"
@@ -68,7 +77,13 @@ class ArticleAdmin(GuardedModelAdmin):
         """
         批量设为草稿
         """
+        articles = list(queryset.only("pk", "author_id"))
         updated = queryset.update(status=Article.Status.DRAFT)
+        # 批量 update 不会触发信号，手动使缓存失效，更新搜索索引和搜索建议，并移出热门列表
+        invalidate_article_caches(*articles)
+        get_search_index().index_articles(article.pk for article in articles)
+        get_search_suggester().invalidate()
+        get_trending_engine().remove(*(article.pk for article in articles))
         self.message_user(request, f"成功将 {updated} 篇文章设为草稿")
 
     make_draft.short_description = "将选中的文章设为草稿"
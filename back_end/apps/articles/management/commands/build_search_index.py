@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.search_backends import SEARCH_BACKENDS, get_native_backend, reset_search_backend, select_search_backend
+
+
+class Command(BaseCommand):
+    """
+    重建并校验文章搜索索引
+
+    用法:
+        python manage.py build_search_index                    # 重建当前数据库的原生全文索引和自建倒排索引
+        python manage.py build_search_index --backend fts5     # 只重建指定后端的索引
+        python manage.py build_search_index --verify-only      # 只校验，不重建
+    """
+
+    help = "重建并校验文章搜索索引（SQLite FTS5 / MySQL FULLTEXT / 自建倒排索引）"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backend",
+            choices=sorted(SEARCH_BACKENDS),
+            help="只处理指定的搜索后端，默认处理当前数据库的原生全文索引和自建倒排索引",
+        )
+        parser.add_argument(
+            "--verify-only",
+            action="store_true",
+            help="只校验索引，不重建",
+        )
+
+    def get_backends(self, name):
+        if name:
+            backend = select_search_backend(name)
+            if not backend.is_supported():
+                raise CommandError(f"当前数据库不支持搜索后端 {name}")
+            return [backend]
+        backends = []
+        native = get_native_backend()
+        if native is not None and native.is_supported():
+            backends.append(native)
+        # 相关度排序依赖自建倒排索引，始终需要维护
+        backends.append(select_search_backend("index"))
+        return backends
+
+    def handle(self, *args, **options):
+        problems = []
+        for backend in self.get_backends(options["backend"]):
+            if not options["verify_only"]:
+                indexed = backend.build_index()
+                self.stdout.write(f"[{backend.name}] 已重建索引，共 {indexed} 篇文章")
+
+            backend_problems = backend.verify_index()
+            for problem in backend_problems:
+                self.stderr.write(f"[{backend.name}] {problem}")
+            if not backend_problems:
+                self.stdout.write(self.style.SUCCESS(f"[{backend.name}] 索引校验通过"))
+            problems.extend(backend_problems)
+
+        # 索引安装后重新选择 auto 对应的后端
+        reset_search_backend()
+        if problems:
+            raise CommandError(f"搜索索引校验失败，共 {len(problems)} 个问题")
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from utils.view_counter import get_view_count_buffer
+
+
+class Command(BaseCommand):
+    """
+    把缓冲的文章访问计数写回数据库
+
+    用法:
+        python manage.py flush_view_counts            # 刷新一次
+        python manage.py flush_view_counts --loop     # 按间隔持续刷新
+    """
+
+    help = "把 Redis/进程内缓冲的文章访问计数批量写回数据库"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="持续运行，按 --interval 间隔刷新",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=10,
+            help="持续运行时的刷新间隔（秒），默认10",
+        )
+
+    def handle(self, *args, **options):
+        buffer = get_view_count_buffer()
+
+        if not options["loop"]:
+            flushed = buffer.flush()
+            self.stdout.write(self.style.SUCCESS(f"已写回 {flushed} 次访问"))
+            return
+
+        self.stdout.write(f"开始按 {options['interval']} 秒间隔写回访问计数，Ctrl+C 退出")
+        try:
+            while True:
+                flushed = buffer.flush()
+                if flushed:
+                    self.stdout.write(f"已写回 {flushed} 次访问")
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            flushed = buffer.flush()
+            self.stdout.write(self.style.SUCCESS(f"退出前写回 {flushed} 次访问"))
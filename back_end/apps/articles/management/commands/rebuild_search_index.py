@@ -0,0 +1,157 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.articles.models import Article
+from utils.cache import ARTICLE_SCOPE_PUBLISHED, CacheGeneration
+from utils.search_index import count_terms, get_search_index
+
+# 检查点保留时间（秒）
+CHECKPOINT_TIMEOUT = 7 * 24 * 3600
+
+
+def get_checkpoint_key() -> str:
+    """获取重建检查点的缓存键"""
+    return f"{settings.CACHE_KEY_PREFIX}:search:rebuild:checkpoint"
+
+
+class Command(BaseCommand):
+    """
+    多进程重建自建倒排索引（SearchPosting / SearchDocument）
+
+    按主键顺序分块读取已发布文章（每块一次 pk > 上一块末尾的范围查询），
+    分词在子进程中并行完成，主进程按主键顺序逐块用 bulk_create 写入。
+    重建期间不清空已有索引，每块在一个事务中替换该主键范围内的索引，搜索不受影响；
+    每块写入后记录检查点，中断后用 --resume 从检查点继续
+
+    用法:
+        python manage.py rebuild_search_index                            # 使用全部 CPU 重建
+        python manage.py rebuild_search_index --workers 8 --chunk-size 2000
+        python manage.py rebuild_search_index --resume                   # 从上次中断处继续
+        python manage.py rebuild_search_index --start-after 500000       # 从指定文章ID之后开始
+    """
+
+    help = "多进程重建文章的自建倒排索引，支持中断后继续"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="每块的文章数，默认1000",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="分词进程数，默认为 CPU 核数；1 表示在当前进程中分词",
+        )
+        start = parser.add_mutually_exclusive_group()
+        start.add_argument(
+            "--resume",
+            action="store_true",
+            help="从上次中断时的检查点继续",
+        )
+        start.add_argument(
+            "--start-after",
+            type=int,
+            default=0,
+            help="只重建ID大于该值的文章",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        workers = options["workers"]
+        if chunk_size < 1 or workers < 1:
+            raise CommandError("--chunk-size 和 --workers 必须大于0")
+
+        after_id, indexed = options["start_after"], 0
+        if options["resume"]:
+            checkpoint = cache.get(get_checkpoint_key())
+            if checkpoint is None:
+                self.stdout.write(self.style.WARNING("没有找到检查点，从头开始重建"))
+            else:
+                after_id, indexed = checkpoint["last_id"], checkpoint["indexed"]
+                self.stdout.write(f"从文章ID {after_id} 之后继续，之前已索引 {indexed} 篇")
+
+        published = Article.objects.filter(status=Article.Status.PUBLISHED)
+        total = indexed + published.filter(pk__gt=after_id).count()
+        self.stdout.write(f"开始重建：{total} 篇已发布文章，{workers} 个分词进程，每块 {chunk_size} 篇")
+
+        index = get_search_index()
+        started = time.monotonic()
+        written = 0
+        for last_id, counted in self.count_chunks(self.read_chunks(after_id, chunk_size), workers):
+            written += index.replace_range(after_id, last_id, counted)
+            after_id = last_id
+            cache.set(
+                get_checkpoint_key(),
+                {"last_id": after_id, "indexed": indexed + written},
+                timeout=CHECKPOINT_TIMEOUT,
+            )
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"已索引 {indexed + written}/{total} 篇，{written / max(elapsed, 1e-6):.0f} 篇/秒，"
+                f"最后的文章ID {after_id}"
+            )
+
+        # 最后一块之后的范围内只剩草稿或已删除文章的旧索引
+        index.replace_range(after_id, None, [])
+        cache.delete(get_checkpoint_key())
+        # 文档统计变化后重新计算相关度和搜索缓存
+        CacheGeneration.bump(ARTICLE_SCOPE_PUBLISHED)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"重建完成：本次索引 {written} 篇，耗时 {elapsed:.1f} 秒，{written / max(elapsed, 1e-6):.0f} 篇/秒"
+        ))
+
+    def read_chunks(self, after_id, chunk_size):
+        """
+        按主键顺序分块读取已发布文章
+
+        每块是一次独立的范围查询（不保持游标），块之间可以写入索引
+
+        Yields:
+            list: (文章ID, 标题, 内容) 列表
+        """
+        published = Article.objects.filter(status=Article.Status.PUBLISHED).order_by("pk")
+        while True:
+            rows = list(published.filter(pk__gt=after_id).values_list("pk", "title", "content")[:chunk_size])
+            if not rows:
+                return
+            yield rows
+            after_id = rows[-1][0]
+
+    def count_chunks(self, chunks, workers):
+        """
+        并行计算每块文章的词频，按读取顺序返回
+
+        同时提交的块数限制为进程数的两倍，内存占用与文章总数无关
+
+        Yields:
+            tuple: (块中最后的文章ID, count_terms 的结果)
+        """
+        if workers == 1:
+            for rows in chunks:
+                yield rows[-1][0], count_terms(rows)
+            return
+
+        # spawn 启动的子进程不继承数据库连接
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            pending = deque()
+            for rows in chunks:
+                pending.append((rows[-1][0], executor.submit(count_terms, rows)))
+                if len(pending) >= workers * 2:
+                    last_id, future = pending.popleft()
+                    yield last_id, future.result()
+            while pending:
+                last_id, future = pending.popleft()
+                yield last_id, future.result()
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:28
+
+import math
+import re
+
+from django.db import migrations, models
+
+# utils.text_stats 在本迁移创建时的规则副本：迁移不依赖之后可能修改的应用代码
+EXCERPT_LENGTH = 200
+CJK_CHARS_PER_MINUTE = 400
+WORDS_PER_MINUTE = 200
+CJK_PATTERN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+WORD_PATTERN = re.compile(r"[A-Za-z0-9]+(?:['’\-][A-Za-z0-9]+)*")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def get_content_stats(content):
+    """计算摘要、字数和预计阅读时间"""
+    content = content or ''
+    excerpt = WHITESPACE_PATTERN.sub(' ', content).strip()
+    if len(excerpt) > EXCERPT_LENGTH:
+        excerpt = excerpt[:EXCERPT_LENGTH] + '...'
+    cjk, words = len(CJK_PATTERN.findall(content)), len(WORD_PATTERN.findall(content))
+    minutes = cjk / CJK_CHARS_PER_MINUTE + words / WORDS_PER_MINUTE
+    return {
+        'excerpt': excerpt,
+        'word_count': cjk + words,
+        'reading_time': math.ceil(minutes) if cjk or words else 0,
+    }
+
+
+def fill_content_stats(apps, schema_editor):
+    """为已有文章计算摘要、字数和阅读时间"""
+    Article = apps.get_model('articles', 'Article')
+    batch = []
+    for article in Article.objects.only('id', 'content').iterator(chunk_size=500):
+        for field, value in get_content_stats(article.content).items():
+            setattr(article, field, value)
+        batch.append(article)
+        if len(batch) >= 500:
+            Article.objects.bulk_update(batch, ['excerpt', 'word_count', 'reading_time'])
+            batch = []
+    if batch:
+        Article.objects.bulk_update(batch, ['excerpt', 'word_count', 'reading_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_article_articles_ar_created_312397_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='摘要'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, help_text='预计阅读分钟数', verbose_name='阅读时间'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='字数'),
+        ),
+        migrations.RunPython(fill_content_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:54
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# utils.search_index 在本迁移创建时的分词规则副本：迁移不依赖之后可能修改的应用代码
+CJK_RANGES = r"\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+TOKEN_PATTERN = re.compile(rf"[{CJK_RANGES}]+|[^\W_{CJK_RANGES}]+")
+CJK_PATTERN = re.compile(rf"[{CJK_RANGES}]")
+MAX_TERM_LENGTH = 64
+BATCH_SIZE = 1000
+INDEXED_FIELDS = ('title', 'content')
+
+
+def tokenize(text):
+    """切分为索引词项：单词整体，中文段按两字切分并保留段末单字"""
+    text = unicodedata.normalize('NFKD', unicodedata.normalize('NFKC', text or '').casefold())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    terms = []
+    for match in TOKEN_PATTERN.finditer(text):
+        run = match.group()
+        if not CJK_PATTERN.match(run):
+            terms.append(run[:MAX_TERM_LENGTH])
+            continue
+        terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        terms.append(run[-1])
+    return terms
+
+
+def build_search_index(apps, schema_editor):
+    """为已发布文章建立倒排索引"""
+    Article = apps.get_model('articles', 'Article')
+    SearchPosting = apps.get_model('articles', 'SearchPosting')
+    batch = []
+    published = Article.objects.filter(status='published').only('id', *INDEXED_FIELDS)
+    for article in published.iterator(chunk_size=100):
+        for field in INDEXED_FIELDS:
+            frequencies = {}
+            for term in tokenize(getattr(article, field)):
+                frequencies[term] = frequencies.get(term, 0) + 1
+            batch.extend(
+                SearchPosting(term=term, field=field, article_id=article.pk, frequency=frequency)
+                for term, frequency in frequencies.items()
+            )
+        if len(batch) >= BATCH_SIZE:
+            SearchPosting.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        SearchPosting.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0005_article_content_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='词项')),
+                ('field', models.CharField(choices=[('title', '标题'), ('content', '内容')], max_length=10, verbose_name='字段')),
+                ('frequency', models.PositiveIntegerField(default=1, verbose_name='词频')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_postings', to='articles.article', verbose_name='文章')),
+            ],
+            options={
+                'verbose_name': '搜索索引',
+                'verbose_name_plural': '搜索索引',
+                'indexes': [models.Index(fields=['term', 'field', 'article'], name='articles_se_term_f6567f_idx')],
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
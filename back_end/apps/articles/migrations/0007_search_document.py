@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def fill_search_documents(apps, schema_editor):
+    """根据已有的索引记录统计各字段的词项数"""
+    SearchPosting = apps.get_model('articles', 'SearchPosting')
+    SearchDocument = apps.get_model('articles', 'SearchDocument')
+    documents = {}
+    lengths = SearchPosting.objects.values('article_id', 'field').annotate(length=Sum('frequency'))
+    for row in lengths.iterator():
+        document = documents.setdefault(row['article_id'], SearchDocument(article_id=row['article_id']))
+        setattr(document, f"{row['field']}_length", row['length'])
+    SearchDocument.objects.bulk_create(documents.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0006_search_posting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='articles.article', verbose_name='文章')),
+                ('title_length', models.PositiveIntegerField(default=0, verbose_name='标题词项数')),
+                ('content_length', models.PositiveIntegerField(default=0, verbose_name='内容词项数')),
+            ],
+            options={
+                'verbose_name': '搜索文档',
+                'verbose_name_plural': '搜索文档',
+            },
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+    ]
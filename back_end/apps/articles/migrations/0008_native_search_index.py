@@ -0,0 +1,84 @@
+from django.db import DatabaseError, migrations
+
+FTS_TABLE = 'articles_article_fts'
+FTS_TRIGGERS = ('articles_article_fts_ai', 'articles_article_fts_ad', 'articles_article_fts_au')
+FTS_DELETE_OLD = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content);"
+)
+FTS_INSERT_NEW = f"INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);"
+FTS_INSTALL_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, content, content='articles_article', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGERS[0]} AFTER INSERT ON articles_article "
+    f"BEGIN {FTS_INSERT_NEW} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGERS[1]} AFTER DELETE ON articles_article "
+    f"BEGIN {FTS_DELETE_OLD} END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGERS[2]} AFTER UPDATE OF title, content ON articles_article "
+    f"BEGIN {FTS_DELETE_OLD} {FTS_INSERT_NEW} END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+MYSQL_FULLTEXT_INDEXES = {
+    'articles_title_fulltext': 'title',
+    'articles_content_fulltext': 'content',
+    'articles_title_content_fulltext': 'title, content',
+}
+
+
+def sqlite_supports_fts5_trigram(cursor):
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(a, tokenize='trigram')")
+        cursor.execute("DROP TABLE temp.fts5_probe")
+    except DatabaseError:
+        return False
+    return True
+
+
+def get_mysql_fulltext_indexes(cursor):
+    cursor.execute(
+        "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'articles_article' AND INDEX_TYPE = 'FULLTEXT'"
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def install_native_search_index(apps, schema_editor):
+    """安装当前数据库的原生全文索引（SQLite FTS5 / MySQL FULLTEXT）并导入现有文章"""
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite' and sqlite_supports_fts5_trigram(cursor):
+            for statement in FTS_INSTALL_STATEMENTS:
+                cursor.execute(statement)
+        elif vendor == 'mysql':
+            existing = get_mysql_fulltext_indexes(cursor)
+            for name, columns in MYSQL_FULLTEXT_INDEXES.items():
+                if name not in existing:
+                    cursor.execute(
+                        f"ALTER TABLE articles_article ADD FULLTEXT INDEX {name} ({columns}) WITH PARSER ngram"
+                    )
+
+
+def uninstall_native_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            for trigger in FTS_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif vendor == 'mysql':
+            existing = get_mysql_fulltext_indexes(cursor)
+            for name in MYSQL_FULLTEXT_INDEXES:
+                if name in existing:
+                    cursor.execute(f"ALTER TABLE articles_article DROP INDEX {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0007_search_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_native_search_index, uninstall_native_search_index),
+    ]
@@ -3,6 +3,8 @@ from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
 from guardian.models import UserObjectPermissionAbstract, GroupObjectPermissionAbstract
 
+from utils.text_stats import get_content_stats
+
 User = get_user_model()
 
 
@@ -37,6 +39,15 @@ class Article(models.Model):
         help_text=_("文章被访问的次数")
     )
 
+    # 以下字段在保存时根据正文计算，列表接口只读取它们而不加载正文
+    excerpt = models.CharField(_("摘要"), max_length=255, blank=True, default="")
+    word_count = models.PositiveIntegerField(_("字数"), default=0)
+    reading_time = models.PositiveIntegerField(
+        _("阅读时间"),
+        default=0,
+        help_text=_("预计阅读分钟数")
+    )
+
     class Meta:
         verbose_name = _("文章")
         verbose_name_plural = _("文章")
@@ -60,6 +71,99 @@ class Article(models.Model):
     def __str__(self):
         return str(self.title)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """记录加载时的状态，保存后据此判断文章此前是否已发布"""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
+    def was_published(self) -> bool:
+        """
+        已有文章保存前是否为已发布状态（在 post_save 信号中使用）
+
+        状态未加载等无法确定的情况按已发布处理
+        """
+        loaded_status = getattr(self, "_loaded_status", None)
+        return loaded_status is None or loaded_status == self.Status.PUBLISHED
+
+    def save(self, *args, **kwargs):
+        """保存时同步更新摘要、字数和阅读时间"""
+        update_fields = kwargs.get("update_fields")
+        # 正文未加载（如通过 only() 获取的实例）时正文不会被保存，无需重新计算
+        if "content" not in self.get_deferred_fields() and (
+            update_fields is None or "content" in update_fields
+        ):
+            self.update_content_stats()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "excerpt", "word_count", "reading_time"}
+        super().save(*args, **kwargs)
+        self._loaded_status = self.status
+
+    def update_content_stats(self):
+        """根据正文重新计算摘要、字数和阅读时间"""
+        for field, value in get_content_stats(self.content).items():
+            setattr(self, field, value)
+
+
+class SearchPosting(models.Model):
+    """
+    全文搜索倒排索引记录
+
+    每条记录表示某个词项在已发布文章的某个字段中出现的次数，
+    由 utils.search_index 在文章保存时维护
+    """
+
+    class Field(models.TextChoices):
+        TITLE = "title", _("标题")
+        CONTENT = "content", _("内容")
+
+    term = models.CharField(_("词项"), max_length=64)
+    field = models.CharField(_("字段"), max_length=10, choices=Field.choices)
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="search_postings",
+        verbose_name=_("文章"),
+    )
+    frequency = models.PositiveIntegerField(_("词频"), default=1)
+
+    class Meta:
+        verbose_name = _("搜索索引")
+        verbose_name_plural = _("搜索索引")
+        indexes = [
+            # 按词项（等值或前缀范围）查找文章，索引中已包含文章ID，不需要回表
+            models.Index(fields=["term", "field", "article"]),
+        ]
+
+    def __str__(self):
+        return f"{self.term} ({self.field}) -> {self.article_id}"
+
+
+class SearchDocument(models.Model):
+    """
+    全文搜索的文档统计
+
+    保存已发布文章各字段的词项数，用于 BM25 的文档长度归一化
+    """
+
+    article = models.OneToOneField(
+        Article,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+        verbose_name=_("文章"),
+    )
+    title_length = models.PositiveIntegerField(_("标题词项数"), default=0)
+    content_length = models.PositiveIntegerField(_("内容词项数"), default=0)
+
+    class Meta:
+        verbose_name = _("搜索文档")
+        verbose_name_plural = _("搜索文档")
+
+    def __str__(self):
+        return f"{self.article_id}: {self.title_length}/{self.content_length}"
+
 
 class ArticleUserObjectPermission(UserObjectPermissionAbstract):
     """
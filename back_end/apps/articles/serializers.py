@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Article
 from django.contrib.auth import get_user_model
+from utils.search_highlight import SUMMARY_LENGTH, SearchHighlighter
 
 User = get_user_model()
 
@@ -29,8 +30,38 @@ class ArticleSerializer(serializers.ModelSerializer):
             "updated_at",
             "status",
             "view_count",  # 阶段9：添加访问统计字段
+            "word_count",
+            "reading_time",
         ]
-        read_only_fields = ["id", "created_at", "author", "view_count"]
+        read_only_fields = ["id", "created_at", "author", "view_count", "word_count", "reading_time"]
+
+
+class ArticleListSerializer(serializers.ModelSerializer):
+    """文章列表序列化器 - 不包含正文，返回保存时预先计算的摘要"""
+
+    author = AuthorSerializer(read_only=True)
+
+    class Meta:
+        model = Article
+        fields = [
+            "id",
+            "title",
+            "excerpt",
+            "author",
+            "created_at",
+            "updated_at",
+            "status",
+            "view_count",
+            "word_count",
+            "reading_time",
+        ]
+        read_only_fields = fields
+
+    @classmethod
+    def setup_queryset(cls, queryset):
+        """只查询列表需要的列，正文不会被加载"""
+        author_fields = [f"author__{field}" for field in AuthorSerializer.Meta.fields]
+        return queryset.select_related("author").only(*cls.Meta.fields, *author_fields)
 
 
 class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
@@ -56,15 +87,18 @@ class ArticleSearchSerializer(serializers.ModelSerializer):
     """搜索结果序列化器 - 简化版本，用于搜索结果展示"""
 
     author = AuthorSerializer(read_only=True)
-    # 重写content字段，返回摘要而不是完整内容
-    content = serializers.SerializerMethodField()
+    # 正文中关键词最密集的片段（纯文本，截断处带省略号），不返回完整内容
+    content_summary = serializers.SerializerMethodField()
+    # 关键词位置：{"title": [[开始, 结束], ...], "content_summary": [...], "author": [...]}
+    highlights = serializers.SerializerMethodField()
 
     class Meta:
         model = Article
         fields = [
             "id",
             "title",
-            "content",  # 返回内容摘要
+            "content_summary",
+            "highlights",
             "author",
             "created_at",
             "status",
@@ -72,8 +106,55 @@ class ArticleSearchSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "author", "view_count"]
 
-    def get_content(self, obj):
-        """获取内容摘要，限制在200个字符内"""
-        if obj.content and len(obj.content) > 200:
-            return obj.content[:200] + "..."
-        return obj.content or ""
+    def get_highlighter(self, field):
+        """
+        按搜索关键词编译的高亮器（同一页的结果共用）
+
+        关键词取自 context 中的 search_query，没有时取请求的 q 参数
+        """
+        highlighters = self.__dict__.setdefault("_highlighters", {})
+        if field not in highlighters:
+            query = self.context.get("search_query")
+            request = self.context.get("request")
+            if query is None and request is not None:
+                query = request.query_params.get("q", "")
+            highlighters[field] = SearchHighlighter(query or "", field=field)
+        return highlighters[field]
+
+    def get_summary(self, obj):
+        """摘要和摘要中的关键词位置，每篇文章只计算一次"""
+        cached = self.__dict__.get("_summary")
+        if cached is None or cached[0] is not obj:
+            cached = self._summary = (obj, self.get_highlighter("content").summarize(obj.content, SUMMARY_LENGTH))
+        return cached[1]
+
+    def get_content_summary(self, obj):
+        """获取内容摘要，限制在200个字符内（不含省略号）"""
+        return self.get_summary(obj)[0]
+
+    def get_highlights(self, obj):
+        """获取标题、摘要、作者用户名中关键词的位置"""
+        return self.build_highlights(obj.title, self.get_summary(obj)[1], obj.author.username)
+
+    def build_highlights(self, title, summary_highlights, username):
+        return {
+            "title": [[start, end] for start, end, _ in self.get_highlighter("title").find(title)],
+            "content_summary": summary_highlights,
+            "author": [[start, end] for start, end, _ in self.get_highlighter("author").find(username)],
+        }
+
+    def represent_detail(self, data):
+        """
+        由文章详情的序列化数据（ArticleSerializer）生成搜索结果，输出与 to_representation 相同
+
+        Args:
+            data: 文章详情缓存中的序列化数据
+
+        Returns:
+            dict: 搜索结果
+        """
+        summary, summary_highlights = self.get_highlighter("content").summarize(data["content"], SUMMARY_LENGTH)
+        result = {field: data.get(field) for field in self.Meta.fields}
+        result["content_summary"] = summary
+        result["highlights"] = self.build_highlights(data["title"], summary_highlights, data["author"]["username"])
+        return result
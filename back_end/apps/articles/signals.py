@@ -0,0 +1,63 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utils.cache import invalidate_article_caches, invalidate_comment_caches, invalidate_comment_user_caches
+from utils.search_index import INDEXED_FIELDS, get_search_index
+from utils.search_suggest import get_search_suggester
+from utils.trending import get_trending_engine
+from .models import Article
+
+
+def schedule_suggest_update(article):
+    """事务提交后登记文章的搜索建议更新（其他进程加载快照时数据已经提交）"""
+    transaction.on_commit(partial(get_search_suggester().schedule_update, article.pk, article.author_id))
+
+
+@receiver(post_save, sender=Article)
+def article_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    """文章创建或更新后使详情、列表、搜索和热门缓存失效，并更新搜索索引和搜索建议"""
+    invalidate_article_caches(instance)
+    if update_fields is None or {"status", *INDEXED_FIELDS} & set(update_fields):
+        get_search_index().index_article(instance)
+    # 从未发布过的草稿（如自动保存）不影响搜索建议
+    is_listed = instance.status == Article.Status.PUBLISHED or (not created and instance.was_published())
+    if is_listed and (update_fields is None or {"status", "title"} & set(update_fields)):
+        schedule_suggest_update(instance)
+    if instance.status != Article.Status.PUBLISHED:
+        # 撤回为草稿的文章不再出现在热门列表中
+        get_trending_engine().remove(instance.pk)
+
+
+@receiver(post_delete, sender=Article)
+def article_deleted(sender, instance, **kwargs):
+    """文章删除后使相关缓存失效"""
+    invalidate_article_caches(instance)
+    invalidate_comment_caches(instance.pk)
+    get_trending_engine().remove(instance.pk)
+    if instance.status == Article.Status.PUBLISHED or instance.was_published():
+        schedule_suggest_update(instance)
+
+
+@receiver(post_save, sender="comments.Comment")
+def comment_saved(sender, instance, created, **kwargs):
+    """评论创建或审核状态变化后更新评论列表校验值，新的已通过评论计入文章热度"""
+    invalidate_comment_caches(instance.article_id)
+    if created and instance.status == "approved":
+        get_trending_engine().record_comment(instance.article_id)
+
+
+@receiver(post_delete, sender="comments.Comment")
+def comment_deleted(sender, instance, **kwargs):
+    """评论删除后更新评论列表校验值"""
+    invalidate_comment_caches(instance.article_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    """用户资料变化后更新评论列表校验值（评论中包含评论者的用户名和头像）"""
+    if not created and (update_fields is None or {"username", "email", "avatar"} & set(update_fields)):
+        invalidate_comment_user_caches()
@@ -1,14 +1,56 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.conf import settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import Article
+from .models import Article, SearchDocument, SearchPosting
 from .serializers import ArticleSerializer, ArticleCreateUpdateSerializer, ArticleSearchSerializer
-from datetime import datetime
+from .views import ArticleViewSet
+from datetime import datetime, timedelta
 from django.utils import timezone
-from utils.search import SearchQueryBuilder, SearchCache, validate_search_params
+from django.db.models import Q
+from utils.search import SearchQueryBuilder, SearchCache, SearchHits, SEARCH_CACHE_PARAMS, validate_search_params
+from utils.view_counter import get_view_count_buffer, flush_view_counts
+from utils.trending import get_trending_engine
+from apps.comments.models import Comment
+from utils.cache import (
+    CacheGeneration,
+    get_article_detail_cache_key,
+    ProtectedCache,
+    ARTICLE_LIST_CACHE_PARAMS,
+    ARTICLE_SCOPE_ALL,
+    ARTICLE_SCOPE_PUBLISHED,
+    article_author_scope,
+    canonicalize_params,
+    get_params_digest,
+    invalidate_article_caches,
+)
+from django.http import QueryDict
+from utils.local_cache import CacheInvalidationListener, LocalLRUCache, get_cache_stats, get_local_cache
+from utils.rendered_cache import (
+    join_rendered_field, join_rendered_fields, render_json, split_rendered_field, split_rendered_fields
+)
+from utils.search_highlight import SearchHighlighter, mark
+from utils.search_backends import IcontainsBackend, InvertedIndexBackend, SQLiteFTS5Backend, select_search_backend
+from utils.search_index import count_terms, get_search_index, tokenize, tokenize_query
+from utils.search_query import (
+    And, Not, Or, Term, compile_search_query, get_positive_terms, parse_search_query, to_query_string
+)
+from utils.search_ranking import BM25Ranker, RankedResults, top_k
+from utils.search_suggest import SearchSuggester, Suggestion, SuggestionIndex, get_search_suggester
+from unittest import mock, skipUnless
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from apps.articles.management.commands import rebuild_search_index
+import json
+import threading
+import time
 
 User = get_user_model()
 
@@ -471,6 +513,9 @@ class ArticleViewCountTest(APITestCase):
             status=Article.Status.PUBLISHED,
         )
 
+        # 清空访问计数缓冲区，避免其他测试遗留的增量
+        get_view_count_buffer().clear()
+
     def get_jwt_token(self, user):
         """获取JWT令牌"""
         refresh = RefreshToken.for_user(user)
@@ -488,7 +533,8 @@ class ArticleViewCountTest(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
-        # 刷新文章数据并检查访问次数
+        # 写回缓冲区后刷新文章数据并检查访问次数
+        flush_view_counts()
         self.article.refresh_from_db()
         self.assertEqual(self.article.view_count, 1)
         
@@ -497,6 +543,7 @@ class ArticleViewCountTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
         # 再次检查访问次数
+        flush_view_counts()
         self.article.refresh_from_db()
         self.assertEqual(self.article.view_count, 2)
 
@@ -512,6 +559,7 @@ class ArticleViewCountTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
         # 检查访问次数
+        flush_view_counts()
         self.article.refresh_from_db()
         self.assertEqual(self.article.view_count, 1)
 
@@ -537,6 +585,7 @@ class ArticleViewCountTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
         # 检查总访问次数
+        flush_view_counts()
         self.article.refresh_from_db()
         self.assertEqual(self.article.view_count, 3)
 
@@ -560,6 +609,7 @@ class ArticleViewCountTest(APITestCase):
         # 先访问文章以增加计数
         detail_url = reverse("article-detail", kwargs={"pk": self.article.pk})
         self.client.get(detail_url)
+        flush_view_counts()
         
         # 获取文章列表
         list_url = reverse("article-list")
@@ -597,6 +647,7 @@ class ArticleViewCountTest(APITestCase):
         # 先访问文章以增加计数
         detail_url = reverse("article-detail", kwargs={"pk": self.article.pk})
         self.client.get(detail_url)
+        flush_view_counts()
         
         self.article.refresh_from_db()
         original_count = self.article.view_count
@@ -616,6 +667,7 @@ class ArticleViewCountTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
         # 检查访问次数未改变
+        flush_view_counts()
         self.article.refresh_from_db()
         self.assertEqual(self.article.view_count, original_count)
 
@@ -638,6 +690,7 @@ class ArticleViewCountTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
         # 检查草稿文章的访问次数不会递增（只有已发布文章才统计访问量）
+        flush_view_counts()
         draft_article.refresh_from_db()
         self.assertEqual(draft_article.view_count, 0)
 
@@ -652,9 +705,58 @@ class ArticleViewCountTest(APITestCase):
             self.assertEqual(response.status_code, status.HTTP_200_OK)
         
         # 检查访问次数正确
+        flush_view_counts()
         self.article.refresh_from_db()
         self.assertEqual(self.article.view_count, 5)
 
+    def test_article_view_count_not_written_on_read(self):
+        """测试访问详情时不直接写数据库，而是计入缓冲区"""
+        url = reverse("article-detail", kwargs={"pk": self.article.pk})
+        for _ in range(3):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # 写回之前数据库中的计数不变，响应中包含待刷新增量
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 0)
+        self.assertEqual(response.data["view_count"], 3)
+        self.assertEqual(get_view_count_buffer().get_pending(self.article.pk), 3)
+
+        # 写回后增量清空，数据库计数更新
+        self.assertEqual(flush_view_counts(), 3)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 3)
+        self.assertEqual(get_view_count_buffer().get_pending(self.article.pk), 0)
+
+    def test_article_view_count_bulk_flush(self):
+        """测试多篇文章的增量通过一次批量更新写回"""
+        other_article = Article.objects.create(
+            title="另一篇文章",
+            content="另一篇文章内容",
+            author=self.other_user,
+            status=Article.Status.PUBLISHED,
+            view_count=10,
+        )
+        buffer = get_view_count_buffer()
+        buffer.incr(self.article.pk, 2)
+        buffer.incr(other_article.pk, 5)
+
+        with CaptureQueriesContext(connection) as ctx:
+            buffer.flush()
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn("CASE", updates[0]["sql"])
+
+        self.article.refresh_from_db()
+        other_article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 2)
+        self.assertEqual(other_article.view_count, 15)
+
+    def test_article_view_count_flush_nothing_pending(self):
+        """测试没有待刷新增量时不访问数据库"""
+        with self.assertNumQueries(0):
+            self.assertEqual(flush_view_counts(), 0)
+
     def test_article_view_count_field_readonly(self):
         """测试访问次数字段在序列化器中为只读"""
         from .serializers import ArticleSerializer
@@ -672,6 +774,563 @@ class ArticleViewCountTest(APITestCase):
             # 如果序列化器验证通过，检查访问次数是否被忽略
             validated_data = serializer.validated_data
             self.assertNotIn("view_count", validated_data)
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "article-tests",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ArticleDetailCacheTest(APITestCase):
+    """文章详情缓存命中快速路径测试"""
+
+    def setUp(self):
+        """设置测试数据"""
+        cache.clear()
+        get_view_count_buffer().clear()
+
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        self.other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com", password="testpass123", is_active=True
+        )
+        self.article = Article.objects.create(
+            title="缓存测试文章",
+            content="缓存测试内容",
+            author=self.user,
+            status=Article.Status.PUBLISHED,
+        )
+        self.draft = Article.objects.create(
+            title="缓存测试草稿",
+            content="缓存测试草稿内容",
+            author=self.user,
+            status=Article.Status.DRAFT,
+        )
+
+    def get_jwt_token(self, user):
+        """获取JWT令牌"""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def test_published_cache_hit_without_queries(self):
+        """测试已发布文章缓存命中时不访问数据库"""
+        url = reverse("article-detail", kwargs={"pk": self.article.pk})
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "缓存测试文章")
+        self.assertEqual(response.data["view_count"], 2)
+
+    def test_authenticated_cache_hit_only_loads_user(self):
+        """测试登录用户访问已发布文章的缓存命中只查询用户"""
+        url = reverse("article-detail", kwargs={"pk": self.article.pk})
+        self.client.get(url)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.get_jwt_token(self.other_user)}")
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_token_rejected_on_cache_hit(self):
+        """测试缓存命中时无效的令牌仍然返回401"""
+        url = reverse("article-detail", kwargs={"pk": self.article.pk})
+        self.client.get(url)
+
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer invalid-token")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_draft_visibility(self):
+        """测试缓存中的草稿仍然只对作者可见"""
+        url = reverse("article-detail", kwargs={"pk": self.draft.pk})
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.get_jwt_token(self.user)}")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("meta", ProtectedCache.get(f"{settings.CACHE_KEY_PREFIX}:article:detail:{self.draft.pk}"))
+
+        # 作者再次访问命中缓存
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["view_count"], 0)
+
+        # 其他用户和匿名用户仍然看不到
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.get_jwt_token(self.other_user)}")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.credentials()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cached_view_count_monotonic_after_flush(self):
+        """测试写回数据库后缓存命中返回的访问次数不会倒退"""
+        url = reverse("article-detail", kwargs={"pk": self.article.pk})
+        for _ in range(3):
+            self.client.get(url)
+        flush_view_counts()
+
+        response = self.client.get(url)
+        self.assertEqual(response.data["view_count"], 4)
+
+    def test_update_invalidates_detail_cache(self):
+        """测试更新文章后缓存中的可见性信息失效"""
+        url = reverse("article-detail", kwargs={"pk": self.article.pk})
+        self.client.get(url)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.get_jwt_token(self.user)}")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {"status": "draft"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.credentials()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ArticleCacheGenerationTest(APITestCase):
+    """文章列表/搜索/热门缓存的代际失效测试"""
+
+    def setUp(self):
+        """设置测试数据"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        self.article = Article.objects.create(
+            title="代际测试文章",
+            content="代际测试内容",
+            author=self.user,
+            status=Article.Status.PUBLISHED,
+        )
+
+    def get_jwt_token(self, user):
+        """获取JWT令牌"""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def test_bump_changes_generation(self):
+        """测试递增代际值"""
+        before = CacheGeneration.get(ARTICLE_SCOPE_PUBLISHED)
+        CacheGeneration.bump(ARTICLE_SCOPE_PUBLISHED)
+        self.assertEqual(CacheGeneration.get(ARTICLE_SCOPE_PUBLISHED), before + 1)
+
+    def test_generation_reinitialized_after_eviction(self):
+        """测试计数器被淘汰后重新初始化的值不会回到旧值"""
+        before = CacheGeneration.get(ARTICLE_SCOPE_PUBLISHED)
+        CacheGeneration.bump(ARTICLE_SCOPE_PUBLISHED)
+        cache.delete(CacheGeneration.get_key(ARTICLE_SCOPE_PUBLISHED))
+        self.assertGreater(CacheGeneration.get(ARTICLE_SCOPE_PUBLISHED), before)
+
+    def test_article_write_bumps_scopes(self):
+        """测试文章写操作递增全局和作者作用域"""
+        scopes = [ARTICLE_SCOPE_ALL, ARTICLE_SCOPE_PUBLISHED, article_author_scope(self.user.pk)]
+        before = CacheGeneration.get_many(scopes)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.article.title = "新标题"
+            self.article.save()
+        # 事务提交前不递增，避免其他请求以新代际值缓存提交前的数据
+        self.assertEqual(CacheGeneration.get_many(scopes), before)
+
+        for callback in callbacks:
+            callback()
+        after = CacheGeneration.get_many(scopes)
+        for scope in scopes:
+            self.assertGreater(after[scope], before[scope])
+
+    def test_list_cache_refreshed_after_create(self):
+        """测试创建文章后匿名用户的列表缓存失效"""
+        url = reverse("article-list")
+        self.assertEqual(self.client.get(url).data["count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(
+                title="第二篇文章",
+                content="第二篇内容",
+                author=self.user,
+                status=Article.Status.PUBLISHED,
+            )
+        self.assertEqual(self.client.get(url).data["count"], 2)
+
+    def test_list_cache_refreshed_after_update(self):
+        """测试通过接口更新文章后列表缓存失效"""
+        url = reverse("article-list")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.get_jwt_token(self.user)}")
+        self.client.get(url)
+
+        detail_url = reverse("article-detail", kwargs={"pk": self.article.pk})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(detail_url, {"title": "修改后的标题"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url)
+        self.assertEqual(response.data["results"][0]["title"], "修改后的标题")
+
+    def test_list_cache_refreshed_after_delete(self):
+        """测试删除文章后列表缓存失效"""
+        url = reverse("article-list")
+        self.assertEqual(self.client.get(url).data["count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.delete()
+        self.assertEqual(self.client.get(url).data["count"], 0)
+
+    def test_search_and_hot_cache_refreshed_after_publish(self):
+        """测试发布新文章后搜索和热门缓存失效"""
+        search_url = reverse("article-search")
+        hot_url = reverse("article-hot-articles")
+        self.assertEqual(self.client.get(search_url, {"q": "代际"}).data["count"], 1)
+        self.assertEqual(len(self.client.get(hot_url).data), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(
+                title="代际测试第二篇",
+                content="内容",
+                author=self.user,
+                status=Article.Status.PUBLISHED,
+            )
+        self.assertEqual(self.client.get(search_url, {"q": "代际"}).data["count"], 2)
+        self.assertEqual(len(self.client.get(hot_url).data), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ArticleSharedListCacheTest(APITestCase):
+    """共享已发布列表缓存与个人草稿叠加层测试"""
+
+    def setUp(self):
+        """设置测试数据：已发布文章和草稿交错创建"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        self.other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com", password="testpass123", is_active=True
+        )
+
+        base_time = timezone.now()
+        for i in range(32):
+            is_draft = i % 5 == 0 or i == 31
+            article = Article.objects.create(
+                title=f"文章{i}",
+                content=f"内容{i}",
+                author=self.user if is_draft or i % 2 else self.other_user,
+                status=Article.Status.DRAFT if is_draft else Article.Status.PUBLISHED,
+            )
+            # 相邻两篇使用相同的创建时间，验证按ID打破平局
+            Article.objects.filter(pk=article.pk).update(
+                created_at=base_time - timedelta(minutes=i // 2)
+            )
+        cache.clear()
+
+    def get_jwt_token(self, user):
+        """获取JWT令牌"""
+        refresh = RefreshToken.for_user(user)
+        return str(refresh.access_token)
+
+    def expected_titles(self, user):
+        """按数据库排序计算用户应看到的文章标题"""
+        queryset = Article.objects.filter(Q(author=user) | Q(status=Article.Status.PUBLISHED))
+        return list(queryset.order_by("-created_at", "-id").values_list("title", flat=True))
+
+    def collect_pages(self):
+        """依次获取所有页的文章标题"""
+        url = reverse("article-list")
+        titles = []
+        response = self.client.get(url)
+        count = response.data["count"]
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["count"], count)
+            titles.extend(article["title"] for article in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+        return count, titles
+
+    def test_merged_pages_match_database_order(self):
+        """测试草稿叠加后每一页都与数据库排序一致"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.get_jwt_token(self.user)}")
+        expected = self.expected_titles(self.user)
+
+        count, titles = self.collect_pages()
+        self.assertEqual(count, len(expected))
+        self.assertEqual(titles, expected)
+
+    def test_user_without_drafts_uses_shared_pages(self):
+        """测试没有草稿的用户直接使用共享的已发布分页"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.get_jwt_token(self.other_user)}")
+        count, titles = self.collect_pages()
+        self.assertEqual(titles, self.expected_titles(self.other_user))
+
+        # 匿名用户读取同一份共享缓存，不再查询数据库
+        self.client.credentials()
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("article-list"))
+        self.assertEqual(response.data["count"], count)
+
+    def test_last_page_and_invalid_page(self):
+        """测试 last 页码和超出范围的页码"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.get_jwt_token(self.user)}")
+        expected = self.expected_titles(self.user)
+
+        response = self.client.get(reverse("article-list"), {"page": "last"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        last_page_size = len(expected) % 10 or 10
+        self.assertEqual([a["title"] for a in response.data["results"]], expected[-last_page_size:])
+
+        response = self.client.get(reverse("article-list"), {"page": 99})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse("article-list"), {"page": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_new_draft_appears_in_overlay(self):
+        """测试新建草稿后叠加层失效"""
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.get_jwt_token(self.other_user)}")
+        first_count = self.client.get(reverse("article-list")).data["count"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(title="新草稿", content="内容", author=self.other_user)
+        response = self.client.get(reverse("article-list"))
+        self.assertEqual(response.data["count"], first_count + 1)
+        self.assertEqual(response.data["results"][0]["title"], "新草稿")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ArticleKeysetPaginationTest(APITestCase):
+    """游标（keyset）分页测试"""
+
+    def setUp(self):
+        """设置测试数据：每两篇文章使用相同的创建时间"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        base_time = timezone.now()
+        for i in range(25):
+            article = Article.objects.create(
+                title=f"分页文章{i}",
+                content=f"内容{i}",
+                author=self.user,
+                status=Article.Status.DRAFT if i % 7 == 0 else Article.Status.PUBLISHED,
+                view_count=i % 4,
+            )
+            Article.objects.filter(pk=article.pk).update(
+                created_at=base_time - timedelta(minutes=i // 2)
+            )
+        cache.clear()
+
+    def walk(self, url, params):
+        """沿 next 链接获取所有页，返回 (标题列表, 最后一页响应)"""
+        response = self.client.get(url, params)
+        titles = []
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles.extend(article["title"] for article in response.data["results"])
+            if not response.data["next"]:
+                return titles, response
+            response = self.client.get(response.data["next"])
+
+    def test_cursor_pages_match_database_order(self):
+        """测试游标分页遍历结果与数据库排序一致（相同创建时间按ID排序）"""
+        expected = list(
+            Article.objects.filter(status=Article.Status.PUBLISHED)
+            .order_by("-created_at", "-id")
+            .values_list("title", flat=True)
+        )
+        titles, last = self.walk(reverse("article-list"), {"cursor": ""})
+        self.assertEqual(titles, expected)
+        self.assertEqual(last.data["count"], len(expected))
+
+    def test_previous_link(self):
+        """测试 previous 链接返回上一页"""
+        first = self.client.get(reverse("article-list"), {"cursor": ""})
+        self.assertIsNone(first.data["previous"])
+        second = self.client.get(first.data["next"])
+        previous = self.client.get(second.data["previous"])
+        self.assertEqual(previous.status_code, status.HTTP_200_OK)
+        self.assertEqual(previous.data["results"], first.data["results"])
+        self.assertIsNone(previous.data["previous"])
+
+    def test_skip_count(self):
+        """测试 count=false 时不统计总数"""
+        response = self.client.get(reverse("article-list"), {"cursor": "", "count": "false"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["count"])
+        self.assertIn("count=false", response.data["next"])
+
+    def test_deep_page_has_no_offset(self):
+        """测试深分页使用范围条件而不是 OFFSET"""
+        first = self.client.get(reverse("article-list"), {"cursor": "", "count": "false"})
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(first.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any("OFFSET" in query["sql"].upper() for query in ctx.captured_queries))
+
+    def test_tampered_cursor(self):
+        """测试被篡改的游标返回404"""
+        first = self.client.get(reverse("article-list"), {"cursor": ""})
+        cursor = QueryDict(first.data["next"].split("?", 1)[1])["cursor"]
+        response = self.client.get(reverse("article-list"), {"cursor": cursor[:-2] + "xx"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_cursor_bound_to_ordering(self):
+        """测试搜索游标与排序方式绑定，且不同游标使用不同的缓存"""
+        url = reverse("article-search")
+        expected = list(
+            Article.objects.filter(status=Article.Status.PUBLISHED)
+            .order_by("-view_count", "-id")
+            .values_list("title", flat=True)
+        )
+        titles, _ = self.walk(url, {"q": "分页", "ordering": "-view_count", "cursor": ""})
+        self.assertEqual(titles, expected)
+
+        first = self.client.get(url, {"q": "分页", "ordering": "-view_count", "cursor": ""})
+        cursor = QueryDict(first.data["next"].split("?", 1)[1])["cursor"]
+        response = self.client.get(url, {"q": "分页", "ordering": "title", "cursor": cursor})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # 不带游标时仍是页码分页
+        response = self.client.get(url, {"q": "分页", "ordering": "-view_count"})
+        self.assertIn("page=2", response.data["next"])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ArticleListSerializerTest(APITestCase):
+    """文章列表摘要与轻量序列化器测试"""
+
+    def setUp(self):
+        """设置测试数据"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        self.article = Article.objects.create(
+            title="长文章",
+            content="第一段  内容\n\n" + "中文" * 300 + " hello world " * 100,
+            author=self.user,
+            status=Article.Status.PUBLISHED,
+        )
+
+    def test_stats_computed_on_save(self):
+        """测试保存时计算摘要、字数和阅读时间"""
+        self.assertEqual(self.article.excerpt, self.article.excerpt.strip())
+        self.assertTrue(self.article.excerpt.startswith("第一段 内容 中文"))
+        self.assertTrue(self.article.excerpt.endswith("..."))
+        self.assertEqual(self.article.word_count, 5 + 600 + 200)
+        self.assertEqual(self.article.reading_time, 3)
+
+    def test_stats_updated_with_update_fields(self):
+        """测试只保存正文时摘要等字段同步更新"""
+        self.article.content = "short text"
+        self.article.save(update_fields=["content"])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.excerpt, "short text")
+        self.assertEqual(self.article.word_count, 2)
+        self.assertEqual(self.article.reading_time, 1)
+
+    def test_list_does_not_load_content(self):
+        """测试列表接口不返回也不查询正文"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("article-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = response.data["results"][0]
+        self.assertNotIn("content", item)
+        self.assertEqual(item["excerpt"], self.article.excerpt)
+        self.assertEqual(item["reading_time"], 3)
+        for query in ctx.captured_queries:
+            self.assertNotIn('"content"', query["sql"])
+
+        response = self.client.get(reverse("article-list"), {"cursor": ""})
+        self.assertNotIn("content", response.data["results"][0])
+
+    def test_detail_still_returns_content(self):
+        """测试详情接口仍然返回完整正文"""
+        response = self.client.get(reverse("article-detail", kwargs={"pk": self.article.pk}))
+        self.assertEqual(response.data["content"], self.article.content)
+        self.assertEqual(response.data["word_count"], self.article.word_count)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ArticleTrendingTest(APITestCase):
+    """热门文章（时间衰减热度）测试，测试环境没有 Redis，使用数据库近似排序"""
+
+    def setUp(self):
+        """设置测试数据：旧的高访问文章、新文章、有近期评论的旧文章和草稿"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        now = timezone.now()
+        self.old_popular = self.create_article("旧的热门文章", 1000, now - timedelta(days=30))
+        self.old_commented = self.create_article("有新评论的旧文章", 10, now - timedelta(days=30))
+        self.fresh = self.create_article("新文章", 50, now - timedelta(hours=2))
+        self.create_article("草稿", 5000, now, status=Article.Status.DRAFT)
+        for _ in range(20):
+            Comment.objects.create(
+                article=self.old_commented, user=self.user, content="评论", status="approved"
+            )
+        cache.clear()
+
+    def create_article(self, title, view_count, created_at, status=Article.Status.PUBLISHED):
+        """创建指定访问次数和创建时间的文章"""
+        article = Article.objects.create(
+            title=title, content="内容", author=self.user, status=status, view_count=view_count
+        )
+        Article.objects.filter(pk=article.pk).update(created_at=created_at)
+        return article
+
+    def get_titles(self, window=None):
+        """获取热门文章标题"""
+        params = {"window": window} if window else {}
+        response = self.client.get(reverse("article-hot-articles"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [article["title"] for article in response.data]
+
+    def test_recent_window_prefers_recent_activity(self):
+        """测试24小时窗口中近期活跃的文章排在旧的高访问文章之前"""
+        self.assertEqual(self.get_titles(), ["有新评论的旧文章", "新文章", "旧的热门文章"])
+        self.assertEqual(self.get_titles("7d"), ["有新评论的旧文章", "新文章", "旧的热门文章"])
+
+    def test_all_window_uses_total_views(self):
+        """测试 all 窗口按总访问次数排序，且不包含草稿"""
+        self.assertEqual(self.get_titles("all"), ["旧的热门文章", "新文章", "有新评论的旧文章"])
+
+    def test_invalid_window(self):
+        """测试无效的热度窗口"""
+        response = self.client.get(reverse("article-hot-articles"), {"window": "1y"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_engine_without_redis(self):
+        """测试 Redis 不可用时热度引擎不会报错"""
+        engine = get_trending_engine()
+        self.assertIsNone(engine.top("24h", 10))
+        engine.record_comment(self.fresh.pk)
+        engine.record_views({self.fresh.pk: 3})
+        engine.remove(self.fresh.pk)
+        self.assertEqual(
+            engine.fallback_ids("24h", 1, exclude=[self.old_commented.pk]), [self.fresh.pk]
+        )
+
+    def test_admin_make_draft_removes_from_trending(self):
+        """测试后台批量设为草稿时把文章移出热度排行"""
+        from django.contrib.admin.sites import site
+
+        admin = site._registry[Article]
+        queryset = Article.objects.filter(pk__in=[self.fresh.pk, self.old_popular.pk])
+        with mock.patch.object(admin, "message_user"), \
+                mock.patch.object(type(get_trending_engine()), "remove") as remove:
+            admin.make_draft(None, queryset)
+        remove.assert_called_once()
+        self.assertEqual(set(remove.call_args.args), {self.fresh.pk, self.old_popular.pk})
+        self.assertEqual(self.get_titles("all"), ["有新评论的旧文章"])
+
+
 class ArticleEdgeCaseTest(TestCase):
     """文章边界情况测试"""
 
@@ -1378,6 +2037,1163 @@ class SearchQueryBuilderTest(TestCase):
         self.assertIsNotNone(conditions)
 
 
+class CacheKeyCanonicalizationTest(TestCase):
+    """缓存键规范化测试"""
+
+    def test_search_key_ignores_param_order_and_junk(self):
+        """测试参数顺序、缓存破坏参数不影响搜索缓存键"""
+        a = canonicalize_params(QueryDict("q=Django&page=2&_=123"), SEARCH_CACHE_PARAMS)
+        b = canonicalize_params(QueryDict("page=2&q=Django&utm_source=x"), SEARCH_CACHE_PARAMS)
+        self.assertEqual(a, b)
+        self.assertNotIn("_=", a)
+        self.assertNotIn("utm_source", a)
+
+    def test_search_key_normalizes_query(self):
+        """测试关键词的空白、大小写和特殊字符规范化"""
+        key = SearchCache.get_cache_key("Django  缓存", "all", "-created_at", "1", generation=1)
+        self.assertEqual(key, SearchCache.get_cache_key(" django 缓存! ", "all", "-created_at", "1", generation=1))
+        self.assertNotEqual(key, SearchCache.get_cache_key("django", "all", "-created_at", "1", generation=1))
+
+    def test_search_key_fills_defaults(self):
+        """测试缺省参数使用默认值"""
+        self.assertEqual(
+            canonicalize_params(QueryDict("q=python"), SEARCH_CACHE_PARAMS),
+            canonicalize_params(QueryDict("q=python&type=all&ordering=relevance&page=01"), SEARCH_CACHE_PARAMS),
+        )
+
+    def test_search_key_depends_on_generation(self):
+        """测试代际值变化后缓存键不同"""
+        self.assertNotEqual(
+            SearchCache.get_cache_key("django", "all", "-created_at", "1", generation=1),
+            SearchCache.get_cache_key("django", "all", "-created_at", "1", generation=2),
+        )
+
+    def test_list_key_only_uses_page(self):
+        """测试文章列表缓存键只包含分页参数"""
+        self.assertEqual(
+            get_params_digest(QueryDict("page=2&nocache=1"), ARTICLE_LIST_CACHE_PARAMS),
+            get_params_digest(QueryDict("page=2"), ARTICLE_LIST_CACHE_PARAMS),
+        )
+        self.assertEqual(
+            get_params_digest(QueryDict(""), ARTICLE_LIST_CACHE_PARAMS),
+            get_params_digest(QueryDict("page=1"), ARTICLE_LIST_CACHE_PARAMS),
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProtectedCacheTest(TestCase):
+    """防缓存击穿读取测试"""
+
+    def setUp(self):
+        cache.clear()
+        self.key = "test:protected"
+        self.calls = 0
+
+    def compute(self, value="new"):
+        """记录调用次数的计算函数"""
+        self.calls += 1
+        return value
+
+    def test_miss_computes_once_and_caches(self):
+        """测试未命中时计算一次并写入缓存"""
+        self.assertEqual(ProtectedCache.get_or_compute(self.key, self.compute, 60), "new")
+        self.assertEqual(ProtectedCache.get_or_compute(self.key, self.compute, 60), "new")
+        self.assertEqual(self.calls, 1)
+        self.assertIsNone(cache.get(ProtectedCache.get_lock_key(self.key)))
+
+    def test_expired_entry_refreshed_by_lock_holder(self):
+        """测试逻辑过期后由拿到锁的请求刷新"""
+        ProtectedCache.set(self.key, "old", -1)
+        self.assertEqual(ProtectedCache.get_or_compute(self.key, self.compute, 60), "new")
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_value_served_while_refreshing(self):
+        """测试其他请求正在刷新时直接返回旧值"""
+        ProtectedCache.set(self.key, "old", -1)
+        cache.add(ProtectedCache.get_lock_key(self.key), 1)
+        self.assertEqual(ProtectedCache.get_or_compute(self.key, self.compute, 60), "old")
+        self.assertEqual(self.calls, 0)
+
+    def test_early_expiration(self):
+        """测试计算耗时远大于剩余时间时提前刷新"""
+        ProtectedCache.set(self.key, "old", 1, delta=1000)
+        self.assertTrue(ProtectedCache.should_refresh(ProtectedCache.get_entry(self.key)))
+        ProtectedCache.set(self.key, "old", 3600, delta=0)
+        self.assertFalse(ProtectedCache.should_refresh(ProtectedCache.get_entry(self.key)))
+
+    def test_waits_for_concurrent_computation(self):
+        """测试没有旧值时等待正在计算的请求，而不是重复计算"""
+        lock_key = ProtectedCache.get_lock_key(self.key)
+        cache.add(lock_key, 1)
+        timer = threading.Timer(0.1, ProtectedCache.set, args=(self.key, "theirs", 60))
+        timer.start()
+        try:
+            self.assertEqual(ProtectedCache.get_or_compute(self.key, self.compute, 60), "theirs")
+        finally:
+            timer.join()
+        self.assertEqual(self.calls, 0)
+
+    def test_failed_computation_releases_lock(self):
+        """测试计算失败时释放锁且不写入缓存"""
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            ProtectedCache.get_or_compute(self.key, fail, 60)
+        self.assertIsNone(cache.get(ProtectedCache.get_lock_key(self.key)))
+        self.assertIsNone(ProtectedCache.get_entry(self.key))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TwoTierCacheTest(APITestCase):
+    """进程内一级缓存 + Redis 二级缓存测试"""
+
+    def setUp(self):
+        """启用一级缓存（服务进程中由失效通知订阅线程启用）"""
+        cache.clear()
+        self.local_cache = get_local_cache()
+        self.local_cache.clear()
+        self.local_cache.enable()
+        self.addCleanup(self.local_cache.disable)
+        get_cache_stats().reset()
+
+    def test_lru_eviction_and_ttl(self):
+        """测试容量上限和过期时间"""
+        local = LocalLRUCache(max_entries=2, timeout=30)
+        local.enable()
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+        self.assertEqual(local.get("a"), (True, 1))
+        self.assertEqual(local.get("b"), (False, None))
+        local.set("d", 4, timeout=0.01)
+        time.sleep(0.02)
+        self.assertEqual(local.get("d"), (False, None))
+
+    def test_disabled_without_listener(self):
+        """测试没有失效通知时一级缓存不生效"""
+        local = LocalLRUCache(max_entries=10, timeout=30)
+        local.set("a", 1)
+        self.assertEqual(local.get("a"), (False, None))
+
+    def test_set_skipped_after_concurrent_invalidation(self):
+        """测试读取二级缓存期间发生失效时不写入一级缓存"""
+        epoch = self.local_cache.get_epoch()
+        self.local_cache.delete("other")
+        self.local_cache.set("key", "stale", epoch=epoch)
+        self.assertEqual(self.local_cache.get("key"), (False, None))
+
+    def test_served_from_process_memory(self):
+        """测试一级缓存命中时不访问二级缓存"""
+        ProtectedCache.set("test:tiered", "value", 60)
+        cache.clear()
+        self.assertEqual(ProtectedCache.get("test:tiered"), "value")
+        stats = get_cache_stats().snapshot()
+        self.assertEqual(stats["l1"]["hits"], 1)
+        self.assertEqual(stats["l2"]["hits"], 0)
+
+    def test_detail_invalidated_on_update(self):
+        """测试文章更新后一级缓存中的详情被删除"""
+        user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        article = Article.objects.create(
+            title="原标题", content="内容", author=user, status=Article.Status.PUBLISHED
+        )
+        url = reverse("article-detail", kwargs={"pk": article.pk})
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            article.title = "新标题"
+            article.save()
+        self.assertEqual(self.client.get(url).data["title"], "新标题")
+
+    def test_invalidation_message(self):
+        """测试处理其他进程发来的失效消息"""
+        listener = CacheInvalidationListener(self.local_cache, "test-channel")
+        self.local_cache.set("a", 1)
+        self.local_cache.set("b", 2)
+        listener.handle("a")
+        self.assertEqual(self.local_cache.get("a"), (False, None))
+        self.assertEqual(self.local_cache.get("b"), (True, 2))
+        listener.handle(b"*")
+        self.assertEqual(len(self.local_cache), 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RenderedResponseCacheTest(APITestCase):
+    """预渲染 JSON 响应缓存测试"""
+
+    def setUp(self):
+        """设置测试数据"""
+        cache.clear()
+        get_view_count_buffer().clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        self.article = Article.objects.create(
+            title="预渲染文章", content="预渲染内容", author=self.user, status=Article.Status.PUBLISHED
+        )
+
+    def test_split_and_join_field(self):
+        """测试在字段值处切开后拼接的结果与直接渲染一致"""
+        data = {"id": 1, "title": "view_count", "view_count": 3, "content": "内容"}
+        parts = split_rendered_field(data, "view_count")
+        self.assertEqual(join_rendered_field(parts, 42), render_json({**data, "view_count": 42}))
+
+        data = {"count": 1, "next": None, "previous": None, "results": [{"title": "next"}]}
+        parts = split_rendered_fields(data, ["next", "previous"])
+        self.assertEqual(
+            join_rendered_fields(parts, ["http://a/?page=3", None]),
+            render_json({**data, "next": "http://a/?page=3"}),
+        )
+
+    def test_detail_hit_skips_serializer(self):
+        """测试详情缓存命中时不调用序列化器，view_count 被正确拼接"""
+        url = reverse("article-detail", kwargs={"pk": self.article.pk})
+        first = self.client.get(url)
+
+        with mock.patch.object(ArticleSerializer, "to_representation", side_effect=AssertionError):
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.content, render_json({**first.data, "view_count": 2}))
+        self.assertEqual(response.data["view_count"], 2)
+
+    def test_list_hit_returns_cached_bytes(self):
+        """测试列表缓存命中时直接返回缓存的字节，文章变化后重新生成"""
+        url = reverse("article-list")
+        first = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.content, first.content)
+        self.assertEqual(json.loads(response.content)["count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(
+                title="新文章", content="新内容", author=self.user, status=Article.Status.PUBLISHED
+            )
+        self.assertEqual(self.client.get(url).data["count"], 2)
+
+    def test_list_bytes_shared_across_users_and_params(self):
+        """测试没有草稿的登录用户与匿名用户共用整页字节，无关参数不产生新的缓存，分页链接按请求生成"""
+        for i in range(12):
+            Article.objects.create(
+                title=f"分页{i}", content="内容", author=self.user, status=Article.Status.PUBLISHED
+            )
+        url = reverse("article-list")
+        self.client.get(url, {"page": 2})
+
+        reader = User.objects.create_user(
+            username="reader", email="reader@example.com", password="testpass123", is_active=True
+        )
+        self.client.force_authenticate(user=reader)
+        with mock.patch.object(ArticleViewSet, "build_rendered_page", side_effect=AssertionError("不应重新渲染")):
+            response = self.client.get(url, {"page": "02", "utm_source": "mail"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertIn("utm_source=mail", response.data["previous"])
+        self.assertNotIn("page=", response.data["previous"])
+        self.assertIsNone(response.data["next"])
+
+    def test_search_hit_echoes_request(self):
+        """测试搜索缓存命中时不查询数据库，统计信息回显原始关键词"""
+        url = reverse("article-search")
+        self.client.get(url, {"q": "预渲染"})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"q": "预渲染"})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["search_info"]["query"], "预渲染")
+
+        response = self.client.get(url, {"q": " 预渲染 "})
+        self.assertEqual(response.data["search_info"]["query"], "预渲染")
+
+    def test_browsable_api_uses_renderer(self):
+        """测试非 JSON 请求走正常渲染流程"""
+        url = reverse("article-detail", kwargs={"pk": self.article.pk})
+        self.client.get(url)
+
+        response = self.client.get(url, HTTP_ACCEPT="text/html")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/html"))
+        self.assertIn("预渲染文章", response.content.decode())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ArticleConditionalRequestTest(APITestCase):
+    """文章详情和列表的条件请求测试"""
+
+    def setUp(self):
+        """设置测试数据"""
+        cache.clear()
+        get_view_count_buffer().clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        self.article = Article.objects.create(
+            title="条件请求文章", content="条件请求内容", author=self.user, status=Article.Status.PUBLISHED
+        )
+        self.detail_url = reverse("article-detail", kwargs={"pk": self.article.pk})
+
+    def test_detail_if_none_match(self):
+        """测试详情未变化时返回304，仍然计入访问次数"""
+        response = self.client.get(self.detail_url)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(self.client.get(self.detail_url).data["view_count"], 3)
+
+    def test_detail_if_modified_since(self):
+        """测试 If-Modified-Since 按更新时间判断"""
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE="Mon, 01 Jan 2001 00:00:00 GMT")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_detail_etag_changes_on_update(self):
+        """测试文章更新或状态变化后校验值失效"""
+        etag = self.client.get(self.detail_url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.title = "新标题"
+            self.article.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "新标题")
+
+        # 批量 update 不修改 updated_at，状态变化仍然使校验值失效
+        etag = response["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.filter(pk=self.article.pk).update(status=Article.Status.DRAFT)
+            invalidate_article_caches(self.article)
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], Article.Status.DRAFT)
+
+    def test_list_if_none_match(self):
+        """测试列表使用响应体的强校验值"""
+        url = reverse("article-list")
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(
+                title="新文章", content="新内容", author=self.user, status=Article.Status.PUBLISHED
+            )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class SearchIndexTest(TestCase):
+    """全文倒排索引测试"""
+
+    def setUp(self):
+        """设置测试数据"""
+        self.user = User.objects.create_user(
+            username="indexuser", email="index@example.com", password="testpass123", is_active=True
+        )
+        self.article = Article.objects.create(
+            title="Django数据库优化",
+            content="介绍 QuerySet 的查询优化和数据库索引。",
+            author=self.user,
+            status=Article.Status.PUBLISHED,
+        )
+
+    def search(self, query, fields=("title", "content")):
+        """返回匹配的文章ID集合"""
+        queryset = Article.objects.filter(status=Article.Status.PUBLISHED)
+        return set(get_search_index().filter(queryset, query, fields).values_list("pk", flat=True))
+
+    def test_tokenize(self):
+        """测试中文 bigram 和英文单词切分"""
+        self.assertEqual(tokenize("Django数据库"), ["django", "数据", "据库", "库"])
+        self.assertEqual(tokenize("ＱｕｅｒｙＳｅｔ Café"), ["queryset", "cafe"])
+        self.assertEqual(tokenize_query("数据库 djan 优"), [("数据", False), ("据库", False), ("djan", True), ("优", True)])
+
+    def test_search_matches(self):
+        """测试词组、单字、英文前缀和大小写不敏感的匹配"""
+        for query in ("数据库", "优化", "库", "DJANGO", "query", "数据库 django"):
+            self.assertEqual(self.search(query), {self.article.pk}, query)
+        for query in ("数据仓库", "flask", "化数"):
+            self.assertEqual(self.search(query), set(), query)
+
+    def test_search_fields(self):
+        """测试只在指定字段中搜索"""
+        self.assertEqual(self.search("索引", fields=["title"]), set())
+        self.assertEqual(self.search("索引", fields=["content"]), {self.article.pk})
+        self.assertEqual(self.search("indexuser", fields=["author"]), {self.article.pk})
+
+    def test_incremental_updates(self):
+        """测试保存、撤回、删除文章时增量更新索引"""
+        self.article.title = "Flask入门"
+        self.article.save()
+        self.assertEqual(self.search("flask"), {self.article.pk})
+        self.assertEqual(self.search("django"), set())
+
+        self.article.status = Article.Status.DRAFT
+        self.article.save()
+        self.assertFalse(SearchPosting.objects.filter(article=self.article).exists())
+
+        self.article.status = Article.Status.PUBLISHED
+        self.article.save()
+        self.assertEqual(self.search("flask"), {self.article.pk})
+
+        self.article.delete()
+        self.assertFalse(SearchPosting.objects.exists())
+
+    def test_view_count_update_keeps_index(self):
+        """测试只更新其他字段时不重建索引"""
+        postings = set(SearchPosting.objects.values_list("pk", flat=True))
+        self.article.view_count = 10
+        self.article.save(update_fields=["view_count"])
+        self.assertEqual(set(SearchPosting.objects.values_list("pk", flat=True)), postings)
+
+    def test_no_content_scan(self):
+        """测试搜索不对正文执行 LIKE 查询"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.search("数据库")
+        sql = " ".join(query["sql"] for query in ctx.captured_queries)
+        self.assertNotIn("LIKE", sql.upper())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SearchRankingTest(APITestCase):
+    """BM25 相关度排序测试"""
+
+    def setUp(self):
+        """设置测试数据"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="rankuser", email="rank@example.com", password="testpass123", is_active=True
+        )
+        self.in_content = self.create_article("Web开发入门", "本文顺带提到缓存。" + "其他内容。" * 50)
+        self.in_title = self.create_article("缓存设计", "介绍一些设计原则。")
+        self.repeated = self.create_article("性能优化", "缓存、缓存、缓存：多级缓存的取舍。")
+
+    def create_article(self, title, content):
+        return Article.objects.create(
+            title=title, content=content, author=self.user, status=Article.Status.PUBLISHED
+        )
+
+    def test_title_match_ranks_first(self):
+        """测试标题命中优先，词频高的短文档其次"""
+        scores = BM25Ranker("缓存", ["title", "content"]).score(Article.objects.all())
+        self.assertEqual(
+            top_k(scores, 3), [self.in_title.pk, self.repeated.pk, self.in_content.pk]
+        )
+
+    def test_author_terms_matched_separately(self):
+        """测试多个查询词分别匹配作者用户名"""
+        authors = [
+            User.objects.create_user(username=name, email=f"{name}@example.com", password="testpass123")
+            for name in ("djangofan", "flaskfan")
+        ]
+        articles = [
+            Article.objects.create(title="随笔", content="内容", author=author, status=Article.Status.PUBLISHED)
+            for author in authors
+        ]
+        terms = get_positive_terms(parse_search_query("django OR flask"))
+        ranker = BM25Ranker(" ".join(term.text for term in terms), ["title", "content", "author"])
+        scores = ranker.score(Article.objects.filter(pk__in=[article.pk for article in articles]))
+        self.assertTrue(all(scores[article.pk] > 0 for article in articles))
+
+    def test_top_k_with_heap(self):
+        """测试 top-k 结果与完整排序一致，分数相同时较新的文章在前"""
+        scores = {1: 0.5, 2: 2.0, 3: 0.5, 4: 1.0}
+        self.assertEqual(top_k(scores, 3), [2, 4, 3])
+        self.assertEqual(top_k(scores, 10), [2, 4, 3, 1])
+
+    def test_ranked_results_pagination(self):
+        """测试按相关度分页"""
+        results = RankedResults(Article.objects.all(), BM25Ranker("缓存", ["title", "content"]))
+        self.assertEqual(results.count(), 3)
+        self.assertEqual([article.pk for article in results[1:3]], [self.repeated.pk, self.in_content.pk])
+
+    def test_relevance_is_default_ordering(self):
+        """测试搜索接口默认按相关度排序"""
+        response = self.client.get(reverse("article-search"), {"q": "缓存"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["search_info"]["ordering"], "relevance")
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]],
+            [self.in_title.pk, self.repeated.pk, self.in_content.pk],
+        )
+
+    def test_relevance_rejects_cursor(self):
+        """测试相关度排序不支持游标分页"""
+        response = self.client.get(reverse("article-search"), {"q": "缓存", "cursor": ""})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse("article-search"), {"q": "缓存", "cursor": "", "ordering": "-created_at"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class SearchBackendTest(TestCase):
+    """可替换搜索后端测试"""
+
+    def setUp(self):
+        """设置测试数据"""
+        self.user = User.objects.create_user(
+            username="backenduser", email="backend@example.com", password="testpass123", is_active=True
+        )
+        self.article = Article.objects.create(
+            title="Django数据库优化",
+            content="介绍 QuerySet 的查询优化和数据库索引。",
+            author=self.user,
+            status=Article.Status.PUBLISHED,
+        )
+        self.draft = Article.objects.create(
+            title="Django数据库草稿",
+            content="未发布的数据库索引笔记。",
+            author=self.user,
+            status=Article.Status.DRAFT,
+        )
+
+    def get_backends(self):
+        backends = [IcontainsBackend(), InvertedIndexBackend()]
+        if SQLiteFTS5Backend().is_installed():
+            backends.append(SQLiteFTS5Backend())
+        return backends
+
+    def search(self, backend, query, fields=("title", "content")):
+        """返回匹配的已发布文章ID集合"""
+        queryset = Article.objects.filter(status=Article.Status.PUBLISHED)
+        return set(backend.filter(queryset, query, fields).values_list("pk", flat=True))
+
+    def test_backends_match(self):
+        """测试各后端的匹配结果一致"""
+        for backend in self.get_backends():
+            for query in ("数据库", "优化", "DJANGO", "query"):
+                self.assertEqual(self.search(backend, query), {self.article.pk}, (backend.name, query))
+            for query in ("数据仓库", "flask", "化数", "@#$"):
+                self.assertEqual(self.search(backend, query), set(), (backend.name, query))
+            self.assertEqual(self.search(backend, "索引", fields=["title"]), set(), backend.name)
+            self.assertEqual(self.search(backend, "backenduser", fields=["author"]), {self.article.pk}, backend.name)
+
+    @skipUnless(connection.vendor == "sqlite", "需要 SQLite")
+    def test_fts5_multiple_words(self):
+        """测试 FTS5 多个词（含短于三个字符的词）都必须出现"""
+        backend = SQLiteFTS5Backend()
+        if not backend.is_installed():
+            self.skipTest("SQLite 不支持 FTS5 trigram")
+        self.assertEqual(self.search(backend, "数据库 查询"), {self.article.pk})
+        self.assertEqual(self.search(backend, "数据库 索引 优化"), {self.article.pk})
+        self.assertEqual(self.search(backend, "数据库 flask"), set())
+
+    @skipUnless(connection.vendor == "sqlite", "需要 SQLite")
+    def test_fts5_triggers(self):
+        """测试 FTS5 索引随文章保存、批量更新、删除同步"""
+        backend = SQLiteFTS5Backend()
+        if not backend.is_installed():
+            self.skipTest("SQLite 不支持 FTS5 trigram")
+        self.article.title = "Flask入门教程"
+        self.article.save()
+        self.assertEqual(self.search(backend, "入门教程", fields=["title"]), {self.article.pk})
+        self.assertEqual(self.search(backend, "数据库优化", fields=["title"]), set())
+
+        Article.objects.filter(pk=self.draft.pk).update(status=Article.Status.PUBLISHED)
+        self.assertEqual(self.search(backend, "数据库草稿"), {self.draft.pk})
+
+        self.draft.delete()
+        self.assertEqual(self.search(backend, "数据库草稿"), set())
+        self.assertEqual(backend.verify_index(), [])
+
+    @skipUnless(connection.vendor == "sqlite", "需要 SQLite")
+    def test_fts5_short_and_word_terms_use_index(self):
+        """测试 FTS5 后端把短词和英文单词交给倒排索引，不扫描正文"""
+        backend = SQLiteFTS5Backend()
+        if not backend.is_installed():
+            self.skipTest("SQLite 不支持 FTS5 trigram")
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.search(backend, "优化 django"), {self.article.pk})
+        sql = " ".join(query["sql"] for query in ctx.captured_queries)
+        self.assertNotIn("LIKE", sql.upper())
+        for prefix, expected in ((True, {self.article.pk}), (False, set())):
+            condition = backend.build_condition("query", ["title", "content"], prefix=prefix)
+            queryset = Article.objects.filter(condition, status=Article.Status.PUBLISHED)
+            self.assertEqual(set(queryset.values_list("pk", flat=True)), expected, prefix)
+
+    @skipUnless(connection.vendor == "sqlite", "需要 SQLite")
+    def test_fts5_verify_detects_missing_trigger(self):
+        """测试校验发现缺失的触发器，重建后恢复"""
+        backend = SQLiteFTS5Backend()
+        if not backend.is_installed():
+            self.skipTest("SQLite 不支持 FTS5 trigram")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TRIGGER {backend.triggers[2]}")
+        self.assertEqual(len(backend.verify_index()), 1)
+
+        backend.build_index()
+        self.assertEqual(backend.verify_index(), [])
+
+    def test_select_backend(self):
+        """测试按名称选择后端"""
+        self.assertIsInstance(select_search_backend("icontains"), IcontainsBackend)
+        self.assertIn(select_search_backend("auto").name, ("fts5", "mysql", "index"))
+        with self.assertRaises(ValueError):
+            select_search_backend("elasticsearch")
+
+    def test_query_builder_uses_backend(self):
+        """测试 SearchQueryBuilder 通过搜索后端构建条件"""
+        conditions = SearchQueryBuilder(Article).add_text_search("数据库", ["title", "author__username"]).build()
+        queryset = Article.objects.filter(conditions, status=Article.Status.PUBLISHED)
+        self.assertEqual(set(queryset.values_list("pk", flat=True)), {self.article.pk})
+
+    def test_build_search_index_command(self):
+        """测试重建和校验索引的管理命令"""
+        SearchPosting.objects.all().delete()
+        SearchDocument.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command("build_search_index", "--verify-only", "--backend", "index", stdout=StringIO(), stderr=StringIO())
+
+        out = StringIO()
+        call_command("build_search_index", stdout=out, stderr=StringIO())
+        self.assertIn("[index] 索引校验通过", out.getvalue())
+        self.assertEqual(self.search(InvertedIndexBackend(), "数据库"), {self.article.pk})
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RebuildSearchIndexCommandTest(TestCase):
+    """多进程重建倒排索引命令测试"""
+
+    def setUp(self):
+        """设置测试数据：按信号维护的索引作为期望结果，然后破坏索引"""
+        cache.clear()
+        self.user = User.objects.create_user(username="rebuild", email="rebuild@example.com", password="testpass123")
+        self.articles = [
+            Article.objects.create(
+                title=f"重建索引 {i}", content=f"Django 数据库 第{i}篇", author=self.user,
+                status=Article.Status.PUBLISHED,
+            )
+            for i in range(5)
+        ]
+        self.draft = Article.objects.create(
+            title="草稿", content="草稿内容", author=self.user, status=Article.Status.DRAFT
+        )
+        self.expected = self.snapshot()
+        SearchPosting.objects.all().delete()
+        SearchDocument.objects.all().delete()
+        SearchPosting.objects.create(term="过期", field="title", article=self.draft)
+
+    def snapshot(self):
+        return (
+            set(SearchPosting.objects.values_list("term", "field", "article_id", "frequency")),
+            set(SearchDocument.objects.values_list("article_id", "title_length", "content_length")),
+        )
+
+    def test_rebuild(self):
+        """测试分块重建的结果与逐篇维护的索引一致，草稿的旧索引被删除"""
+        out = StringIO()
+        call_command("rebuild_search_index", "--workers", "1", "--chunk-size", "2", stdout=out)
+        self.assertEqual(self.snapshot(), self.expected)
+        self.assertIn("篇/秒", out.getvalue())
+        self.assertIsNone(cache.get(rebuild_search_index.get_checkpoint_key()))
+
+    def test_rebuild_with_processes(self):
+        """测试在子进程中分词"""
+        call_command("rebuild_search_index", "--workers", "2", "--chunk-size", "2", stdout=StringIO())
+        self.assertEqual(self.snapshot(), self.expected)
+
+    def test_resume_after_interruption(self):
+        """测试中断后从检查点继续，已完成的块不再重建"""
+        original = get_search_index().replace_range
+        calls = []
+
+        def interrupted(*args):
+            if calls:
+                raise KeyboardInterrupt
+            calls.append(args)
+            return original(*args)
+
+        with mock.patch.object(get_search_index(), "replace_range", side_effect=interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command("rebuild_search_index", "--workers", "1", "--chunk-size", "2", stdout=StringIO())
+        checkpoint = cache.get(rebuild_search_index.get_checkpoint_key())
+        self.assertEqual(checkpoint, {"last_id": self.articles[1].pk, "indexed": 2})
+
+        out = StringIO()
+        with mock.patch.object(rebuild_search_index, "count_terms", wraps=count_terms) as counted:
+            call_command("rebuild_search_index", "--resume", "--workers", "1", "--chunk-size", "2", stdout=out)
+        self.assertEqual(
+            [pk for call in counted.call_args_list for pk, *_ in call.args[0]],
+            [article.pk for article in self.articles[2:]],
+        )
+        self.assertIn("5/5", out.getvalue())
+        self.assertEqual(self.snapshot(), self.expected)
+
+
+class SearchQueryParserTest(TestCase):
+    """搜索查询语法测试"""
+
+    def test_parse(self):
+        """测试运算符、短语、字段前缀和前缀通配符"""
+        self.assertEqual(
+            parse_search_query('django 缓存'),
+            And((Term("django"), Term("缓存"))),
+        )
+        self.assertEqual(
+            parse_search_query('a OR b c'),
+            Or((Term("a"), And((Term("b"), Term("c"))))),
+        )
+        self.assertEqual(
+            parse_search_query('title:"Redis 缓存" -草稿 djan*'),
+            And((Term("Redis 缓存", "title", phrase=True), Not(Term("草稿")), Term("djan", prefix=True))),
+        )
+        self.assertEqual(
+            parse_search_query('author:(alice OR bob) NOT python'),
+            And((Or((Term("alice", "author"), Term("bob", "author"))), Not(Term("python")))),
+        )
+
+    def test_parse_invalid_syntax(self):
+        """测试语法错误时尽量保留可搜索的词"""
+        self.assertEqual(parse_search_query("((django"), Term("django"))
+        self.assertEqual(parse_search_query("django)) AND"), Term("django"))
+        self.assertEqual(parse_search_query("NOT NOT django"), Term("django"))
+        self.assertIsNone(parse_search_query("AND OR @#$"))
+
+    def test_canonical_query_string(self):
+        """测试规范查询字符串：写法不同但含义相同的查询一致"""
+        self.assertEqual(to_query_string(parse_search_query("Django AND 缓存!")), "django 缓存")
+        self.assertEqual(to_query_string(parse_search_query("a OR (b c)")), "a OR (b c)")
+        self.assertNotEqual(
+            to_query_string(parse_search_query('title:"foo bar"')),
+            to_query_string(parse_search_query("title:foo bar")),
+        )
+        self.assertEqual(
+            SearchCache.get_cache_key("django AND 缓存", "all", "relevance", "1", generation=1),
+            SearchCache.get_cache_key("Django 缓存", "all", "relevance", "1", generation=1),
+        )
+
+
+class SearchPlanTest(TestCase):
+    """查询执行计划测试"""
+
+    def setUp(self):
+        """设置测试数据"""
+        self.alice = User.objects.create_user(
+            username="alice", email="alice@example.com", password="testpass123", is_active=True
+        )
+        self.bob = User.objects.create_user(
+            username="bob", email="bob@example.com", password="testpass123", is_active=True
+        )
+        self.redis = Article.objects.create(
+            title="Redis 缓存实践", content="Django 项目中的 Redis 缓存和失效策略。",
+            author=self.alice, status=Article.Status.PUBLISHED,
+        )
+        self.orm = Article.objects.create(
+            title="Django ORM 优化", content="查询优化、索引和缓存的使用。",
+            author=self.bob, status=Article.Status.PUBLISHED,
+        )
+        self.flask = Article.objects.create(
+            title="Flask 入门", content="一个轻量的 Python 框架。",
+            author=self.bob, status=Article.Status.PUBLISHED,
+        )
+
+    def search(self, query, fields=("title", "content", "author"), backend=None):
+        """返回匹配的文章ID集合"""
+        queryset = Article.objects.filter(status=Article.Status.PUBLISHED)
+        plan = compile_search_query(query, fields, backend or InvertedIndexBackend())
+        return set(plan.filter(queryset).values_list("pk", flat=True))
+
+    def test_boolean_operators(self):
+        """测试与、或、非"""
+        self.assertEqual(self.search("django 缓存"), {self.redis.pk, self.orm.pk})
+        self.assertEqual(self.search("redis AND 优化"), set())
+        self.assertEqual(self.search("redis OR flask"), {self.redis.pk, self.flask.pk})
+        self.assertEqual(self.search("缓存 -redis"), {self.orm.pk})
+        self.assertEqual(self.search("NOT 缓存"), {self.flask.pk})
+
+    def test_phrase_field_and_prefix(self):
+        """测试短语、字段前缀和前缀通配符"""
+        self.assertEqual(self.search('"Redis 缓存"'), {self.redis.pk})
+        self.assertEqual(self.search('"缓存 Redis"'), set())
+        self.assertEqual(self.search("title:缓存"), {self.redis.pk})
+        self.assertEqual(self.search("author:bob 缓存"), {self.orm.pk})
+        self.assertEqual(self.search("djan"), set())
+        self.assertEqual(self.search("djan*"), {self.redis.pk, self.orm.pk})
+
+    def test_backends_agree(self):
+        """测试各后端执行同一查询的结果一致"""
+        backends = [IcontainsBackend(), InvertedIndexBackend()]
+        if SQLiteFTS5Backend().is_installed():
+            backends.append(SQLiteFTS5Backend())
+        for backend in backends:
+            for query, expected in (
+                ("缓存 -redis", {self.orm.pk}),
+                ("title:flask OR author:alice", {self.redis.pk, self.flask.pk}),
+                ('"Redis 缓存" django', {self.redis.pk}),
+            ):
+                self.assertEqual(self.search(query, backend=backend), expected, (backend.name, query))
+
+    def test_most_selective_term_first(self):
+        """测试先执行结果最少的词，结果为空时不再执行其余的词"""
+        queryset = Article.objects.filter(status=Article.Status.PUBLISHED)
+        plan = compile_search_query("缓存 flask 优化", ["title", "content"], InvertedIndexBackend())
+        self.assertEqual(list(plan.filter(queryset)), [])
+        self.assertEqual(plan.steps[0][0], "flask")
+        self.assertLess(len(plan.steps), 3)
+
+        plan = compile_search_query("缓存 redis", ["title", "content"], InvertedIndexBackend())
+        self.assertEqual(set(plan.filter(queryset).values_list("pk", flat=True)), {self.redis.pk})
+        self.assertEqual([step[0] for step in plan.steps], ["redis", "缓存"])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_estimates_cached_per_generation(self):
+        """测试文档频率和作者文章数按代际值缓存，文章变化后重新统计"""
+        cache.clear()
+        queryset = Article.objects.filter(status=Article.Status.PUBLISHED)
+
+        def estimate():
+            plan = compile_search_query("缓存 author:bob", ["title", "content"], InvertedIndexBackend())
+            return plan.estimate(plan.node, queryset)
+
+        self.assertEqual(estimate(), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(estimate(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(
+                title="缓存穿透", content="内容", author=self.bob, status=Article.Status.PUBLISHED
+            )
+        self.assertEqual(estimate(), 3)
+
+    def test_search_api_syntax(self):
+        """测试搜索接口支持查询语法"""
+        response = self.client.get(reverse("article-search"), {"q": "缓存 -redis"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["id"] for item in response.data["results"]], [self.orm.pk])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SearchSuggestTest(APITestCase):
+    """搜索建议测试"""
+
+    def setUp(self):
+        """设置测试数据"""
+        cache.clear()
+        get_search_suggester().clear()
+        self.user = User.objects.create_user(
+            username="djangofan", email="fan@example.com", password="testpass123", is_active=True
+        )
+        self.popular = Article.objects.create(
+            title="Django ORM 查询优化", content="内容", author=self.user,
+            status=Article.Status.PUBLISHED, view_count=100,
+        )
+        self.quiet = Article.objects.create(
+            title="Django 入门", content="内容", author=self.user, status=Article.Status.PUBLISHED,
+        )
+        self.draft = Article.objects.create(
+            title="Django 草稿", content="内容", author=self.user, status=Article.Status.DRAFT,
+        )
+        self.url = reverse("article-search-suggest")
+
+    def texts(self, prefix, suggester=None):
+        return [item.text for item in (suggester or get_search_suggester()).suggest(prefix)]
+
+    def test_prefix_lookup(self):
+        """测试标题、标题中的单词和作者的前缀匹配，按权重排序且不含草稿"""
+        texts = self.texts("dja")
+        self.assertEqual(texts[0], "Django ORM 查询优化")
+        self.assertEqual(set(texts), {"Django ORM 查询优化", "Django 入门", "djangofan"})
+        self.assertEqual(self.texts("D"), self.texts("dja"))
+        self.assertEqual(self.texts("ＯＲＭ"), ["Django ORM 查询优化"])
+        self.assertEqual(self.texts("flask"), [])
+
+    def test_index_snapshot_roundtrip(self):
+        """测试快照序列化后结果不变，删除的条目不进入快照"""
+        index = SuggestionIndex.build([
+            Suggestion("Redis 缓存", "title", 2.0, 1),
+            Suggestion("Redis 集群", "title", 1.0, 2),
+            Suggestion("redis", "query", 3.0),
+        ])
+        index.remove_article(2)
+        loaded = SuggestionIndex.from_snapshot(index.to_snapshot())
+        self.assertEqual([item.text for item in loaded.lookup("red")], ["redis", "Redis 缓存"])
+        self.assertEqual(len(loaded.entries), 2)
+
+    def save(self, article, delete=False):
+        """在事务提交后登记更新，并立即写入快照"""
+        with self.captureOnCommitCallbacks(execute=True):
+            article.delete() if delete else article.save()
+        get_search_suggester().apply_pending_updates()
+
+    def test_incremental_update(self):
+        """测试发布、改标题、撤回、删除时增量更新快照，不从数据库整体重建"""
+        suggester = get_search_suggester()
+        suggester.suggest("dja")
+        with mock.patch.object(SearchSuggester, "collect", side_effect=AssertionError("不应整体重建")):
+            self.draft.status = Article.Status.PUBLISHED
+            self.save(self.draft)
+            self.assertIn("Django 草稿", self.texts("dja"))
+
+            self.draft.title = "Flask 草稿"
+            self.save(self.draft)
+            self.assertEqual(self.texts("fla"), ["Flask 草稿"])
+
+            self.draft.status = Article.Status.DRAFT
+            self.save(self.draft)
+            self.assertEqual(self.texts("fla"), [])
+
+            self.save(self.quiet, delete=True)
+            self.assertNotIn("Django 入门", self.texts("dja"))
+
+    def test_unpublished_draft_save_skips_suggest(self):
+        """测试从未发布的草稿保存时不登记搜索建议更新"""
+        draft = Article.objects.get(pk=self.draft.pk)
+        draft.title = "Django 草稿（自动保存）"
+        with mock.patch.object(SearchSuggester, "schedule_update") as schedule_update:
+            with self.captureOnCommitCallbacks(execute=True):
+                draft.save()
+                Article.objects.create(title="新草稿", content="内容", author=self.user)
+        schedule_update.assert_not_called()
+
+    def test_updates_wait_for_commit_and_batch(self):
+        """测试事务提交后才登记，间隔内的多次修改合并为一次快照写入"""
+        suggester = get_search_suggester()
+        suggester.suggest("dja")
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.popular.title = "Django ORM 进阶"
+            self.popular.save()
+        self.assertEqual(suggester._pending, {})
+
+        with mock.patch("utils.search_suggest.UPDATE_INTERVAL", 3600):
+            for callback in callbacks:
+                callback()
+            self.assertEqual(self.texts("django orm"), ["Django ORM 进阶"])
+            with self.captureOnCommitCallbacks(execute=True):
+                self.quiet.title = "Django 新手入门"
+                self.quiet.save()
+                self.draft.status = Article.Status.PUBLISHED
+                self.draft.save()
+            self.assertEqual(set(suggester._pending), {self.quiet.pk, self.draft.pk})
+            # 查询不写入登记的修改，由间隔结束后的定时线程写入
+            self.assertNotIn("Django 新手入门", self.texts("dja"))
+            self.assertTrue(suggester._flush_timer.is_alive())
+
+            with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+                self.assertEqual(suggester.apply_pending_updates(), 2)
+            snapshot_writes = [call for call in cache_set.call_args_list if call.args[0] == suggester.snapshot_key]
+            self.assertEqual(len(snapshot_writes), 1)
+        self.assertIn("Django 新手入门", self.texts("dja"))
+        self.assertIn("Django 草稿", self.texts("dja"))
+
+    def test_locked_snapshot_keeps_pending_updates(self):
+        """测试其他进程正在修改快照时保留登记，不删除快照"""
+        suggester = get_search_suggester()
+        suggester.suggest("dja")
+        cache.add(suggester.lock_key, 1)
+        self.quiet.title = "Django 新手入门"
+        self.save(self.quiet)
+        self.assertEqual(set(suggester._pending), {self.quiet.pk})
+        self.assertIsNotNone(cache.get(suggester.snapshot_key))
+
+        cache.delete(suggester.lock_key)
+        self.assertEqual(suggester.apply_pending_updates(), 1)
+        self.assertIn("Django 新手入门", self.texts("dja"))
+
+    def test_reload_in_background(self):
+        """测试其他进程修改快照后先返回旧索引，后台加载完成后替换"""
+        suggester = get_search_suggester()
+        old_index = suggester.get_index()
+        Article.objects.filter(pk=self.quiet.pk).update(title="Flask 入门")
+        # 另一个进程登记并写入修改
+        SearchSuggester().schedule_update(self.quiet.pk)
+
+        suggester._check_at = 0.0  # 跳过版本检查间隔
+        with self.assertNumQueries(0):
+            self.assertIs(suggester.get_index(), old_index)
+        suggester._reload_thread.join(5)
+        self.assertEqual(self.texts("fla"), ["Flask 入门"])
+
+    def test_shared_snapshot(self):
+        """测试其他进程直接加载快照，不访问数据库"""
+        get_search_suggester().suggest("dja")
+        other = SearchSuggester()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.texts("dja", other), self.texts("dja"))
+
+    def test_popular_queries(self):
+        """测试搜索次数足够多的关键词进入建议"""
+        for _ in range(3):
+            self.client.get(reverse("article-search"), {"q": "Django 优化"})
+        self.client.get(reverse("article-search"), {"q": "django OR flask"})
+        get_search_suggester().invalidate()
+
+        suggestions = get_search_suggester().suggest("django ")
+        self.assertIn(("django 优化", "query"), [(item.text, item.kind) for item in suggestions])
+        self.assertNotIn("django or flask", [item.text for item in suggestions])
+
+    def test_suggest_api(self):
+        """测试搜索建议接口"""
+        response = self.client.get(self.url, {"q": "djang", "limit": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["suggestions"], [
+            {"text": "Django ORM 查询优化", "type": "title", "article_id": self.popular.pk},
+        ])
+        response = self.client.get(self.url, {"q": " "})
+        self.assertEqual(response.data["suggestions"], [])
+
+
+class SearchHighlighterTest(APITestCase):
+    """搜索结果高亮测试"""
+
+    def marked(self, text, highlights):
+        return [text[start:end] for start, end in highlights]
+
+    def test_find_keywords(self):
+        """测试一次扫描找出全部关键词：规范化匹配、前缀匹配整个单词、短语、NOT 查询词不高亮"""
+        highlighter = SearchHighlighter('djan* "rest api" 缓存 -flask')
+        text = "ＤＪＡＮＧＯ 和 DjangoREST 的 REST-api 缓存，不含 flask"
+        found = highlighter.find(text)
+        self.assertEqual(
+            [text[start:end] for start, end, _ in found],
+            ["ＤＪＡＮＧＯ", "DjangoREST", "REST-api", "缓存"],
+        )
+        self.assertEqual([keyword for _, _, keyword in found], ["djan", "djan", "restapi", "缓存"])
+        # 字段前缀只在对应字段中高亮
+        self.assertEqual(SearchHighlighter("title:redis", field="content").find("redis"), [])
+        self.assertEqual(len(SearchHighlighter("title:redis", field="title").find("redis")), 1)
+
+    def test_densest_window(self):
+        """测试摘要选择关键词种类最多的窗口，偏移指向摘要中的关键词"""
+        text = "Redis " + "填充内容。" * 100 + "Redis 和 Django 的缓存" + "。结尾" * 100
+        summary, highlights = SearchHighlighter("redis django").summarize(text, 60)
+        self.assertTrue(summary.startswith("...") and summary.endswith("..."))
+        self.assertLessEqual(len(summary), 66)
+        self.assertEqual(self.marked(summary, highlights), ["Redis", "Django"])
+
+    def test_multiple_snippets(self):
+        """测试多个片段覆盖不同的关键词，按原文顺序排列"""
+        text = "Redis 开头" + "填充" * 200 + "Django 中间" + "填充" * 200
+        snippets = SearchHighlighter("redis django").snippets(text, 40, max_snippets=2)
+        self.assertEqual(len(snippets), 2)
+        self.assertLess(snippets[0].end, snippets[1].start)
+        self.assertEqual(
+            [self.marked(snippet.text, snippet.highlights) for snippet in snippets],
+            [["Redis"], ["Django"]],
+        )
+
+    def test_safe_markup(self):
+        """测试转义原文，标记不会被截断"""
+        text = "<b>Redis</b> " + "很长的正文" * 100
+        html = SearchHighlighter.highlight_text(text, "redis", max_length=20)
+        self.assertTrue(html.startswith("&lt;b&gt;<mark>Redis</mark>&lt;/b&gt;"))
+        self.assertEqual(html.count("<mark>"), html.count("</mark>"))
+        self.assertEqual(mark("a<b", [(2, 3)]), "a&lt;<mark>b</mark>")
+
+    def test_search_results_summary(self):
+        """测试搜索结果返回关键词附近的摘要和高亮位置"""
+        user = User.objects.create_user(username="writer", email="writer@example.com", password="testpass123")
+        Article.objects.create(
+            title="缓存实践", content="前言" * 300 + "使用 Redis 做缓存", author=user, status=Article.Status.PUBLISHED,
+        )
+        response = self.client.get(reverse("article-search"), {"q": "redis 缓存"})
+        self.assertEqual(response.status_code, 200)
+        result = response.data["results"][0]
+        self.assertTrue(result["content_summary"].endswith("使用 Redis 做缓存"))
+        self.assertEqual(self.marked(result["content_summary"], result["highlights"]["content_summary"]), ["Redis", "缓存"])
+        self.assertEqual(self.marked(result["title"], result["highlights"]["title"]), ["缓存"])
+        self.assertEqual(result["highlights"]["author"], [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SearchHitsCacheTest(APITestCase):
+    """搜索命中缓存测试：缓存文章ID列表，结果由文章详情缓存组装"""
+
+    def setUp(self):
+        """设置测试数据"""
+        cache.clear()
+        self.user = User.objects.create_user(username="hits", email="hits@example.com", password="testpass123")
+        self.articles = [
+            Article.objects.create(
+                title=f"命中缓存 {i}", content=f"命中缓存的正文 {i}", author=self.user,
+                status=Article.Status.PUBLISHED, view_count=i,
+            )
+            for i in range(25)
+        ]
+        self.url = reverse("article-search")
+        self.params = {"q": "命中缓存", "ordering": "-view_count"}
+
+    def test_pages_share_hits(self):
+        """测试同一关键词的所有页共用一次搜索，其他页只查询本页未缓存的文章"""
+        first = self.client.get(self.url, {**self.params, "page": 1})
+        self.assertEqual(first.data["count"], 25)
+        self.assertEqual([item["id"] for item in first.data["results"]], [a.pk for a in self.articles[::-1][:10]])
+
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url, {**self.params, "page": 2})
+        self.assertEqual([item["id"] for item in second.data["results"]], [a.pk for a in self.articles[::-1][10:20]])
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {**self.params, "page": 2})
+
+    def test_rows_match_serializer(self):
+        """测试由详情缓存组装的结果与直接序列化文章一致"""
+        response = self.client.get(self.url, {**self.params, "page": 3})
+        article = self.articles[4]
+        expected = ArticleSearchSerializer(article, context={"search_query": "命中缓存"}).data
+        self.assertEqual(json.loads(json.dumps(response.data["results"][0])), json.loads(json.dumps(expected)))
+
+    def test_edit_refreshes_rows(self):
+        """测试文章修改后详情缓存被删除，缓存的命中列表不变但结果使用新内容"""
+        self.client.get(self.url, self.params)
+        article = self.articles[-1]
+        Article.objects.filter(pk=article.pk).update(content="改写后的命中缓存正文")
+        cache.delete(get_article_detail_cache_key(article.pk))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, self.params)
+        self.assertEqual(response.data["results"][0]["content_summary"], "改写后的命中缓存正文")
+
+        # 撤回的文章直接跳过
+        Article.objects.filter(pk=article.pk).update(status=Article.Status.DRAFT)
+        cache.delete(get_article_detail_cache_key(article.pk))
+        response = self.client.get(self.url, self.params)
+        self.assertNotIn(article.pk, [item["id"] for item in response.data["results"]])
+
+    @override_settings(SEARCH_MAX_CACHED_HITS=12)
+    def test_deep_page_beyond_cached_hits(self):
+        """测试超出缓存范围的页直接查询，总数仍然准确"""
+        response = self.client.get(self.url, {**self.params, "page": 3})
+        self.assertEqual(response.data["count"], 25)
+        self.assertEqual([item["id"] for item in response.data["results"]], [a.pk for a in self.articles[::-1][20:]])
+
+        response = self.client.get(self.url, {"q": "命中缓存", "page": 3})
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_view_count_ordering_uses_short_timeout(self):
+        """测试按访问次数排序的命中列表只缓存较短时间，其他排序使用搜索结果的缓存时间"""
+        with mock.patch.object(SearchCache, "get_or_compute", wraps=SearchCache.get_or_compute) as get_or_compute:
+            self.client.get(self.url, self.params)
+            self.client.get(self.url, {"q": "命中缓存", "ordering": "-created_at"})
+        timeouts = [call.args[2] for call in get_or_compute.call_args_list]
+        self.assertEqual(timeouts, [settings.CACHE_TIMEOUT["search_view_count"], None])
+
+    def test_search_hits_slicing(self):
+        """测试命中列表切片"""
+        hits = SearchHits([1, 2, 3], 5, fetch=lambda start, stop: list(range(start + 1, stop + 1)))
+        self.assertEqual(hits.count(), 5)
+        self.assertEqual(hits[0:2], [1, 2])
+        self.assertEqual(hits[2:5], [3, 4, 5])
+
+
 class SearchValidationTest(TestCase):
     """搜索参数验证测试"""
 
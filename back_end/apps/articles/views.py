@@ -2,24 +2,110 @@ from rest_framework import viewsets, permissions, generics
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from .models import Article
-from .serializers import ArticleSerializer, ArticleCreateUpdateSerializer, ArticleSearchSerializer
+from .serializers import (
+    ArticleSerializer,
+    ArticleCreateUpdateSerializer,
+    ArticleListSerializer,
+    ArticleSearchSerializer,
+)
 from utils.permissions import CanEditArticle
-from utils.search import SearchQueryBuilder, SearchCache, validate_search_params
-from django.db.models import Q
+from utils.search import SearchCache, SearchHits, validate_search_params
+from utils.search_query import compile_search_query, get_positive_terms, parse_search_query
+from utils.search_ranking import RELEVANCE_ORDERING, BM25Ranker, RankedResults, top_k
+from utils.search_suggest import SUGGEST_LIMIT, get_search_suggester
+from utils.view_counter import get_view_count_buffer
+from utils.trending import DEFAULT_TRENDING_WINDOW, TRENDING_WINDOWS, get_trending_engine
+from utils.pagination import KeysetPagination
+from utils.rendered_cache import (
+    RenderedJSONResponse,
+    accepts_rendered_json,
+    cached_json_response,
+    get_rendered_cache_key,
+    join_rendered_field,
+    join_rendered_fields,
+    split_rendered_field,
+    split_rendered_fields,
+)
+from utils.cache import (
+    ARTICLE_LIST_CACHE_PARAMS,
+    ARTICLE_SCOPE_PUBLISHED,
+    CacheGeneration,
+    ProtectedCache,
+    article_author_scope,
+    format_generations,
+    get_article_detail_cache_key,
+    get_article_list_scopes,
+    get_params_digest,
+)
+from utils.conditional import (
+    conditional_response,
+    get_content_etag,
+    get_not_modified_response,
+    make_etag,
+    set_validators,
+)
+from django.db.models import Q, Count
+from django.core.paginator import Paginator as DjangoPaginator, InvalidPage
 from guardian.shortcuts import assign_perm, get_perms
-from django.core.cache import cache
 from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+from collections import OrderedDict
+import bisect
 import hashlib
+import json
+import math
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from drf_spectacular.openapi import OpenApiParameter, OpenApiTypes
 
 
+# 热门文章数量
+HOT_ARTICLES_LIMIT = 10
+
+# 搜索建议输入的最大长度
+MAX_SUGGEST_QUERY_LENGTH = 50
+
+
+def build_article_detail_entry(instance, context):
+    """
+    生成文章详情缓存条目（缓存中保存数据库中的访问次数）
+
+    Args:
+        instance: 文章对象
+        context: 序列化器上下文
+
+    Returns:
+        dict: {'meta': {'id', 'status', 'author_id', 'updated_at'}, 'view_count': 数据库中的访问次数,
+               'parts': 在 view_count 处切开的预渲染字节, 'data': 无法切开时的序列化数据}
+    """
+    data = ArticleSerializer(instance, context=context).data
+    parts = split_rendered_field(data, 'view_count')
+    return {
+        'meta': {
+            'id': instance.pk,
+            'status': instance.status,
+            'author_id': instance.author_id,
+            'updated_at': instance.updated_at.timestamp(),
+        },
+        'view_count': data['view_count'],
+        'parts': parts,
+        'data': data if parts is None else None,
+    }
+
+
+def get_article_detail_data(entry):
+    """由详情缓存条目还原文章的序列化数据（view_count 为缓存中的值）"""
+    if entry['parts'] is None:
+        return entry['data']
+    return json.loads(join_rendered_field(entry['parts'], entry['view_count']))
+
+
 @extend_schema_view(
     list=extend_schema(
         tags=["文章管理"],
         summary="获取文章列表",
-        description="获取文章列表，支持分页。未登录用户只能看到已发布文章，登录用户可以看到自己的草稿",
-        responses={200: ArticleSerializer(many=True)}
+        description="获取文章列表，支持分页。未登录用户只能看到已发布文章，登录用户可以看到自己的草稿。列表只返回摘要，不包含正文",
+        responses={200: ArticleListSerializer(many=True)}
     ),
     create=extend_schema(
         tags=["文章管理"],
@@ -91,6 +177,7 @@ class ArticleViewSet(viewsets.ModelViewSet):
     #########################################
     queryset = Article.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, CanEditArticle]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """
@@ -114,37 +201,310 @@ class ArticleViewSet(viewsets.ModelViewSet):
         # 3. 有特殊权限的草稿文章
         base_filter = Q(author=user) | Q(status=Article.Status.PUBLISHED)
         return queryset.filter(base_filter)
+
+    def filter_queryset(self, queryset):
+        """列表只查询摘要等需要的列"""
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            queryset = ArticleListSerializer.setup_queryset(queryset)
+        return queryset
     
     def list(self, request, *args, **kwargs):
         """
         阶段10：重写list方法以实现文章列表缓存
+        已发布文章的分页结果对所有用户共享一份缓存，登录用户自己的草稿作为
+        个人叠加层单独缓存，响应时按创建时间合并，缓存占用只随页数增长而不随用户数增长
+        """
+        if self.paginator.is_cursor_request(request):
+            # 游标分页直接走索引范围查询，任意深度的页代价相同，不需要缓存
+            return super().list(request, *args, **kwargs)
+
+        user = request.user
+        overlay = []
+        if user.is_authenticated and user.is_staff:
+            audience, scopes = 'staff', get_article_list_scopes(user)
+        else:
+            overlay = self.get_draft_overlay(user) if user.is_authenticated else []
+            audience, scopes = 'published', [ARTICLE_SCOPE_PUBLISHED]
+
+        if overlay or not accepts_rendered_json(request):
+            # 有草稿的用户每页内容各不相同，只使用共享分页和叠加层的缓存，不缓存整页字节
+            page = self.get_list_page(request, overlay)
+            return Response(self.get_list_data(request, page))
+
+        # 整页响应体按可见范围（所有没有草稿的用户共享）和规范化参数缓存为预渲染字节，
+        # 分页链接来自请求 URL，在字节中预留位置，每次请求拼接
+        generations = CacheGeneration.get_many(scopes)
+        cache_key = get_rendered_cache_key(
+            f"{settings.CACHE_KEY_PREFIX}:articles:list:gen:{format_generations(generations)}:{audience}"
+            f":params:{get_params_digest(request.query_params, ARTICLE_LIST_CACHE_PARAMS)}"
+        )
+        cache_timeout = settings.CACHE_TIMEOUT.get('article_list', 86400)
+        entry = ProtectedCache.get_or_compute(
+            cache_key,
+            lambda: self.build_rendered_page(request),
+            cache_timeout,
+        )
+        body = join_rendered_fields(entry['parts'], self.get_page_links(request, entry['page'], entry['has_next']))
+        # 强校验值直接由响应体计算，内容未变化时返回304
+        return conditional_response(request, RenderedJSONResponse(body), etag=get_content_etag(body))
+
+    def build_rendered_page(self, request):
+        """生成整页的预渲染缓存条目：在 next、previous 处切开的字节和页码信息"""
+        page = self.get_list_page(request)
+        data = self.get_list_data(request, page, links=(None, None))
+        return {
+            'parts': split_rendered_fields(data, ['next', 'previous']),
+            'page': page['page'],
+            'has_next': page['has_next'],
+        }
+
+    def get_list_data(self, request, page, links=None):
+        """
+        由页面信息生成响应数据
+
+        Args:
+            page: get_list_page() 的结果
+            links: (next, previous)，默认由请求 URL 生成
+
+        Returns:
+            OrderedDict: {'count', 'next', 'previous', 'results'}
+        """
+        next_url, previous_url = links or self.get_page_links(request, page['page'], page['has_next'])
+        return OrderedDict([
+            ('count', page['count']),
+            ('next', next_url),
+            ('previous', previous_url),
+            ('results', page['results']),
+        ])
+
+    def get_page_links(self, request, page_number, has_next):
+        """由当前请求 URL 生成上一页、下一页链接"""
+        url = request.build_absolute_uri()
+        next_url = None
+        if has_next:
+            next_url = replace_query_param(url, self.paginator.page_query_param, page_number + 1)
+        previous_url = None
+        if page_number > 1:
+            previous_url = (
+                remove_query_param(url, self.paginator.page_query_param)
+                if page_number == 2
+                else replace_query_param(url, self.paginator.page_query_param, page_number - 1)
+            )
+        return next_url, previous_url
+
+    def get_list_page(self, request, overlay=None):
+        """
+        获取页码分页的一页文章
+
+        Args:
+            overlay: 当前用户的草稿叠加层
+
+        Returns:
+            dict: {'count', 'page': 页码, 'has_next', 'results'}
+        """
+        user = request.user
+        if user.is_authenticated and user.is_staff:
+            # 管理员可以看到所有文章，单独缓存（所有管理员共享）
+            return self.list_all(request)
+
+        page_size = self.paginator.get_page_size(request)
+        overlay = overlay or []
+
+        page_number = request.query_params.get(self.paginator.page_query_param, 1)
+        if page_number in self.paginator.last_page_strings:
+            total = self.get_published_page(1, page_size)['count'] + len(overlay)
+            page_number = max(1, math.ceil(total / page_size))
+        try:
+            page_number = int(page_number)
+            if page_number < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.paginator.invalid_page_message.format(
+                page_number=page_number, message='页码必须是正整数'
+            ))
+
+        start = (page_number - 1) * page_size
+        if overlay:
+            count, results = self.merge_draft_overlay(overlay, start, page_size)
+        else:
+            page = self.get_published_page(page_number, page_size)
+            count, results = page['count'], page['results']
+
+        if start and start >= count:
+            raise NotFound(self.paginator.invalid_page_message.format(
+                page_number=page_number, message='该页没有结果'
+            ))
+        return {'count': count, 'page': page_number, 'has_next': start + page_size < count, 'results': results}
+
+    def list_all(self, request):
         """
-        # 生成缓存键，考虑用户的认证状态和查询参数
+        管理员文章列表的一页（包含所有草稿），按全部文章的代际值缓存
+        """
+        generations = CacheGeneration.get_many(get_article_list_scopes(request.user))
         cache_key_parts = [
             f"{settings.CACHE_KEY_PREFIX}:articles:list",
-            f"user:{request.user.id if request.user.is_authenticated else 'anonymous'}",
-            f"params:{hashlib.md5(str(request.query_params).encode()).hexdigest()}"
+            f"gen:{format_generations(generations)}",
+            "user:staff",
+            f"params:{get_params_digest(request.query_params, ARTICLE_LIST_CACHE_PARAMS)}"
         ]
         cache_key = ":".join(cache_key_parts)
         
-        # 尝试从缓存获取数据
-        cached_response = cache.get(cache_key)
-        if cached_response is not None:
-            return Response(cached_response)
-        
-        # 如果缓存未命中，执行正常的列表查询
-        response = super().list(request, *args, **kwargs)
-        
-        # 将响应数据存入缓存
-        cache_timeout = settings.CACHE_TIMEOUT.get('article_list', 600)
-        cache.set(cache_key, response.data, timeout=cache_timeout)
-        
-        return response
+        # 缓存未命中时执行正常的列表查询（同一时刻只有一个请求查询）
+        cache_timeout = settings.CACHE_TIMEOUT.get('article_list', 86400)
+        return ProtectedCache.get_or_compute(cache_key, lambda: self.build_all_page(request), cache_timeout)
+
+    def build_all_page(self, request):
+        """查询并序列化管理员文章列表的一页"""
+        object_list = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        results = self.get_serializer(object_list, many=True).data
+        page = self.paginator.page
+        return {
+            'count': page.paginator.count,
+            'page': page.number,
+            'has_next': page.has_next(),
+            'results': results,
+        }
+
+    def get_published_page(self, page_number, page_size):
+        """
+        获取已发布文章的一页（所有用户共享的缓存段）
+
+        Args:
+            page_number: 页码（从1开始）
+            page_size: 每页数量
+
+        Returns:
+            dict: {'count': 已发布文章总数, 'results': 该页序列化数据}，超出范围的页返回空结果
+        """
+        generation = CacheGeneration.get(ARTICLE_SCOPE_PUBLISHED)
+        cache_key = (
+            f"{settings.CACHE_KEY_PREFIX}:articles:list:published"
+            f":gen:{generation}:size:{page_size}:page:{page_number}"
+        )
+        cache_timeout = settings.CACHE_TIMEOUT.get('article_list', 86400)
+        return ProtectedCache.get_or_compute(
+            cache_key,
+            lambda: self.build_published_page(page_number, page_size),
+            cache_timeout,
+        )
+
+    def build_published_page(self, page_number, page_size):
+        """查询并序列化已发布文章的一页"""
+        queryset = ArticleListSerializer.setup_queryset(
+            Article.objects.filter(status=Article.Status.PUBLISHED)
+        ).order_by('-created_at', '-id')
+        paginator = DjangoPaginator(queryset, page_size)
+        try:
+            object_list = paginator.page(page_number).object_list
+        except InvalidPage:
+            object_list = []
+
+        serializer = ArticleListSerializer(object_list, many=True, context=self.get_serializer_context())
+        return {'count': paginator.count, 'results': serializer.data}
+
+    def get_draft_overlay(self, user):
+        """
+        获取用户自己的草稿叠加层
+
+        每篇草稿记录它在已发布文章序列中的位置（比它更新的已发布文章数量），
+        合并时据此直接计算草稿在最终列表中的下标，无需比较时间
+
+        Args:
+            user: 当前登录用户
+
+        Returns:
+            list: [{'rank': 位置, 'data': 序列化数据}, ...]，按创建时间倒序
+        """
+        generations = CacheGeneration.get_many([ARTICLE_SCOPE_PUBLISHED, article_author_scope(user.pk)])
+        cache_key = (
+            f"{settings.CACHE_KEY_PREFIX}:articles:list:drafts"
+            f":user:{user.pk}:gen:{format_generations(generations)}"
+        )
+        cache_timeout = settings.CACHE_TIMEOUT.get('article_list', 86400)
+        return ProtectedCache.get_or_compute(cache_key, lambda: self.build_draft_overlay(user), cache_timeout)
+
+    def build_draft_overlay(self, user):
+        """查询用户的草稿并计算每篇草稿在已发布文章序列中的位置"""
+        drafts = list(
+            ArticleListSerializer.setup_queryset(
+                Article.objects.filter(author=user, status=Article.Status.DRAFT)
+            ).order_by('-created_at', '-id')
+        )
+        overlay = []
+        if drafts:
+            newer_than = {
+                f"rank_{index}": Count(
+                    'pk',
+                    filter=Q(created_at__gt=draft.created_at) | Q(created_at=draft.created_at, pk__gt=draft.pk),
+                )
+                for index, draft in enumerate(drafts)
+            }
+            ranks = Article.objects.filter(status=Article.Status.PUBLISHED).aggregate(**newer_than)
+            serializer = ArticleListSerializer(drafts, many=True, context=self.get_serializer_context())
+            overlay = [
+                {'rank': ranks[f"rank_{index}"], 'data': data}
+                for index, data in enumerate(serializer.data)
+            ]
+        return overlay
+
+    def merge_draft_overlay(self, overlay, start, page_size):
+        """
+        把草稿叠加层与共享的已发布文章合并，取出合并后列表的 [start, start + page_size) 部分
+
+        第 j 篇草稿在合并列表中的下标为 j + rank，其余位置依次由已发布文章填充
+
+        Returns:
+            tuple: (合并后的总数, 该页序列化数据)
+        """
+        positions = [index + item['rank'] for index, item in enumerate(overlay)]
+        end = start + page_size
+
+        # 页内第一篇已发布文章在已发布序列中的下标，以及页内需要的已发布文章数量
+        first_published = start - bisect.bisect_left(positions, start)
+        drafts_in_page = bisect.bisect_left(positions, end) - bisect.bisect_left(positions, start)
+        published = self.get_published_range(first_published, page_size - drafts_in_page, page_size)
+
+        count = published['count'] + len(overlay)
+        results = []
+        draft_index = bisect.bisect_left(positions, start)
+        published_rows = iter(published['results'])
+        for position in range(start, min(end, count)):
+            if draft_index < len(positions) and positions[draft_index] == position:
+                results.append(overlay[draft_index]['data'])
+                draft_index += 1
+            else:
+                results.append(next(published_rows))
+        return count, results
+
+    def get_published_range(self, offset, limit, page_size):
+        """
+        从共享缓存段中取出已发布文章的 [offset, offset + limit) 部分
+
+        Returns:
+            dict: {'count': 已发布文章总数, 'results': 序列化数据}
+        """
+        first_page = offset // page_size + 1
+        last_page = max(first_page, (offset + limit - 1) // page_size + 1)
+        rows = []
+        count = 0
+        for page_number in range(first_page, last_page + 1):
+            page = self.get_published_page(page_number, page_size)
+            count = page['count']
+            rows.extend(page['results'])
+        skip = offset - (first_page - 1) * page_size
+        return {'count': count, 'results': rows[skip:skip + limit]}
+
+    def get_cursor_ordering(self):
+        """游标分页的排序字段，对应 (status, -created_at) 索引"""
+        return ['-created_at']
 
     def get_serializer_class(self):
         """根据操作类型选择序列化器"""
         if self.action in ["update", "partial_update"]:
             return ArticleCreateUpdateSerializer
+        if self.action == "list":
+            return ArticleListSerializer
         return ArticleSerializer
 
     def perform_create(self, serializer):
@@ -162,46 +522,90 @@ class ArticleViewSet(viewsets.ModelViewSet):
 
         return article
 
+    def perform_authentication(self, request):
+        """
+        匿名访问详情接口时延迟认证：已发布文章的缓存命中不需要加载用户；
+        带有 Authorization 头的请求仍然立即认证，无效或过期的令牌总是返回401，
+        与是否命中缓存无关
+        """
+        if self.action == 'retrieve' and 'HTTP_AUTHORIZATION' not in request.META:
+            return
+        super().perform_authentication(request)
+
     def retrieve(self, request, *args, **kwargs):
         """
         阶段9：重写retrieve方法以实现文章访问统计
         阶段10：添加文章详情缓存
         每次获取文章详情时，增加访问计数
+        访问计数只写入缓冲区，由后台刷新器批量写回数据库，
+        返回的 view_count 为数据库值加上待刷新增量
+        缓存条目中同时保存文章的状态和作者，缓存命中时直接据此判断访问权限，
+        已发布文章的缓存命中不产生任何数据库查询；
+        响应体以预渲染字节缓存，命中时只需把最新的 view_count 拼接进去；
+        校验值由更新时间和状态计算，客户端的缓存仍然有效时不拼接响应体，直接返回304
         """
         # 生成缓存键
-        cache_key = f"{settings.CACHE_KEY_PREFIX}:article:detail:{kwargs.get('pk')}"
-        
-        # 尝试从缓存获取数据
-        cached_article = cache.get(cache_key)
-        if cached_article is not None:
-            # 如果是从缓存获取的，仍然需要增加访问计数
-            instance = self.get_object()
-            if instance.status == Article.Status.PUBLISHED:
-                from django.db.models import F
-                Article.objects.filter(pk=instance.pk).update(
-                    view_count=F('view_count') + 1
-                )
-            return Response(cached_article)
+        cache_key = get_article_detail_cache_key(kwargs.get('pk'))
+        view_counter = get_view_count_buffer()
         
-        instance = self.get_object()
-        
-        # 只有当文章是已发布状态时才增加访问计数
-        if instance.status == Article.Status.PUBLISHED:
-            # 使用F表达式来避免竞态条件
-            from django.db.models import F
-            Article.objects.filter(pk=instance.pk).update(
-                view_count=F('view_count') + 1
-            )
-            # 重新获取更新后的实例，确保返回最新的view_count
-            instance.refresh_from_db()
-        
-        serializer = self.get_serializer(instance)
-        
-        # 将文章详情存入缓存
+        # 从缓存获取文章详情及其可见性信息，未命中时只有一个请求查询数据库
         cache_timeout = settings.CACHE_TIMEOUT.get('article_detail', 1800)
-        cache.set(cache_key, serializer.data, timeout=cache_timeout)
-        
-        return Response(serializer.data)
+        cached_entry = ProtectedCache.get_or_compute(cache_key, self.build_detail_entry, cache_timeout)
+        if not self.can_view_cached_article(cached_entry['meta']):
+            # 缓存中的草稿对当前用户不可见，走正常流程返回404
+            cached_entry = self.build_detail_entry()
+        meta = cached_entry['meta']
+
+        # view_count 每次请求都会变化，因此使用弱校验值
+        etag = make_etag('article', meta['id'], meta['updated_at'], meta['status'], weak=True)
+        last_modified = int(meta['updated_at'])
+        not_modified = get_not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            # 客户端重新验证缓存也是一次访问
+            if meta['status'] == Article.Status.PUBLISHED:
+                view_counter.incr(meta['id'])
+            return not_modified
+
+        # 只有当文章是已发布状态时才增加访问计数（只写缓冲区，不写数据库）
+        if meta['status'] == Article.Status.PUBLISHED:
+            view_count = view_counter.incr_and_get(meta['id'], cached_entry['view_count'])
+        else:
+            view_count = view_counter.get_view_count(meta['id'], cached_entry['view_count'])
+
+        parts = cached_entry['parts']
+        if parts is None:
+            # 无法预留位置时缓存条目中保存的是序列化数据
+            response = Response({**cached_entry['data'], 'view_count': view_count})
+        else:
+            body = join_rendered_field(parts, view_count)
+            if accepts_rendered_json(request):
+                response = RenderedJSONResponse(body)
+            else:
+                response = Response(json.loads(body))
+        return set_validators(response, etag, last_modified)
+
+    def build_detail_entry(self):
+        """查询文章并生成详情缓存条目（见 build_article_detail_entry）"""
+        return build_article_detail_entry(self.get_object(), self.get_serializer_context())
+
+    def can_view_cached_article(self, meta):
+        """
+        根据缓存的可见性信息判断当前用户能否查看文章，规则与 get_queryset 一致
+
+        Args:
+            meta: 缓存条目中的 {'id', 'status', 'author_id'}
+
+        Returns:
+            bool: 是否可以查看
+        """
+        if meta['status'] == Article.Status.PUBLISHED:
+            return True
+
+        # 草稿只有作者和管理员可见，此时才需要认证用户
+        user = self.request.user
+        if not user.is_authenticated:
+            return False
+        return user.is_staff or user.pk == meta['author_id']
 
     def perform_destroy(self, instance):
         """
@@ -250,58 +654,81 @@ class ArticleViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         """
         阶段10：更新文章时清除相关缓存
+        详情缓存的删除和列表/搜索/热门缓存的代际失效由 signals.article_saved 完成
         """
         article = serializer.save()
-        
-        # 清除文章详情缓存
-        cache_key = f"{settings.CACHE_KEY_PREFIX}:article:detail:{article.pk}"
-        cache.delete(cache_key)
-        ##########################################################
-        # 清除文章列表缓存（使用模式匹配删除所有相关的列表缓存）         #
-        # 注意：默认的缓存后端可能不支持模式删除，这里简单处理           #
-        # 在生产环境中，可以使用Redis的SCAN命令来查找并删除匹配的键     #
-        ##########################################################
         return article
     
     def perform_destroy(self, instance):
         """
         删除文章时清理相关权限和缓存
-        阶段10：添加缓存清理
+        阶段10：缓存失效由 signals.article_deleted 完成
         """
-        # 清除文章详情缓存
-        cache_key = f"{settings.CACHE_KEY_PREFIX}:article:detail:{instance.pk}"
-        cache.delete(cache_key)
-        
         # 删除文章前清理所有相关的对象权限
         # Guardian会自动清理
         super().perform_destroy(instance)
     
+    @extend_schema(
+        tags=["文章管理"],
+        summary="热门文章",
+        description="按时间衰减的热度返回热门文章，热度由访问和评论增量更新",
+        parameters=[
+            OpenApiParameter(
+                name="window",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="热度窗口：24h(近一天)、7d(近一周)、all(全部)",
+                enum=["24h", "7d", "all"]
+            )
+        ],
+        responses={200: ArticleListSerializer(many=True)}
+    )
     @action(detail=False, methods=['get'])
     def hot_articles(self, request):
         """
-        阶段10：获取热门文章列表（按访问次数排序）
-        使用缓存优化性能
+        阶段10：获取热门文章列表
+        排名来自 Redis 有序集合的 top-k 查询，Redis 不可用或数据不足时由数据库补足；
+        序列化结果和预渲染的响应体按排名缓存，排名不变时不查询数据库也不渲染
         """
-        cache_key = f"{settings.CACHE_KEY_PREFIX}:hot_articles"
-        
-        # 尝试从缓存获取热门文章
-        cached_articles = cache.get(cache_key)
-        if cached_articles is not None:
-            return Response(cached_articles)
-        
-        # 获取访问量最高的10篇已发布文章(感觉这个其实也可以移到环境变量, 不过没差)
-        hot_articles = Article.objects.filter(
-            status=Article.Status.PUBLISHED
-        ).select_related('author').order_by('-view_count')[:10]
-        
-        serializer = ArticleSerializer(hot_articles, many=True)
+        window = request.query_params.get('window', DEFAULT_TRENDING_WINDOW)
+        if window not in TRENDING_WINDOWS:
+            return Response({
+                'error': f"无效的热度窗口，支持的窗口：{', '.join(TRENDING_WINDOWS)}"
+            }, status=400)
+
+        ranked_ids = get_trending_engine().top(window, HOT_ARTICLES_LIMIT) or []
+
+        generation = CacheGeneration.get(ARTICLE_SCOPE_PUBLISHED)
+        ranking = hashlib.md5(','.join(map(str, ranked_ids)).encode()).hexdigest()
+        cache_key = f"{settings.CACHE_KEY_PREFIX}:hot_articles:{window}:gen:{generation}:rank:{ranking}"
         
-        # 将热门文章存入缓存
         cache_timeout = settings.CACHE_TIMEOUT.get('hot_articles', 3600)
-        cache.set(cache_key, serializer.data, timeout=cache_timeout)
-        
-        return Response(serializer.data)
+        return cached_json_response(
+            request,
+            get_rendered_cache_key(cache_key),
+            lambda: ProtectedCache.get_or_compute(
+                cache_key,
+                lambda: self.build_hot_articles(window, ranked_ids),
+                cache_timeout,
+            ),
+            cache_timeout,
+        )
 
+    def build_hot_articles(self, window, ranked_ids):
+        """按排名查询并序列化热门文章，排名不足时由数据库补足"""
+        engine = get_trending_engine()
+        article_ids = list(ranked_ids)
+        if len(article_ids) < HOT_ARTICLES_LIMIT:
+            article_ids += engine.fallback_ids(window, HOT_ARTICLES_LIMIT - len(article_ids), exclude=article_ids)
+
+        articles = ArticleListSerializer.setup_queryset(
+            Article.objects.filter(status=Article.Status.PUBLISHED)
+        ).in_bulk(article_ids)
+        hot_articles = [articles[pk] for pk in article_ids if pk in articles]
+        
+        serializer = ArticleListSerializer(hot_articles, many=True)
+        return serializer.data
 
 @extend_schema(
     tags=["文章管理"],
@@ -328,8 +755,8 @@ class ArticleViewSet(viewsets.ModelViewSet):
             type=OpenApiTypes.STR,
             location=OpenApiParameter.QUERY,
             required=False,
-            description="排序方式：-created_at(最新)、created_at(最早)、-view_count(最热)、view_count(最冷)、title(标题A-Z)、-title(标题Z-A)",
-            enum=["-created_at", "created_at", "-view_count", "view_count", "title", "-title"]
+            description="排序方式：relevance(最相关，默认)、-created_at(最新)、created_at(最早)、-view_count(最热)、view_count(最冷)、title(标题A-Z)、-title(标题Z-A)；relevance 不支持游标分页",
+            enum=["relevance", "-created_at", "created_at", "-view_count", "view_count", "title", "-title"]
         ),
         OpenApiParameter(
             name="page",
@@ -355,6 +782,7 @@ class ArticleSearchView(generics.ListAPIView):
     支持按标题、内容、作者搜索
     """
     serializer_class = ArticleSearchSerializer
+    pagination_class = KeysetPagination
     permission_classes = [permissions.AllowAny]  # 搜索功能对所有用户开放(但其实有被cc的隐患, 这玩意还听池性能的)
 
     def get_queryset(self):
@@ -368,37 +796,123 @@ class ArticleSearchView(generics.ListAPIView):
         # 获取搜索参数
         query = self.request.query_params.get('q', '').strip()
         search_type = self.request.query_params.get('type', 'all')
-        ordering = self.request.query_params.get('ordering', '-created_at')
+        ordering = self.request.query_params.get('ordering', RELEVANCE_ORDERING)
 
         # 验证搜索参数
         is_valid, error_msg = validate_search_params(query, search_type, ordering)
         if not is_valid:
             return queryset.none()
 
-        # 使用搜索查询构建器
-        search_builder = SearchQueryBuilder(Article)
-
-        # 根据搜索类型添加搜索条件
-        if search_type == 'all':
-            search_fields = ['title', 'content', 'author__username']
-        elif search_type == 'title':
-            search_fields = ['title']
-        elif search_type == 'content':
-            search_fields = ['content']
-        elif search_type == 'author':
-            search_fields = ['author__username']
-        else:
-            search_fields = ['title', 'content', 'author__username']
+        # 解析查询语法后按选择性从高到低执行；标题和正文通过全文索引查询（见 SEARCH_BACKEND），
+        # 不再对正文执行 LIKE '%q%' 全表扫描
+        queryset = compile_search_query(query, self.get_search_fields(search_type)).filter(queryset)
 
-        search_builder.add_text_search(query, search_fields)
-        search_conditions = search_builder.build()
+        # 应用排序（相关度排序在 get_hits 中进行），id 作为决胜字段保证分页稳定
+        if ordering != RELEVANCE_ORDERING:
+            queryset = queryset.order_by(ordering, f"{'-' if ordering.startswith('-') else ''}id")
 
-        queryset = queryset.filter(search_conditions)
+        return queryset
 
-        # 应用排序
-        queryset = queryset.order_by(ordering)
+    def get_search_fields(self, search_type):
+        """根据搜索类型确定搜索字段"""
+        if search_type == 'title':
+            return ['title']
+        if search_type == 'content':
+            return ['content']
+        if search_type == 'author':
+            return ['author']
+        return ['title', 'content', 'author']
+
+    def get_ranked_results(self, queryset):
+        """按 BM25 分数排序的搜索结果（只按未被 NOT 排除的词计算相关度）"""
+        params = self.request.query_params
+        terms = get_positive_terms(parse_search_query(params.get('q', '')))
+        ranker = BM25Ranker(' '.join(term.text for term in terms), self.get_search_fields(params.get('type', 'all')))
+        return RankedResults(queryset, ranker)
+
+    def get_hits(self):
+        """
+        执行搜索，返回排在前面的文章ID和命中总数（缓存值）
 
-        return queryset
+        Returns:
+            dict: {'ids': 按排序排列的前 SEARCH_MAX_CACHED_HITS 个文章ID, 'count': 命中总数}
+        """
+        limit = settings.SEARCH_MAX_CACHED_HITS
+        queryset = self.get_queryset()
+        if self.request.query_params.get('ordering', RELEVANCE_ORDERING) == RELEVANCE_ORDERING:
+            results = self.get_ranked_results(queryset)
+            return {'ids': top_k(results.scores, limit), 'count': results.count()}
+        ids = list(queryset.values_list('id', flat=True)[:limit])
+        return {'ids': ids, 'count': len(ids) if len(ids) < limit else queryset.count()}
+
+    def fetch_hits(self, start, stop):
+        """查询超出缓存范围的深分页的文章ID"""
+        queryset = self.get_queryset()
+        if self.request.query_params.get('ordering', RELEVANCE_ORDERING) == RELEVANCE_ORDERING:
+            return [article.pk for article in self.get_ranked_results(queryset)[start:stop]]
+        return queryset.values_list('id', flat=True)[start:stop]
+
+    def get_page_ids(self, request):
+        """
+        获取当前页的文章ID
+
+        页码分页时从缓存的命中列表中切片（同一关键词的所有页共用一次搜索）；
+        游标分页按索引做范围查询，只取排序需要的列
+        """
+        if self.paginator.is_cursor_request(request):
+            ordering = request.query_params.get('ordering', RELEVANCE_ORDERING)
+            queryset = self.get_queryset().select_related(None).only('id', ordering.lstrip('-'))
+            return [article.pk for article in self.paginate_queryset(queryset)]
+
+        # 只搜索已发布文章，代际值随已发布文章的变化而更新
+        generation = CacheGeneration.get(ARTICLE_SCOPE_PUBLISHED)
+        cache_key = SearchCache.get_hits_cache_key(
+            request.query_params.get('q', '').strip(),
+            request.query_params.get('type', 'all'),
+            request.query_params.get('ordering', RELEVANCE_ORDERING),
+            generation=generation,
+        )
+        # 访问计数写回不更新代际值，按访问次数排序的结果只缓存较短时间
+        timeout = None
+        if request.query_params.get('ordering', RELEVANCE_ORDERING).lstrip('-') == 'view_count':
+            timeout = settings.CACHE_TIMEOUT.get('search_view_count', 60)
+        # 规范化后不同写法的关键词共用同一个缓存；同一时刻只有一个请求执行搜索
+        hits = SearchCache.get_or_compute(cache_key, self.get_hits, timeout)
+        return list(self.paginate_queryset(SearchHits(hits['ids'], hits['count'], fetch=self.fetch_hits)))
+
+    def hydrate(self, ids):
+        """
+        由文章ID生成搜索结果
+
+        正文等字段取自文章详情缓存（文章修改时该缓存被删除，搜索结果不会过时），
+        未缓存的文章用一次 id__in 查询取出并写入详情缓存；已不再发布的文章被跳过
+
+        Args:
+            ids (list): 当前页的文章ID
+
+        Returns:
+            list: 与 ArticleSearchSerializer 格式相同的搜索结果
+        """
+        keys = {pk: get_article_detail_cache_key(pk) for pk in ids}
+        cached = ProtectedCache.get_many(keys.values())
+        entries = {pk: cached[key] for pk, key in keys.items() if key in cached}
+        missing = [pk for pk in ids if pk not in entries]
+        if missing:
+            context = self.get_serializer_context()
+            articles = Article.objects.filter(pk__in=missing).select_related('author')
+            loaded = {article.pk: build_article_detail_entry(article, context) for article in articles}
+            ProtectedCache.set_many(
+                {keys[pk]: entry for pk, entry in loaded.items()},
+                settings.CACHE_TIMEOUT.get('article_detail', 1800),
+            )
+            entries.update(loaded)
+
+        serializer = self.get_serializer()
+        return [
+            serializer.represent_detail(get_article_detail_data(entries[pk]))
+            for pk in ids
+            if pk in entries and entries[pk]['meta']['status'] == Article.Status.PUBLISHED
+        ]
 
     def list(self, request, *args, **kwargs):
         """
@@ -407,11 +921,13 @@ class ArticleSearchView(generics.ListAPIView):
         # 获取搜索参数
         query = request.query_params.get('q', '').strip()
         search_type = request.query_params.get('type', 'all')
-        ordering = request.query_params.get('ordering', '-created_at')
+        ordering = request.query_params.get('ordering', RELEVANCE_ORDERING)
         page = request.query_params.get('page', '1')
 
         # 验证搜索参数
         is_valid, error_msg = validate_search_params(query, search_type, ordering)
+        if is_valid and ordering == RELEVANCE_ORDERING and self.paginator.is_cursor_request(request):
+            is_valid, error_msg = False, "相关度排序不支持游标分页，请使用页码分页或其他排序方式"
         if not is_valid:
             return Response({
                 'error': error_msg,
@@ -419,27 +935,84 @@ class ArticleSearchView(generics.ListAPIView):
                 'count': 0
             }, status=400)
 
-        # 生成缓存键
-        cache_key = SearchCache.get_cache_key(query, search_type, ordering, page)
-
-        # 尝试从缓存获取搜索结果
-        cached_response = SearchCache.get_cached_result(cache_key)
-        if cached_response is not None:
-            return Response(cached_response)
-
-        # 执行搜索
-        response = super().list(request, *args, **kwargs)
-
-        # 添加搜索统计信息
-        if hasattr(response, 'data') and isinstance(response.data, dict):
-            response.data['search_info'] = {
-                'query': query,
-                'search_type': search_type,
-                'ordering': ordering,
-                'total_results': response.data.get('count', 0)
-            }
+        # 第一页的搜索计入热门关键词（用于搜索建议）
+        if page == '1' and not request.query_params.get('cursor'):
+            get_search_suggester().record_query(query)
+
+        # 缓存中只保存命中的文章ID，每页的结果由文章详情缓存组装
+        ids = self.get_page_ids(request)
+        data = dict(self.get_paginated_response(self.hydrate(ids)).data)
+
+        # 添加搜索统计信息（回显原始关键词）
+        data['search_info'] = self.get_search_info(query, search_type, ordering, data)
+        return Response(data)
+
+    def get_cursor_ordering(self):
+        """游标分页使用请求中的排序方式，id 作为决胜字段由分页器追加"""
+        return [self.request.query_params.get('ordering', RELEVANCE_ORDERING)]
+
+    def get_search_info(self, query, search_type, ordering, data):
+        """构建搜索统计信息"""
+        return {
+            'query': query,
+            'search_type': search_type,
+            'ordering': ordering,
+            'total_results': data.get('count', 0)
+        }
 
-        # 将搜索结果存入缓存
-        SearchCache.cache_result(cache_key, response.data)
 
-        return response
+@extend_schema(
+    tags=["文章管理"],
+    summary="搜索建议",
+    description="根据输入的前缀返回文章标题、作者用户名和热门搜索关键词，用于搜索框输入联想",
+    parameters=[
+        OpenApiParameter(
+            name="q",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            required=True,
+            description="已输入的内容（前缀）"
+        ),
+        OpenApiParameter(
+            name="limit",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.QUERY,
+            required=False,
+            description=f"返回数量，默认{SUGGEST_LIMIT}，最多20"
+        ),
+    ],
+    responses={
+        200: {
+            "description": "搜索建议",
+            "example": {
+                "query": "dja",
+                "suggestions": [
+                    {"text": "Django数据库优化", "type": "title", "article_id": 1},
+                    {"text": "django", "type": "query", "article_id": None},
+                ]
+            }
+        }
+    }
+)
+class ArticleSuggestView(generics.GenericAPIView):
+    """
+    搜索建议视图
+    前缀查询在进程内的有序数组上完成，不访问数据库
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '')[:MAX_SUGGEST_QUERY_LENGTH]
+        try:
+            limit = int(request.query_params.get('limit', SUGGEST_LIMIT))
+        except ValueError:
+            limit = SUGGEST_LIMIT
+
+        suggestions = get_search_suggester().suggest(query, limit) if query.strip() else []
+        return Response({
+            'query': query,
+            'suggestions': [
+                {'text': item.text, 'type': item.kind, 'article_id': item.article_id}
+                for item in suggestions
+            ],
+        })
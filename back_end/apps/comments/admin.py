@@ -1,10 +1,13 @@
 from django.contrib import admin
+from django.db import transaction
 from django.utils.html import format_html
 from django.urls import reverse
 from guardian.admin import GuardedModelAdmin
 from guardian.shortcuts import get_users_with_perms
-from .models import Comment, CommentUserObjectPermission, CommentGroupObjectPermission
+from .models import Comment, CommentUserObjectPermission, CommentGroupObjectPermission, SensitiveWord
 from utils.permission_manager import CommentPermissionManager
+from utils.cache import invalidate_comment_caches
+from utils.sensitive_words import get_sensitive_word_dictionary
 
 
 class CommentTypeFilter(admin.SimpleListFilter):
@@ -199,19 +202,28 @@ class CommentAdmin(GuardedModelAdmin):
 
     def approve_comments(self, request, queryset):
         """批量审核通过评论"""
+        article_ids = set(queryset.values_list('article_id', flat=True))
         count = queryset.update(status='approved')
+        # 批量 update 不会触发信号，手动更新评论列表校验值
+        invalidate_comment_caches(*article_ids)
         self.message_user(request, f'成功审核通过 {count} 条评论。')
     approve_comments.short_description = '批量审核通过'
 
     def reject_comments(self, request, queryset):
         """批量拒绝评论"""
+        article_ids = set(queryset.values_list('article_id', flat=True))
         count = queryset.update(status='rejected')
+        # 批量 update 不会触发信号，手动更新评论列表校验值
+        invalidate_comment_caches(*article_ids)
         self.message_user(request, f'成功拒绝 {count} 条评论。')
     reject_comments.short_description = '批量拒绝评论'
 
     def reset_to_pending(self, request, queryset):
         """重置为待审核状态"""
+        article_ids = set(queryset.values_list('article_id', flat=True))
         count = queryset.update(status='pending')
+        # 批量 update 不会触发信号，手动更新评论列表校验值
+        invalidate_comment_caches(*article_ids)
         self.message_user(request, f'成功将 {count} 条评论重置为待审核状态。')
     reset_to_pending.short_description = '重置为待审核'
 
@@ -292,3 +304,34 @@ class CommentGroupObjectPermissionAdmin(admin.ModelAdmin):
         """
         return super().get_queryset(request).select_related("group", "content_object", "permission")
 
+
+@admin.register(SensitiveWord)
+class SensitiveWordAdmin(admin.ModelAdmin):
+    """
+    敏感词管理
+    保存后各进程在后台加载新版本的词库，不需要重新部署
+    """
+    list_display = ('word', 'category', 'severity', 'is_active', 'updated_at')
+    list_editable = ('severity', 'is_active')
+    list_filter = ('category', 'severity', 'is_active')
+    search_fields = ('word',)
+    ordering = ('category', 'word')
+    list_per_page = 50
+
+    actions = ['activate_words', 'deactivate_words']
+
+    def activate_words(self, request, queryset):
+        """批量启用敏感词"""
+        count = queryset.update(is_active=True)
+        # 批量 update 不会触发信号，提交后手动增加词库版本
+        transaction.on_commit(get_sensitive_word_dictionary().invalidate)
+        self.message_user(request, f'成功启用 {count} 个敏感词。')
+    activate_words.short_description = '启用选中的敏感词'
+
+    def deactivate_words(self, request, queryset):
+        """批量停用敏感词"""
+        count = queryset.update(is_active=False)
+        # 批量 update 不会触发信号，提交后手动增加词库版本
+        transaction.on_commit(get_sensitive_word_dictionary().invalidate)
+        self.message_user(request, f'成功停用 {count} 个敏感词。')
+    deactivate_words.short_description = '停用选中的敏感词'
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.comments.models import Comment
+from utils.simhash import get_simhash_fields, simhash
+
+SIMHASH_FIELDS = list(get_simhash_fields(None))
+
+
+class Command(BaseCommand):
+    """
+    为已有评论计算 SimHash 指纹
+
+    新评论在创建时计算指纹；近似重复查找只比较最近 COMMENT_NEAR_DUPLICATE_DAYS 天内的评论，
+    因此默认只处理这段时间内还没有指纹的评论，--all 处理全部评论。
+    按主键顺序分块读取（每块一次 pk > 上一块末尾的范围查询），每块用 bulk_update 写回
+
+    用法:
+        python manage.py backfill_comment_simhash
+        python manage.py backfill_comment_simhash --all --chunk-size 5000
+    """
+
+    help = "为已有评论计算近似重复检测使用的 SimHash 指纹"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="每块的评论数，默认1000",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="处理全部评论，而不只是近似重复查找范围内的评论",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        if chunk_size < 1:
+            raise CommandError("--chunk-size 必须大于0")
+
+        comments = Comment.objects.filter(simhash__isnull=True).order_by("pk")
+        if not options["all"]:
+            days = getattr(settings, "COMMENT_NEAR_DUPLICATE_DAYS", 7)
+            comments = comments.filter(created_at__gte=timezone.now() - timedelta(days=days))
+
+        after_id, scanned, updated = 0, 0, 0
+        while True:
+            chunk = list(comments.filter(pk__gt=after_id).only("pk", "content")[:chunk_size])
+            if not chunk:
+                break
+            changed = []
+            for comment in chunk:
+                fingerprint = simhash(comment.content)
+                if fingerprint is None:
+                    # 内容太短，不计算指纹
+                    continue
+                for field, value in get_simhash_fields(fingerprint).items():
+                    setattr(comment, field, value)
+                changed.append(comment)
+            Comment.objects.bulk_update(changed, SIMHASH_FIELDS)
+            scanned += len(chunk)
+            updated += len(changed)
+            after_id = chunk[-1].pk
+            self.stdout.write(f"已处理 {scanned} 条评论，写入 {updated} 个指纹，最后的评论ID {after_id}")
+
+        self.stdout.write(self.style.SUCCESS(f"完成：处理 {scanned} 条评论，写入 {updated} 个指纹"))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:45
+
+from django.db import migrations, models
+
+# 原来写在 SensitiveWordFilter.DEFAULT_SENSITIVE_WORDS 中的默认敏感词及其分类
+DEFAULT_WORDS = [
+    ('垃圾内容', 'spam'), ('广告', 'ad'), ('刷屏', 'spam'), ('色情', 'porn'), ('暴力', 'violence'),
+    ('政治敏感', 'politics'), ('反动', 'politics'), ('诈骗', 'fraud'), ('赌博', 'gambling'), ('毒品', 'drugs'),
+]
+
+
+def add_default_words(apps, schema_editor):
+    """写入默认敏感词"""
+    SensitiveWord = apps.get_model('comments', 'SensitiveWord')
+    SensitiveWord.objects.bulk_create(
+        [SensitiveWord(word=word, category=category) for word, category in DEFAULT_WORDS],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0003_add_comment_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SensitiveWord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=100, unique=True, verbose_name='敏感词')),
+                ('category', models.CharField(choices=[('ad', '广告'), ('spam', '垃圾信息'), ('porn', '色情'), ('violence', '暴力'), ('politics', '政治'), ('fraud', '诈骗'), ('gambling', '赌博'), ('drugs', '毒品'), ('abuse', '辱骂'), ('other', '其他')], default='other', max_length=20, verbose_name='分类')),
+                ('severity', models.PositiveSmallIntegerField(choices=[(1, '仅替换'), (2, '人工审核'), (3, '禁止发布')], default=2, verbose_name='严重程度')),
+                ('is_active', models.BooleanField(default=True, verbose_name='启用')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '敏感词',
+                'verbose_name_plural': '敏感词',
+                'ordering': ['category', 'word'],
+            },
+        ),
+        migrations.RunPython(add_default_words, migrations.RunPython.noop),
+    ]
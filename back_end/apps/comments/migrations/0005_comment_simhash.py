@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0004_sensitive_word'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='内容指纹'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='simhash_band0',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='simhash_band1',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='simhash_band2',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='simhash_band3',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='simhash_band4',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['simhash_band0', 'created_at'], name='comment_simhash_band0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['simhash_band1', 'created_at'], name='comment_simhash_band1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['simhash_band2', 'created_at'], name='comment_simhash_band2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['simhash_band3', 'created_at'], name='comment_simhash_band3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['simhash_band4', 'created_at'], name='comment_simhash_band4_idx'),
+        ),
+    ]
@@ -3,6 +3,7 @@ from apps.articles.models import Article
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 from guardian.models import UserObjectPermissionAbstract, GroupObjectPermissionAbstract
+from utils.text_filter import SEVERITY_BLOCK, SEVERITY_MASK, SEVERITY_REVIEW
 
 User = get_user_model()
 
@@ -53,10 +54,26 @@ class Comment(models.Model):
         verbose_name=_("父评论")
     )
 
+    # 内容的 SimHash 指纹（内容太短时为空），分段保存用于查找近似重复的评论，见 utils.simhash
+    simhash = models.BigIntegerField(_("内容指纹"), null=True, blank=True, editable=False)
+    simhash_band0 = models.IntegerField(null=True, blank=True, editable=False)
+    simhash_band1 = models.IntegerField(null=True, blank=True, editable=False)
+    simhash_band2 = models.IntegerField(null=True, blank=True, editable=False)
+    simhash_band3 = models.IntegerField(null=True, blank=True, editable=False)
+    simhash_band4 = models.IntegerField(null=True, blank=True, editable=False)
+
     class Meta:
         verbose_name = _("评论")
         verbose_name_plural = _("评论")
         ordering = ['parent_id', 'created_at'] # 先按父评论分组，再按创建时间排序
+        # 近似重复查找：每一段与创建时间的组合索引
+        indexes = [
+            models.Index(fields=['simhash_band0', 'created_at'], name='comment_simhash_band0_idx'),
+            models.Index(fields=['simhash_band1', 'created_at'], name='comment_simhash_band1_idx'),
+            models.Index(fields=['simhash_band2', 'created_at'], name='comment_simhash_band2_idx'),
+            models.Index(fields=['simhash_band3', 'created_at'], name='comment_simhash_band3_idx'),
+            models.Index(fields=['simhash_band4', 'created_at'], name='comment_simhash_band4_idx'),
+        ]
         # 自定义权限
         permissions = [
             # ('edit_comment', _('可以编辑评论')),  # 评论不允许编辑
@@ -103,4 +120,44 @@ class CommentGroupObjectPermission(GroupObjectPermissionAbstract):
 
     class Meta:
         verbose_name = _("评论组权限")
-        verbose_name_plural = _("评论组权限")
\ No newline at end of file
+        verbose_name_plural = _("评论组权限")
+
+
+class SensitiveWord(models.Model):
+    """
+    敏感词模型
+
+    评论过滤使用的词库。修改后各进程在后台加载新版本的词库快照，不需要重新部署
+    """
+
+    class Category(models.TextChoices):
+        AD = "ad", _("广告")
+        SPAM = "spam", _("垃圾信息")
+        PORN = "porn", _("色情")
+        VIOLENCE = "violence", _("暴力")
+        POLITICS = "politics", _("政治")
+        FRAUD = "fraud", _("诈骗")
+        GAMBLING = "gambling", _("赌博")
+        DRUGS = "drugs", _("毒品")
+        ABUSE = "abuse", _("辱骂")
+        OTHER = "other", _("其他")
+
+    class Severity(models.IntegerChoices):
+        MASK = SEVERITY_MASK, _("仅替换")
+        REVIEW = SEVERITY_REVIEW, _("人工审核")
+        BLOCK = SEVERITY_BLOCK, _("禁止发布")
+
+    word = models.CharField(_("敏感词"), max_length=100, unique=True)
+    category = models.CharField(_("分类"), max_length=20, choices=Category.choices, default=Category.OTHER)
+    severity = models.PositiveSmallIntegerField(_("严重程度"), choices=Severity.choices, default=Severity.REVIEW)
+    is_active = models.BooleanField(_("启用"), default=True)
+    created_at = models.DateTimeField(_("创建时间"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("更新时间"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("敏感词")
+        verbose_name_plural = _("敏感词")
+        ordering = ['category', 'word']
+
+    def __str__(self):
+        return self.word
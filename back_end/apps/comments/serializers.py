@@ -1,6 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import Comment
 from apps.articles.serializers import AuthorSerializer
+from utils.simhash import find_near_duplicates, get_simhash_fields, simhash
 from utils.text_filter import filter_comment_content
 
 class ReplySerializer(serializers.ModelSerializer):
@@ -79,9 +81,26 @@ class CommentSerializer(serializers.ModelSerializer):
         """
         # 获取过滤结果
         filter_result = self.context.get('filter_result', {'should_auto_approve': True})
+        # 短时间内反复出现的相同内容（刷屏）进入人工审核
+        is_duplicate_flood = filter_result.get('seen_count', 0) > getattr(settings, 'COMMENT_DUPLICATE_THRESHOLD', 3)
+        should_auto_approve = filter_result['should_auto_approve'] and not is_duplicate_flood
+        
+        # 保存内容指纹；与其他用户最近的评论近似重复（多个账号发布稍加改动的同一内容）时进入人工审核，
+        # 与自己在同一篇文章下之前的评论相近不算（追评；同一用户完全相同的刷屏由上面的 seen_count 处理），
+        # 已经需要审核的评论不再查找。指纹按保存的内容计算，与 backfill_comment_simhash 一致
+        fingerprint = simhash(validated_data['content'])
+        validated_data.update(get_simhash_fields(fingerprint))
+        if should_auto_approve and fingerprint is not None:
+            user = validated_data.get('user')
+            article = validated_data.get('article')
+            should_auto_approve = not find_near_duplicates(
+                fingerprint,
+                exclude_user_id=user.pk if user is not None else None,
+                article_id=article.pk if article is not None else None,
+            )
         
         # 根据过滤结果设置状态
-        if filter_result['should_auto_approve']:
+        if should_auto_approve:
             validated_data['status'] = 'approved'
         else:
             validated_data['status'] = 'pending'
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utils.sensitive_words import get_sensitive_word_dictionary
+from .models import SensitiveWord
+
+
+@receiver(post_save, sender=SensitiveWord)
+@receiver(post_delete, sender=SensitiveWord)
+def sensitive_word_changed(sender, instance, **kwargs):
+    """
+    敏感词增删改后增加词库版本，各进程在后台加载新版本
+
+    版本在事务提交后才增加：否则其他进程可能在提交前发现新版本，
+    从数据库读到旧的词库并以新版本发布快照，直到下次修改前都不会更新
+    """
+    transaction.on_commit(get_sensitive_word_dictionary().invalidate)
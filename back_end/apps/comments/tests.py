@@ -1,12 +1,24 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.utils import timezone
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from apps.articles.models import Article  # 假设文章模型在此
-from .models import Comment
+from .models import Comment, SensitiveWord
 from rest_framework_simplejwt.tokens import AccessToken
-from utils.text_filter import SensitiveWordFilter, CommentContentFilter, filter_comment_content
+from utils.aho_corasick import AhoCorasick
+from utils.cache import CacheGeneration
+from utils.simhash import (
+    SIMHASH_DISTANCE, find_near_duplicates, get_simhash_fields, hamming_distance, simhash, split_bands, to_unsigned
+)
+from utils.sensitive_words import SENSITIVE_WORDS_SCOPE, SensitiveWordDictionary, get_sensitive_word_dictionary
+from utils.text_filter import SensitiveWordFilter, CommentContentFilter, filter_comment_content, get_text_normalizer
 import threading
 
 User = get_user_model()
@@ -1231,6 +1243,65 @@ class SensitiveWordFilterTests(TestCase):
         result = self.filter.filter_text("")
         self.assertEqual(result, "")
 
+    def test_automaton_matches(self):
+        """测试自动机一次扫描找出全部（包括重叠的）匹配"""
+        automaton = AhoCorasick(["he", "she", "his", "hers"])
+        matches = sorted((start, end) for start, end, _ in automaton.iter_matches("ushers"))
+        self.assertEqual(matches, [(1, 4), (2, 4), (2, 6)])
+        # 互不重叠时同一位置开始的取最长的词
+        self.assertEqual([(start, end) for start, end, _ in automaton.find("ushers")], [(1, 4)])
+        self.assertEqual(list(AhoCorasick([]).iter_matches("text")), [])
+
+    def test_filter_info_offsets(self):
+        """测试过滤信息包含敏感词位置，替换由位置得出，不区分大小写"""
+        self.filter.add_words(["Spam", "广告位"])
+        text = "SPAM广告位和广告"
+        info = self.filter.get_filter_info(text)
+        self.assertTrue(info['has_sensitive_words'])
+        self.assertEqual(info['matches'], [(0, 4), (4, 7), (8, 10)])
+        self.assertEqual(info['sensitive_words'], ['SPAM', '广告位', '广告'])
+        self.assertEqual(info['filtered_text'], "******和***")
+
+    def test_rebuild_after_word_changes(self):
+        """测试词库变化后重新构建自动机"""
+        self.assertTrue(self.filter.contains_sensitive_words("有广告"))
+        self.filter.remove_words(["广告"])
+        self.filter.add_words(["新词"])
+        self.assertFalse(self.filter.contains_sensitive_words("有广告"))
+        self.assertEqual(self.filter.find_sensitive_words("新词新词"), ["新词"])
+
+    def test_normalize_text(self):
+        """测试规范化：全角、大小写、繁体折叠，分隔字符删除并记录原文位置"""
+        normalizer = get_text_normalizer()
+        self.assertEqual(normalizer.normalize("ＡｂＣ賭"), ("abc赌", None))
+        normalized, offsets = normalizer.normalize("赌 博，\u200b网")
+        self.assertEqual(normalized, "赌博网")
+        self.assertEqual(offsets, [0, 2, 5])
+
+    def test_evasion_variants(self):
+        """测试插入空格标点、全角、繁体的变体也能匹配，替换作用于原文"""
+        self.filter.add_words(["AD"])
+        cases = [
+            ("来玩赌 博吧", "来玩***吧"),
+            ("赌.博!", "***!"),
+            ("ＡＤ投放", "***投放"),
+            ("賭博網站", "***網站"),
+            ("廣\u3000告", "***"),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                info = self.filter.get_filter_info(text)
+                self.assertTrue(info['has_sensitive_words'])
+                self.assertEqual(info['filtered_text'], expected)
+        self.assertEqual(self.filter.find_sensitive_words("赌 博和賭博"), ["赌 博", "賭博"])
+        self.assertFalse(self.filter.contains_sensitive_words("正常的 评论！"))
+
+    def test_normalized_custom_words(self):
+        """测试自定义敏感词同样先规范化"""
+        word_filter = SensitiveWordFilter(["刷 單", "ＶＰＮ"])
+        self.assertTrue(word_filter.contains_sensitive_words("刷单"))
+        self.assertTrue(word_filter.contains_sensitive_words("v-p-n"))
+
 
 class CommentContentFilterTests(TestCase):
     """评论内容过滤器测试类"""
@@ -1291,6 +1362,315 @@ class CommentContentFilterTests(TestCase):
         self.assertIn('可能包含垃圾内容，需要人工审核', result['issues'])
 
 
+@override_settings(CACHES={
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sensitive-word-tests",
+    }
+})
+class SensitiveWordDictionaryTests(TestCase):
+    """数据库敏感词词库测试类"""
+
+    def setUp(self):
+        """设置测试数据"""
+        cache.clear()
+        self.dictionary = SensitiveWordDictionary()
+
+    def test_default_words_migrated(self):
+        """测试默认敏感词由迁移写入数据库"""
+        self.assertEqual(SensitiveWord.objects.get(word='赌博').category, SensitiveWord.Category.GAMBLING)
+        self.assertTrue(self.dictionary.get_filter().contains_sensitive_words("这是广告"))
+
+    def test_snapshot_round_trip(self):
+        """测试其他进程从快照加载，不访问数据库也不重新构建"""
+        version, word_filter = self.dictionary.publish()
+        with self.assertNumQueries(0):
+            loaded_version, loaded_filter = SensitiveWordDictionary().load()
+        self.assertEqual(loaded_version, version)
+        self.assertEqual(loaded_filter.sensitive_words, word_filter.sensitive_words)
+        self.assertEqual(loaded_filter.get_filter_info("賭 博和广告"), word_filter.get_filter_info("賭 博和广告"))
+
+    def test_hot_swap_in_background(self):
+        """测试版本变化后先返回旧版本，后台加载完成后替换"""
+        old_filter = self.dictionary.get_filter()
+        with self.captureOnCommitCallbacks(execute=True):
+            SensitiveWord.objects.create(word='新敏感词')
+        # 另一个进程构建并发布新版本
+        SensitiveWordDictionary().publish()
+
+        with self.assertNumQueries(0):
+            self.assertIs(self.dictionary.get_filter(), old_filter)
+        self.dictionary._reload_thread.join(5)
+
+        new_filter = self.dictionary.get_filter()
+        self.assertIsNot(new_filter, old_filter)
+        self.assertTrue(new_filter.contains_sensitive_words("出现了新敏感词"))
+        self.assertEqual(self.dictionary.version, CacheGeneration.get(SENSITIVE_WORDS_SCOPE))
+
+    def test_version_bumped_after_commit(self):
+        """测试事务提交后才增加词库版本，其他进程不会在提交前按新版本构建"""
+        version = CacheGeneration.get(SENSITIVE_WORDS_SCOPE)
+        with self.captureOnCommitCallbacks() as callbacks:
+            SensitiveWord.objects.create(word='新敏感词')
+            SensitiveWord.objects.filter(word='广告').update(is_active=False)
+            self.assertEqual(CacheGeneration.get(SENSITIVE_WORDS_SCOPE), version)
+        self.assertEqual(len(callbacks), 1)
+
+        callbacks[0]()
+        self.assertNotEqual(CacheGeneration.get(SENSITIVE_WORDS_SCOPE), version)
+
+    def test_reload_waits_for_other_builder(self):
+        """测试其他进程正在构建时继续使用旧版本"""
+        old_filter = self.dictionary.get_filter()
+        self.dictionary.invalidate()
+        cache.add(self.dictionary.lock_key, 1)
+        self.assertFalse(self.dictionary.reload())
+        self.assertIs(self.dictionary._current[1], old_filter)
+
+    def test_inactive_words_and_severity(self):
+        """测试停用的敏感词不再匹配，严重程度决定审核方式"""
+        word = SensitiveWord.objects.get(word='广告')
+        word.is_active = False
+        word.save()
+        SensitiveWord.objects.create(word='加微信', severity=SensitiveWord.Severity.MASK)
+        SensitiveWord.objects.create(word='违禁品', severity=SensitiveWord.Severity.BLOCK)
+
+        word_filter = self.dictionary.get_filter()
+        self.assertFalse(word_filter.contains_sensitive_words("这是广告"))
+        content_filter = CommentContentFilter(word_filter)
+
+        masked = content_filter.check_content("请加 微信聊")
+        self.assertTrue(masked['is_valid'])
+        self.assertTrue(masked['should_auto_approve'])
+        self.assertEqual(masked['filtered_content'], "请***聊")
+
+        reviewed = content_filter.check_content("网上赌博")
+        self.assertFalse(reviewed['should_auto_approve'])
+
+        blocked = content_filter.check_content("出售违禁品")
+        self.assertFalse(blocked['is_valid'])
+        self.assertIn('包含禁止发布的内容', blocked['issues'])
+
+
+class CountingContentFilter(CommentContentFilter):
+    """记录实际检查次数的评论过滤器"""
+
+    def __init__(self):
+        super().__init__()
+        self.checked = 0
+
+    def check_content(self, content, word_filter=None):
+        self.checked += 1
+        return super().check_content(content, word_filter)
+
+
+@override_settings(CACHES={
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "comment-filter-cache-tests",
+    }
+})
+class CommentFilterCacheTests(APITestCase):
+    """评论内容检查结果缓存测试类"""
+
+    def setUp(self):
+        """设置测试数据"""
+        cache.clear()
+        get_sensitive_word_dictionary().clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        self.article = Article.objects.create(title="测试文章", content="测试内容", author=self.user)
+        self.comments_url = reverse("article-comments-list", kwargs={"article_pk": self.article.pk})
+
+    def test_repeated_content_checked_once(self):
+        """测试相同内容只检查一次，并累计出现次数"""
+        content_filter = CountingContentFilter()
+        first = content_filter.check_content_cached("这里有广告")
+        second = content_filter.check_content_cached("这里有广告")
+        self.assertEqual(content_filter.checked, 1)
+        self.assertEqual((first['seen_count'], second['seen_count']), (1, 2))
+        self.assertEqual(second['filtered_content'], "这里有***")
+        self.assertFalse(second['should_auto_approve'])
+
+        # 返回的是副本，修改不影响缓存
+        second['issues'].append('修改')
+        self.assertNotIn('修改', content_filter.check_content_cached("这里有广告")['issues'])
+
+    def test_near_duplicates_share_counter(self):
+        """测试只差空格、标点、大小写的内容计为同一内容"""
+        content_filter = CommentContentFilter()
+        content_filter.check_content_cached("Buy NOW")
+        content_filter.check_content_cached("buy now!!!")
+        result = content_filter.check_content_cached("ｂｕｙ　ｎｏｗ")
+        self.assertEqual(result['seen_count'], 3)
+        self.assertEqual(result['original_content'], "ｂｕｙ　ｎｏｗ")
+
+    def test_shared_cache_across_processes(self):
+        """测试重复出现的内容的检查结果在进程间共享"""
+        CommentContentFilter().check_content_cached("重复的评论")
+        CommentContentFilter().check_content_cached("重复的评论")
+        other_process = CountingContentFilter()
+        result = other_process.check_content_cached("重复的评论")
+        self.assertEqual(other_process.checked, 0)
+        self.assertEqual(result['seen_count'], 3)
+
+    def test_duplicate_flood_goes_to_review(self):
+        """测试短时间内重复出现的评论进入人工审核"""
+        self.client.force_authenticate(user=self.user)
+        statuses = []
+        for _ in range(4):
+            response = self.client.post(self.comments_url, {"content": "快来看看我的主页"})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            statuses.append(response.data['status'])
+        self.assertEqual(statuses, ['approved', 'approved', 'approved', 'pending'])
+
+
+SPAM_COMMENT = "这篇文章写得非常好，我按照里面的步骤配置了 Redis 缓存，接口响应时间从三百毫秒降到了三十毫秒，感谢作者分享经验！"
+SPAM_VARIANT = "这篇文章写得非常好，我按照里面的步骤配置了 Redis 缓存，接口响应时间从三百毫秒降到了四十毫秒，感谢作者分享经验!!"
+OTHER_COMMENT = "数据库索引设计要考虑查询模式，组合索引的列顺序很重要，建议先分析慢查询日志再决定加哪些索引。"
+
+
+class SimHashTests(TestCase):
+    """SimHash 近似重复检测测试类"""
+
+    def setUp(self):
+        """设置测试数据"""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        self.article = Article.objects.create(title="测试文章", content="测试内容", author=self.user)
+
+    def test_fingerprint_distance(self):
+        """测试相近内容的指纹距离小，无关内容的距离大"""
+        fingerprint = simhash(SPAM_COMMENT)
+        self.assertLessEqual(hamming_distance(fingerprint, simhash(SPAM_VARIANT)), SIMHASH_DISTANCE)
+        self.assertGreater(hamming_distance(fingerprint, simhash(OTHER_COMMENT)), SIMHASH_DISTANCE * 2)
+        # 规范化后相同的内容指纹相同
+        self.assertEqual(simhash(" ".join(SPAM_COMMENT)), fingerprint)
+        self.assertIsNone(simhash("谢谢分享"))
+
+    def test_bands_and_signed_storage(self):
+        """测试指纹分段和有符号存储"""
+        fingerprint = (1 << 64) - 3
+        fields = get_simhash_fields(fingerprint)
+        self.assertLess(fields['simhash'], 0)
+        self.assertEqual(to_unsigned(fields['simhash']), fingerprint)
+        bands = split_bands(fingerprint)
+        self.assertEqual(len(bands), SIMHASH_DISTANCE + 1)
+        self.assertEqual([fields[f'simhash_band{index}'] for index in range(len(bands))], bands)
+        self.assertTrue(all(value is None for value in get_simhash_fields(None).values()))
+
+    def test_find_near_duplicates(self):
+        """测试只在查找范围内找出距离足够小的评论"""
+        def create(content, **extra):
+            return Comment.objects.create(
+                article=self.article, user=self.user, content=content,
+                **get_simhash_fields(simhash(content)), **extra
+            )
+
+        duplicate = create(SPAM_COMMENT)
+        create(OTHER_COMMENT)
+        old = create(SPAM_COMMENT)
+        Comment.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=30))
+
+        self.assertEqual(find_near_duplicates(simhash(SPAM_VARIANT)), [duplicate.pk])
+        self.assertEqual(find_near_duplicates(simhash(SPAM_COMMENT), exclude_pk=duplicate.pk), [])
+        self.assertEqual(
+            find_near_duplicates(simhash(SPAM_VARIANT), exclude_user_id=self.user.pk, article_id=self.article.pk), []
+        )
+        # 只排除同一篇文章下自己的评论
+        other_article = Article.objects.create(title="另一篇文章", content="测试内容", author=self.user)
+        self.assertEqual(
+            find_near_duplicates(simhash(SPAM_VARIANT), exclude_user_id=self.user.pk, article_id=other_article.pk),
+            [duplicate.pk],
+        )
+
+    def test_backfill_command(self):
+        """测试为已有评论补充指纹"""
+        long_comment = Comment.objects.create(article=self.article, user=self.user, content=SPAM_COMMENT)
+        short_comment = Comment.objects.create(article=self.article, user=self.user, content="谢谢分享")
+        call_command('backfill_comment_simhash', chunk_size=1, stdout=StringIO())
+
+        long_comment.refresh_from_db()
+        short_comment.refresh_from_db()
+        self.assertEqual(to_unsigned(long_comment.simhash), simhash(SPAM_COMMENT))
+        self.assertIsNone(short_comment.simhash)
+
+
+class NearDuplicateCommentTests(APITestCase):
+    """近似重复评论审核测试类"""
+
+    def setUp(self):
+        """设置测试数据"""
+        self.author = User.objects.create_user(
+            username="author", email="author@example.com", password="testpass123", is_active=True
+        )
+        self.spammers = [
+            User.objects.create_user(
+                username=f"spammer{index}", email=f"spammer{index}@example.com", password="testpass123",
+                is_active=True
+            )
+            for index in range(2)
+        ]
+        self.articles = [
+            Article.objects.create(title=f"测试文章{index}", content="测试内容", author=self.author)
+            for index in range(2)
+        ]
+
+    def post_comment(self, user, article, content):
+        self.client.force_authenticate(user=user)
+        url = reverse("article-comments-list", kwargs={"article_pk": article.pk})
+        response = self.client.post(url, {"content": content})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def test_variant_across_articles_goes_to_review(self):
+        """测试不同账号在不同文章下发布的近似内容进入人工审核"""
+        first = self.post_comment(self.spammers[0], self.articles[0], SPAM_COMMENT)
+        self.assertEqual(first['status'], 'approved')
+        self.assertIsNotNone(Comment.objects.get(pk=first['id']).simhash)
+
+        variant = self.post_comment(self.spammers[1], self.articles[1], SPAM_VARIANT)
+        self.assertEqual(variant['status'], 'pending')
+
+        other = self.post_comment(self.spammers[1], self.articles[1], OTHER_COMMENT)
+        self.assertEqual(other['status'], 'approved')
+
+    def test_variant_of_own_comment_is_approved(self):
+        """测试同一用户在同一篇文章下发布与自己之前评论相近的追评不进入人工审核"""
+        first = self.post_comment(self.spammers[0], self.articles[0], SPAM_COMMENT)
+        self.assertEqual(first['status'], 'approved')
+
+        follow_up = self.post_comment(self.spammers[0], self.articles[0], SPAM_VARIANT)
+        self.assertEqual(follow_up['status'], 'approved')
+
+    def test_own_variant_across_articles_goes_to_review(self):
+        """测试同一账号在不同文章下发布的近似内容进入人工审核"""
+        first = self.post_comment(self.spammers[0], self.articles[0], SPAM_COMMENT)
+        self.assertEqual(first['status'], 'approved')
+
+        variant = self.post_comment(self.spammers[0], self.articles[1], SPAM_VARIANT)
+        self.assertEqual(variant['status'], 'pending')
+
+    def test_backfill_matches_live_fingerprint(self):
+        """测试回填命令与创建评论时按同一内容（过滤后保存的内容）计算指纹"""
+        created = self.post_comment(self.spammers[0], self.articles[0], "这里有广告，" + SPAM_COMMENT)
+        comment = Comment.objects.get(pk=created['id'])
+        self.assertNotIn("广告", comment.content)
+        live = comment.simhash
+
+        Comment.objects.filter(pk=comment.pk).update(simhash=None)
+        call_command('backfill_comment_simhash', stdout=StringIO())
+        comment.refresh_from_db()
+        self.assertEqual(comment.simhash, live)
+
+    def test_short_comments_not_compared(self):
+        """测试短评论不计算指纹，相同的短评论照常通过"""
+        for user, article in zip(self.spammers, self.articles):
+            self.assertEqual(self.post_comment(user, article, "谢谢分享，学到了")['status'], 'approved')
+
+
 class CommentApprovalTests(APITestCase):
     """评论审核测试类"""
     
@@ -1517,3 +1897,95 @@ class CommentModelStatusTests(TestCase):
                 status=status_value
             )
             self.assertEqual(comment.status, status_value)
+
+
+@override_settings(CACHES={
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "comment-tests",
+    }
+})
+class CommentConditionalRequestTests(APITestCase):
+    """评论列表条件请求测试"""
+
+    def setUp(self):
+        """设置测试数据"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123", is_active=True
+        )
+        self.article = Article.objects.create(title="测试文章", content="测试内容", author=self.user)
+        Comment.objects.create(article=self.article, user=self.user, content="第一条评论", status="approved")
+        self.comments_url = reverse("article-comments-list", kwargs={"article_pk": self.article.pk})
+
+    def test_not_modified_without_queries(self):
+        """测试评论未变化时返回304且不查询数据库"""
+        response = self.client.get(self.comments_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.comments_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_etag_changes_with_comments(self):
+        """测试评论新增、审核和删除后校验值变化"""
+        etag = self.client.get(self.comments_url)["ETag"]
+
+        comment = Comment.objects.create(article=self.article, user=self.user, content="新评论", status="pending")
+        response = self.client.get(self.comments_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+
+        comment.status = "approved"
+        comment.save()
+        response = self.client.get(self.comments_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        etag = response["ETag"]
+
+        comment.delete()
+        response = self.client.get(self.comments_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_changes_with_article(self):
+        """测试文章删除后不再返回304"""
+        etag = self.client.get(self.comments_url)["ETag"]
+
+        self.article.delete()
+        response = self.client.get(self.comments_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_etag_changes_with_article_status(self):
+        """测试文章状态变化后校验值变化"""
+        etag = self.client.get(self.comments_url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.status = Article.Status.PUBLISHED
+            self.article.save()
+        response = self.client.get(self.comments_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_changes_with_commenter_profile(self):
+        """测试评论者修改用户名后校验值变化，只更新登录时间时不变"""
+        etag = self.client.get(self.comments_url)["ETag"]
+
+        self.user.save(update_fields=["last_login"])
+        response = self.client.get(self.comments_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user.username = "renamed"
+        self.user.save()
+        response = self.client.get(self.comments_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["user"]["username"], "renamed")
+
+    def test_etag_depends_on_user(self):
+        """测试不同用户看到的评论列表使用不同的校验值"""
+        anonymous_etag = self.client.get(self.comments_url)["ETag"]
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+        response = self.client.get(self.comments_url, HTTP_IF_NONE_MATCH=anonymous_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -9,6 +9,10 @@ from django.shortcuts import get_object_or_404
 from guardian.shortcuts import assign_perm, get_perms
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from drf_spectacular.openapi import OpenApiParameter, OpenApiTypes
+from utils.cache import (
+    COMMENT_USERS_SCOPE, CacheGeneration, article_comments_scope, format_generations, get_cache_audience
+)
+from utils.conditional import get_not_modified_response, make_etag, set_validators
 
 @extend_schema_view(
     list=extend_schema(
@@ -99,6 +103,23 @@ class CommentViewSet(viewsets.ModelViewSet):
 
         return queryset.order_by('created_at')
 
+    def list(self, request, *args, **kwargs):
+        """
+        获取评论列表，支持条件请求
+        校验值由文章的评论代际值（文章变化时也会更新）、评论者资料的代际值、
+        用户可见范围和请求 URL 计算，评论没有变化时在查询数据库之前直接返回304
+        """
+        article_pk = kwargs.get('article_pk')
+        generations = CacheGeneration.get_many([article_comments_scope(article_pk), COMMENT_USERS_SCOPE])
+        etag = make_etag(
+            'comments', article_pk, format_generations(generations), get_cache_audience(request.user),
+            request.get_full_path()
+        )
+        not_modified = get_not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(super().list(request, *args, **kwargs), etag)
+
     def perform_create(self, serializer):
         """
         创建评论时，关联当前文章和当前用户
@@ -0,0 +1,112 @@
+"""
+文章详情接口查询次数基准测试
+
+统计 ArticleViewSet.retrieve 在缓存未命中/命中时每个请求的数据库查询次数和耗时。
+使用独立的测试数据库和本地内存缓存，不会影响开发数据。
+
+用法:
+    cd back_end
+    python benchmarks/article_detail_queries.py [--requests 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "article-detail-benchmark",
+    }
+}
+
+
+def measure(client, url, requests):
+    """返回 (每请求查询次数, 每请求耗时毫秒)"""
+    start = time.perf_counter()
+    with CaptureQueriesContext(connection) as ctx:
+        for _ in range(requests):
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+    elapsed = time.perf_counter() - start
+    return len(ctx.captured_queries) / requests, elapsed * 1000 / requests
+
+
+def run(requests):
+    from django.core.cache import cache
+    from apps.articles.models import Article
+    from apps.users.models import User
+    from utils.local_cache import get_local_cache
+
+    author = User.objects.create_user(
+        username="bench", email="bench@example.com", password="benchpass123", is_active=True
+    )
+    article = Article.objects.create(
+        title="基准测试文章",
+        content="基准测试内容" * 200,
+        author=author,
+        status=Article.Status.PUBLISHED,
+    )
+    url = reverse("article-detail", kwargs={"pk": article.pk})
+
+    anonymous = APIClient()
+    authenticated = APIClient()
+    token = str(RefreshToken.for_user(author).access_token)
+    authenticated.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    rows = []
+    for label, client in (("匿名用户", anonymous), ("登录用户", authenticated)):
+        cache.clear()
+        rows.append((f"{label} 缓存未命中", *measure(client, url, 1)))
+        rows.append((f"{label} 缓存命中", *measure(client, url, requests)))
+
+    # 进程内一级缓存命中（服务进程中由失效通知订阅线程启用）
+    local_cache = get_local_cache()
+    local_cache.enable()
+    try:
+        measure(anonymous, url, 1)
+        rows.append(("匿名用户 一级缓存命中", *measure(anonymous, url, requests)))
+    finally:
+        local_cache.disable()
+
+    print(f"{'场景':<16}{'查询/请求':>10}{'毫秒/请求':>12}")
+    for label, queries, ms in rows:
+        print(f"{label:<16}{queries:>10.2f}{ms:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="每个场景的请求次数")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        with override_settings(CACHES=LOCMEM_CACHES, VIEW_COUNT_FLUSH_INTERVAL=0):
+            run(args.requests)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+预渲染响应缓存 CPU 开销基准测试
+
+比较缓存命中时每个请求的 CPU 时间：
+- 缓存 response.data：从缓存解压、反序列化出 Python 对象，再由 JSONRenderer 渲染
+- 缓存预渲染字节：从缓存解压、反序列化出 bytes，详情接口再拼接 view_count
+缓存读取使用与生产环境相同的 django_redis 序列化器和压缩器（不含网络往返），
+另外统计通过 APIClient 完整请求的耗时。使用独立的测试数据库和本地内存缓存。
+
+用法:
+    cd back_end
+    python benchmarks/rendered_cache_cpu.py [--requests 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse  # noqa: E402
+from django_redis.compressors.zlib import ZlibCompressor  # noqa: E402
+from django_redis.serializers.pickle import PickleSerializer  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "rendered-cache-benchmark",
+    }
+}
+
+serializer = PickleSerializer({})
+compressor = ZlibCompressor({})
+
+
+def to_cache(value):
+    """按 django_redis 的方式编码缓存值"""
+    return compressor.compress(serializer.dumps(value))
+
+
+def from_cache(raw):
+    """按 django_redis 的方式解码缓存值"""
+    return serializer.loads(compressor.decompress(raw))
+
+
+def cpu_per_hit(func, requests):
+    """返回每次调用的 CPU 时间（微秒）"""
+    start = time.process_time()
+    for _ in range(requests):
+        func()
+    return (time.process_time() - start) * 1e6 / requests
+
+
+def wall_per_request(client, url, requests):
+    """返回通过 APIClient 请求的每请求耗时（毫秒）"""
+    client.get(url)
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+    return (time.perf_counter() - start) * 1000 / requests
+
+
+def run(requests):
+    from django.core.cache import cache
+    from apps.articles.models import Article
+    from apps.users.models import User
+    from utils.rendered_cache import join_rendered_field, render_json, split_rendered_field
+
+    author = User.objects.create_user(
+        username="bench", email="bench@example.com", password="benchpass123", is_active=True
+    )
+    for i in range(30):
+        article = Article.objects.create(
+            title=f"基准测试文章{i}",
+            content="基准测试内容 benchmark content " * 300,
+            author=author,
+            status=Article.Status.PUBLISHED,
+        )
+
+    client = APIClient()
+    detail_url = reverse("article-detail", kwargs={"pk": article.pk})
+    list_url = reverse("article-list")
+    detail_data = client.get(detail_url).data
+    list_data = client.get(list_url).data
+
+    detail_raw = to_cache(dict(detail_data))
+    detail_parts_raw = to_cache(split_rendered_field(detail_data, "view_count"))
+    list_raw = to_cache(list_data)
+    list_bytes_raw = to_cache(render_json(list_data))
+
+    rows = [
+        ("详情 缓存数据+渲染", cpu_per_hit(
+            lambda: render_json({**from_cache(detail_raw), "view_count": 1}), requests
+        )),
+        ("详情 预渲染字节+拼接", cpu_per_hit(
+            lambda: join_rendered_field(from_cache(detail_parts_raw), 1), requests
+        )),
+        ("列表 缓存数据+渲染", cpu_per_hit(lambda: render_json(from_cache(list_raw)), requests)),
+        ("列表 预渲染字节", cpu_per_hit(lambda: from_cache(list_bytes_raw), requests)),
+    ]
+
+    print(f"{'场景':<20}{'CPU微秒/次':>12}")
+    for label, us in rows:
+        print(f"{label:<20}{us:>12.1f}")
+
+    cache.clear()
+    print()
+    print(f"{'完整请求':<20}{'毫秒/请求':>12}")
+    for label, url in (("详情", detail_url), ("列表", list_url)):
+        print(f"{label:<20}{wall_per_request(client, url, requests // 10):>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="每个场景的调用次数")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        with override_settings(CACHES=LOCMEM_CACHES, VIEW_COUNT_FLUSH_INTERVAL=0):
+            run(args.requests)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
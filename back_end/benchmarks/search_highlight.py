@@ -0,0 +1,62 @@
+"""
+搜索结果高亮基准测试
+
+对不同长度的正文生成摘要（一次扫描 + 双指针选窗口），统计单篇耗时，
+用于确认耗时随正文长度线性增长、与关键词个数基本无关
+
+用法:
+    cd back_end
+    python benchmarks/search_highlight.py [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from utils.search_highlight import SearchHighlighter  # noqa: E402
+
+WORDS = (
+    "django redis python mysql sqlite cache query index search react next docker linux nginx "
+    "celery kafka async thread process memory profile deploy 缓存 数据库 索引 优化 部署 入门 实践 原理"
+).split()
+QUERIES = ("redis", "django 缓存", "redis OR mysql 索引 优化", "djan* pyth* \"redis 缓存\" 部署 入门 实践")
+
+
+def make_text(length, rng):
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS) if rng.random() < 0.05 else rng.choice("的是了在和有这个文章内容") * rng.randint(1, 4)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def run(repeat):
+    rng = random.Random(42)
+    print(f"{'正文长度':<8} {'查询':<40} {'单篇(ms)':>10}")
+    for length in (1000, 10000, 100000):
+        text = make_text(length, rng)
+        for query in QUERIES:
+            highlighter = SearchHighlighter(query)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                highlighter.summarize(text)
+            elapsed = (time.perf_counter() - start) / repeat
+            print(f"{length:<12} {query:<40} {elapsed * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="每种组合的重复次数")
+    args = parser.parse_args()
+    run(args.repeat)
@@ -0,0 +1,61 @@
+"""
+重建倒排索引的分词吞吐量基准测试
+
+用随机生成的文章测量 count_terms 在不同进程数下的吞吐量（篇/秒），
+不包含数据库读写，用于估算 rebuild_search_index 的 --workers 取值和总耗时
+
+用法:
+    cd back_end
+    python benchmarks/search_rebuild.py [--articles 20000] [--chunk-size 1000] [--length 2000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.search_index import count_terms  # noqa: E402
+
+WORDS = (
+    "django redis python mysql sqlite cache query index search react next docker linux nginx "
+    "缓存 数据库 索引 优化 部署 入门 实践 原理 的 是 了 在 和 有 这个 文章 内容"
+).split()
+
+
+def make_chunks(articles, chunk_size, length):
+    rng = random.Random(42)
+    rows = []
+    for pk in range(1, articles + 1):
+        content = " ".join(rng.choices(WORDS, k=length // 3))[:length]
+        rows.append((pk, " ".join(rng.choices(WORDS, k=5)), content))
+    return [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+
+
+def run(articles, chunk_size, length):
+    chunks = make_chunks(articles, chunk_size, length)
+    print(f"{'进程数':<6} {'耗时(s)':>10} {'篇/秒':>10}")
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        if workers == 1:
+            for rows in chunks:
+                count_terms(rows)
+        else:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                list(executor.map(count_terms, chunks))
+        elapsed = time.perf_counter() - start
+        print(f"{workers:<8} {elapsed:>10.2f} {articles / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=20000, help="文章数")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="每块的文章数")
+    parser.add_argument("--length", type=int, default=2000, help="每篇正文的字符数")
+    args = parser.parse_args()
+    run(args.articles, args.chunk_size, args.length)
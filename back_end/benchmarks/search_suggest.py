@@ -0,0 +1,94 @@
+"""
+搜索建议前缀查询基准测试
+
+用随机生成的标题、作者和关键词构建 SuggestionIndex，统计：
+- 不同长度前缀的查询延迟（p50 / p99，不含 HTTP 和 DRF 开销），
+  以及长前缀第一次查询（结果尚未记住）的 p99
+- 快照大小、序列化和加载（含短前缀预计算）耗时
+
+用法:
+    cd back_end
+    python benchmarks/search_suggest.py [--titles 20000] [--lookups 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from utils.search_suggest import Suggestion, SuggestionIndex  # noqa: E402
+
+WORDS = (
+    "django redis python mysql sqlite cache query index search react next docker linux nginx "
+    "celery kafka async thread process memory profile deploy 缓存 数据库 索引 优化 部署 入门 实践 原理"
+).split()
+
+
+def make_suggestions(titles):
+    rng = random.Random(42)
+    suggestions = [
+        Suggestion(" ".join(rng.choices(WORDS, k=rng.randint(2, 6))), "title", rng.random() * 10, pk)
+        for pk in range(1, titles + 1)
+    ]
+    suggestions.extend(Suggestion(f"user{i}", "author", rng.random() * 5) for i in range(titles // 20))
+    suggestions.extend(
+        Suggestion(" ".join(rng.choices(WORDS, k=rng.randint(1, 2))), "query", rng.random() * 8)
+        for _ in range(titles // 10)
+    )
+    return suggestions
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def run(titles, lookups):
+    suggestions = make_suggestions(titles)
+
+    start = time.perf_counter()
+    index = SuggestionIndex.build(suggestions)
+    print(f"构建: {len(suggestions)} 条, {len(index.keys)} 个键, {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    snapshot = index.to_snapshot()
+    dumped = time.perf_counter() - start
+    start = time.perf_counter()
+    index = SuggestionIndex.from_snapshot(snapshot)
+    loaded = time.perf_counter() - start
+    print(f"快照: {len(snapshot) / 1024:.0f} KB, 序列化 {dumped * 1000:.1f} ms, 加载 {loaded * 1000:.1f} ms")
+
+    rng = random.Random(7)
+    print(f"{'前缀长度':<8} {'p50(us)':>10} {'p99(us)':>10} {'首次p99(us)':>12}")
+    for length in (1, 2, 3, 4, 6):
+        prefixes = [rng.choice(WORDS)[:length] for _ in range(lookups)]
+        samples, cold = [], []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            index.lookup(prefix)
+            samples.append((time.perf_counter() - start) * 1e6)
+        for prefix in set(prefixes):
+            index._memo.clear()
+            start = time.perf_counter()
+            index.lookup(prefix)
+            cold.append((time.perf_counter() - start) * 1e6)
+        print(
+            f"{length:<12} {percentile(samples, 0.5):>10.1f} {percentile(samples, 0.99):>10.1f}"
+            f" {percentile(cold, 0.99):>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=20000, help="文章标题数")
+    parser.add_argument("--lookups", type=int, default=20000, help="每种前缀长度的查询次数")
+    args = parser.parse_args()
+    run(args.titles, args.lookups)
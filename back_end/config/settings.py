@@ -273,10 +273,34 @@ CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "blog_platform")
 CACHE_TIMEOUT = {
     "hot_articles": int(os.getenv("CACHE_TIMEOUT_HOT_ARTICLES", "3600")),  # 热门文章缓存
     "article_detail": int(os.getenv("CACHE_TIMEOUT_ARTICLE_DETAIL", "1800")),  # 文章详情缓存
-    "article_list": int(os.getenv("CACHE_TIMEOUT_ARTICLE_LIST", "600")),  # 文章列表缓存
-    "search_results": int(os.getenv("CACHE_TIMEOUT_SEARCH_RESULTS", "300")),  # 搜索结果缓存
+    "article_list": int(os.getenv("CACHE_TIMEOUT_ARTICLE_LIST", "86400")),  # 文章列表缓存（按代际值失效，可以设置较长时间）
+    "search_results": int(os.getenv("CACHE_TIMEOUT_SEARCH_RESULTS", "3600")),  # 搜索结果缓存（按代际值失效）
+    "search_view_count": int(os.getenv("CACHE_TIMEOUT_SEARCH_VIEW_COUNT", "60")),  # 按访问次数排序的搜索结果缓存（访问计数写回不更新代际值）
 }
 
+# 进程内一级缓存：最大条目数（0 表示不使用）和条目最长保留时间（秒）
+# 只在订阅到 Redis 失效通知的服务进程中启用
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "1000"))
+LOCAL_CACHE_TIMEOUT = int(os.getenv("LOCAL_CACHE_TIMEOUT", "30"))
+
+# 文章访问计数写回数据库的间隔（秒），0 表示不在服务进程内启动刷新线程
+VIEW_COUNT_FLUSH_INTERVAL = int(os.getenv("VIEW_COUNT_FLUSH_INTERVAL", "10"))
+
+# 文章搜索后端：auto（优先使用已安装的原生全文索引）、fts5（SQLite）、mysql（MySQL FULLTEXT）、
+# index（自建倒排索引）、icontains（LIKE 查询）
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+
+# 每个搜索缓存的最大文章ID数（关键词、类型、排序相同的请求共用），超出部分的深分页直接查询
+SEARCH_MAX_CACHED_HITS = int(os.getenv("SEARCH_MAX_CACHED_HITS", "1000"))
+
+# 评论内容检查结果的缓存：进程内最大条目数，检查结果和重复内容计数的保留时间（秒）
+COMMENT_FILTER_MEMO_SIZE = int(os.getenv("COMMENT_FILTER_MEMO_SIZE", "2000"))
+COMMENT_FILTER_CACHE_TIMEOUT = int(os.getenv("COMMENT_FILTER_CACHE_TIMEOUT", "600"))
+# 相同内容（忽略大小写、全半角、空白和标点）在上述时间内出现超过该次数后，新评论进入人工审核
+COMMENT_DUPLICATE_THRESHOLD = int(os.getenv("COMMENT_DUPLICATE_THRESHOLD", "3"))
+# 新评论与最近多少天内的评论比较 SimHash 指纹，近似重复的评论进入人工审核
+COMMENT_NEAR_DUPLICATE_DAYS = int(os.getenv("COMMENT_NEAR_DUPLICATE_DAYS", "7"))
+
 # drf-spectacular 配置
 SPECTACULAR_SETTINGS = {
     "TITLE": os.getenv("API_TITLE", "博客平台 API"),
@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+# 启动文章访问计数的后台写回线程
+from utils.view_counter import start_view_count_flusher  # noqa: E402
+
+start_view_count_flusher()
+
+# 订阅缓存失效通知，订阅成功后启用进程内一级缓存
+from utils.local_cache import start_cache_invalidation_listener  # noqa: E402
+
+start_cache_invalidation_listener()
@@ -0,0 +1,167 @@
+"""
+Aho-Corasick 多模式匹配自动机
+
+把全部词构建为一个自动机（字典树 + 失败指针），对文本只扫描一次即可找出所有词的出现位置：
+- 扫描耗时与文本长度、匹配数成线性关系，与词的数量无关
+  （大词库的正则分支 a|b|c|... 在每个位置都要尝试大量分支）
+- 构建后只读，可以在多个线程间共享；词库变化时整体重建后替换
+- 构建结果可以导出（to_state）后在其他进程中直接恢复，不需要重新构建
+- 自动机按字符逐一比较，大小写等规范化由调用方在构建和匹配前完成
+- 停在根状态时用字符集正则直接跳到下一个可能是词开头的字符，没有匹配的大段文本不逐字处理
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick 自动机
+
+    状态 0 是根；每个状态保存转移表、失败指针、以该状态结尾的词，
+    以及失败链上最近的一个有词状态（输出链接），报告匹配时只沿输出链接走
+    """
+
+    def __init__(self, words: Iterable[str]):
+        """
+        Args:
+            words: 词列表，空字符串和重复的词被忽略
+        """
+        self.words: List[str] = list(dict.fromkeys(word for word in words if word))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 以该状态结尾的词的下标，-1 表示没有
+        self._word: List[int] = [-1]
+        # 失败链上最近的有词状态，0 表示没有
+        self._output: List[int] = [0]
+
+        for index, word in enumerate(self.words):
+            self._insert(word, index)
+        self._build_links()
+        self._first_char = self._compile_first_chars(self._goto[0])
+
+    def __len__(self):
+        return len(self.words)
+
+    @staticmethod
+    def _compile_first_chars(root: Dict[str, int]):
+        """所有词的首字符组成的字符集正则"""
+        first_chars = "".join(sorted(root))
+        return re.compile(f"[{re.escape(first_chars)}]") if first_chars else None
+
+    def to_state(self) -> Dict:
+        """
+        导出构建好的自动机（可以 JSON 序列化）
+
+        Returns:
+            Dict: 词、转移表、失败指针、状态的词下标和输出链接
+        """
+        return {
+            "words": self.words,
+            "goto": self._goto,
+            "fail": self._fail,
+            "word": self._word,
+            "output": self._output,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "AhoCorasick":
+        """
+        从 to_state() 的结果恢复自动机，不需要重新计算失败指针
+
+        Args:
+            state: to_state() 的结果
+        """
+        automaton = cls.__new__(cls)
+        automaton.words = state["words"]
+        automaton._goto = state["goto"]
+        automaton._fail = state["fail"]
+        automaton._word = state["word"]
+        automaton._output = state["output"]
+        automaton._first_char = cls._compile_first_chars(automaton._goto[0])
+        return automaton
+
+    def _insert(self, word: str, index: int):
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._word.append(-1)
+                self._output.append(0)
+                self._goto[state][char] = next_state
+            state = next_state
+        self._word[state] = index
+
+    def _build_links(self):
+        """按广度优先顺序计算失败指针和输出链接"""
+        goto, fail, word, output = self._goto, self._fail, self._word, self._output
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                target = goto[link].get(char, 0)
+                fail[next_state] = target if target != next_state else 0
+                output[next_state] = fail[next_state] if word[fail[next_state]] >= 0 else output[fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        扫描一次文本，按结束位置顺序产生全部匹配（包括相互重叠的）
+
+        Yields:
+            tuple: (开始, 结束, 词的下标)，text[开始:结束] 为匹配的词
+        """
+        if self._first_char is None:
+            return
+        goto, fail, word, output, words = self._goto, self._fail, self._word, self._output, self.words
+        skip = self._first_char.search
+        length = len(text)
+        state = position = 0
+        while position < length:
+            if not state:
+                found = skip(text, position)
+                if found is None:
+                    return
+                position = found.start()
+            char = text[position]
+            position += 1
+            next_state = goto[state].get(char)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto[state].get(char)
+            if next_state is None:
+                # 回到根且根上也没有该字符的转移
+                state = 0
+                continue
+            state = next_state
+            if word[state] >= 0:
+                index = word[state]
+                yield position - len(words[index]), position, index
+            link = output[state]
+            while link:
+                index = word[link]
+                yield position - len(words[index]), position, index
+                link = output[link]
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        找出互不重叠的匹配：从左到右，同一位置开始的取最长的词（与正则分支按长度降序排列时的结果相同）
+
+        Returns:
+            List[tuple]: 按位置排列的 (开始, 结束, 词的下标)
+        """
+        matches = sorted(self.iter_matches(text), key=lambda match: (match[0], -match[1]))
+        selected = []
+        position = 0
+        for match in matches:
+            if match[0] >= position:
+                selected.append(match)
+                position = match[1]
+        return selected
@@ -0,0 +1,476 @@
+"""
+缓存工具模块
+提供缓存键生成、基于代际计数（generation）的缓存失效和防缓存击穿的读取，
+代际值和缓存条目先读取进程内一级缓存（utils.local_cache），再读取 Redis
+"""
+
+import hashlib
+import logging
+import math
+import random
+import time
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Mapping, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from utils.local_cache import get_cache_stats, get_local_cache, invalidate_local
+
+logger = logging.getLogger(__name__)
+
+# 文章缓存的失效作用域
+ARTICLE_SCOPE_ALL = "articles:all"  # 所有文章（管理员可见的列表）
+ARTICLE_SCOPE_PUBLISHED = "articles:published"  # 已发布文章（公开列表、搜索、热门）
+# 评论者资料的失效作用域（评论列表中的用户名、头像等）
+COMMENT_USERS_SCOPE = "comments:users"
+
+
+def article_author_scope(author_id) -> str:
+    """某个作者的文章（作者本人可见的草稿）"""
+    return f"articles:author:{author_id}"
+
+
+def article_comments_scope(article_id) -> str:
+    """某篇文章的评论"""
+    return f"comments:article:{article_id}"
+
+
+class CacheGeneration:
+    """
+    代际计数器
+
+    每个作用域维护一个计数器，计数器的值嵌入该作用域下所有缓存键中。
+    写操作只需把计数器加一，旧键不会再被读取并随 TTL 自然过期，
+    失效是 O(1) 的，不需要用 Redis SCAN 逐个删除匹配的键。
+    """
+
+    @staticmethod
+    def get_key(scope: str) -> str:
+        """获取作用域计数器的缓存键"""
+        return f"{settings.CACHE_KEY_PREFIX}:generation:{scope}"
+
+    @classmethod
+    def get(cls, scope: str) -> int:
+        """
+        获取作用域当前的代际值
+
+        Args:
+            scope: 作用域名称
+
+        Returns:
+            int: 代际值
+        """
+        return cls.get_many([scope])[scope]
+
+    @classmethod
+    def get_many(cls, scopes: Iterable[str]) -> Dict[str, int]:
+        """
+        一次获取多个作用域的代际值
+
+        Args:
+            scopes: 作用域名称列表
+
+        Returns:
+            Dict[str, int]: 作用域 -> 代际值
+        """
+        keys = {cls.get_key(scope): scope for scope in scopes}
+        local_cache = get_local_cache()
+        stats = get_cache_stats()
+
+        generations = {}
+        missing = []
+        for key, scope in keys.items():
+            found, value = local_cache.get(key)
+            if found:
+                generations[scope] = value
+            else:
+                missing.append(key)
+        if not missing:
+            return generations
+
+        epoch = local_cache.get_epoch()
+        values = cache.get_many(missing)
+        for key in missing:
+            value = values.get(key)
+            stats.record("l2", value is not None)
+            if value is None:
+                value = cls._initialize(key)
+            local_cache.set(key, value, epoch=epoch)
+            generations[keys[key]] = value
+        return generations
+
+    @classmethod
+    def bump(cls, *scopes: str):
+        """
+        使作用域下的所有缓存失效
+
+        Args:
+            scopes: 作用域名称
+        """
+        keys = [cls.get_key(scope) for scope in scopes]
+        for key in keys:
+            try:
+                if cache.incr(key) is not None:
+                    continue
+            except ValueError:
+                # 计数器不存在（从未初始化或已被淘汰）
+                pass
+            cache.set(key, cls._initial_value(), timeout=None)
+        invalidate_local(keys)
+
+    @staticmethod
+    def _initial_value() -> int:
+        # 使用微秒时间戳作为初始值：计数器被淘汰后重新初始化的值一定大于旧值，
+        # 不会与仍未过期的旧缓存键重合
+        return time.time_ns() // 1000
+
+    @classmethod
+    def _initialize(cls, key: str) -> int:
+        initial = cls._initial_value()
+        cache.add(key, initial, timeout=None)
+        return cache.get(key, initial)
+
+
+def format_generations(generations: Dict[str, int]) -> str:
+    """把代际值格式化为缓存键片段"""
+    return ".".join(str(generations[scope]) for scope in sorted(generations))
+
+
+def normalize_page(value) -> str:
+    """页码规范化："01"、" 1" 都视为 "1"，无法解析的值原样保留（请求会返回404，不会被缓存）"""
+    value = str(value).strip()
+    try:
+        number = int(value)
+    except ValueError:
+        return value
+    return str(number) if number >= 1 else value
+
+
+def normalize_text(value) -> str:
+    """普通文本规范化：去掉首尾空白"""
+    return str(value).strip()
+
+
+def normalize_bool(value) -> str:
+    """布尔参数规范化：false/0/no/off 视为 false，其余视为 true"""
+    return "false" if str(value).strip().lower() in ("false", "0", "no", "off") else "true"
+
+
+# 缓存键参数规则：参数名 -> (默认值, 规范化函数)
+CacheKeySpec = Mapping[str, Tuple[str, Callable[[str], str]]]
+
+# 文章列表只有分页参数会影响结果
+ARTICLE_LIST_CACHE_PARAMS: CacheKeySpec = {
+    "page": ("1", normalize_page),
+}
+
+
+def canonicalize_params(params: Mapping, spec: CacheKeySpec) -> str:
+    """
+    把查询参数规范化为稳定的缓存键片段
+
+    - 只保留 spec 中列出的、真正影响结果的参数，缓存破坏参数等一律丢弃
+    - 缺省或为空的参数填充默认值，?page=1 与不带参数得到同一个键
+    - 参数值经过各自的规范化函数处理，并按参数名排序
+
+    Args:
+        params: 查询参数（QueryDict 或普通字典）
+        spec: 参数规则
+
+    Returns:
+        str: 形如 "page=2&q=django" 的规范化字符串
+    """
+    parts = []
+    for name in sorted(spec):
+        default, normalize = spec[name]
+        value = params.get(name)
+        if value is None or str(value).strip() == "":
+            value = default
+        parts.append(f"{name}={normalize(value)}")
+    return "&".join(parts)
+
+
+def get_params_digest(params: Mapping, spec: CacheKeySpec) -> str:
+    """获取规范化参数的摘要，用于缓存键"""
+    return hashlib.md5(canonicalize_params(params, spec).encode()).hexdigest()
+
+
+def get_article_detail_cache_key(pk) -> str:
+    """获取文章详情缓存键"""
+    return f"{settings.CACHE_KEY_PREFIX}:article:detail:{pk}"
+
+
+def get_cache_audience(user) -> str:
+    """
+    获取用户在缓存键中的可见范围：匿名用户、管理员各共享一份，其他登录用户各自一份
+
+    Args:
+        user: 当前用户
+
+    Returns:
+        str: anonymous、staff 或 user:{pk}
+    """
+    if not user.is_authenticated:
+        return "anonymous"
+    if user.is_staff:
+        return "staff"
+    return f"user:{user.pk}"
+
+
+def get_article_list_scopes(user) -> List[str]:
+    """
+    获取用户可见文章列表所依赖的失效作用域
+
+    Args:
+        user: 当前用户
+
+    Returns:
+        List[str]: 作用域列表
+    """
+    if not user.is_authenticated:
+        return [ARTICLE_SCOPE_PUBLISHED]
+    if user.is_staff:
+        return [ARTICLE_SCOPE_ALL]
+    return [ARTICLE_SCOPE_PUBLISHED, article_author_scope(user.pk)]
+
+
+def invalidate_article_caches(*articles):
+    """
+    文章写入后使相关缓存失效：详情缓存直接删除，列表/搜索/热门缓存通过代际计数失效；
+    评论列表能否访问取决于文章状态，评论校验值也随之失效
+
+    失效在事务提交后才执行：否则其他请求可能在提交前读到旧数据，
+    以新的代际值缓存下来，直到下次写入前都不会更新。
+    作用域和缓存键立即计算（删除后的文章对象 pk 会被置空）
+
+    Args:
+        articles: 发生变化的文章对象
+    """
+    if not articles:
+        return
+
+    scopes = {ARTICLE_SCOPE_ALL, ARTICLE_SCOPE_PUBLISHED}
+    scopes.update(article_author_scope(article.author_id) for article in articles)
+    scopes.update(article_comments_scope(article.pk) for article in articles)
+    detail_keys = [get_article_detail_cache_key(article.pk) for article in articles]
+    transaction.on_commit(partial(expire_article_caches, sorted(scopes), detail_keys))
+
+
+def expire_article_caches(scopes: List[str], detail_keys: List[str]) -> None:
+    """增加文章相关作用域的代际值并删除详情缓存"""
+    CacheGeneration.bump(*scopes)
+    cache.delete_many(detail_keys)
+    invalidate_local(detail_keys)
+
+
+def invalidate_comment_caches(*article_ids):
+    """
+    评论写入后使所属文章的评论校验值（ETag）失效
+
+    Args:
+        article_ids: 评论发生变化的文章ID
+    """
+    if article_ids:
+        CacheGeneration.bump(*sorted({article_comments_scope(pk) for pk in article_ids}))
+
+
+def invalidate_comment_user_caches():
+    """用户资料（用户名、头像等）变化后使所有评论校验值失效"""
+    CacheGeneration.bump(COMMENT_USERS_SCOPE)
+
+
+class ProtectedCache:
+    """
+    防缓存击穿（cache stampede）的读取助手
+
+    缓存条目形如 {'value': 值, 'expires_at': 逻辑过期时间, 'delta': 重新计算耗时}，
+    实际 TTL 比逻辑 TTL 多出 STALE_GRACE 秒：
+    - 概率提前过期：剩余时间越短、重新计算越慢，越可能由某个请求提前刷新
+      （now - delta * beta * ln(rand) >= expires_at），避免所有请求在同一时刻未命中
+    - 单飞锁：需要刷新时只有拿到锁的请求重新计算，
+      其他请求在条目逻辑过期后的宽限期内直接使用旧值（stale-while-revalidate），
+      完全没有缓存时短暂等待拿到锁的请求写入结果
+    - 缓存不可用时直接计算，不会等待
+    条目同时写入进程内一级缓存，一级缓存命中时不访问 Redis；
+    返回的对象可能被多个请求共享，调用方不能修改
+    """
+
+    # 锁的最长持有时间（秒），防止计算进程崩溃后锁不释放
+    LOCK_TIMEOUT = 10
+    # 没有旧值时等待其他请求计算结果的最长时间（秒）和轮询间隔
+    WAIT_TIMEOUT = 1.0
+    WAIT_INTERVAL = 0.05
+    # 逻辑过期后仍可作为旧值返回的时间（秒）
+    STALE_GRACE = 300
+    # 提前过期系数，越大越早刷新
+    BETA = 1.0
+
+    @staticmethod
+    def get_lock_key(key: str) -> str:
+        """获取重新计算锁的缓存键"""
+        return f"{key}:lock"
+
+    @classmethod
+    def get_entry(cls, key: str):
+        """
+        读取缓存条目
+
+        Returns:
+            dict or None: 缓存条目，不存在或格式不符时返回 None
+        """
+        local_cache = get_local_cache()
+        stats = get_cache_stats()
+        if local_cache.enabled:
+            found, entry = local_cache.get(key)
+            stats.record("l1", found)
+            if found:
+                return entry
+
+        epoch = local_cache.get_epoch()
+        entry = cache.get(key)
+        if not (isinstance(entry, dict) and "expires_at" in entry and "value" in entry):
+            stats.record("l2", False)
+            return None
+        stats.record("l2", True)
+        local_cache.set(key, entry, timeout=entry["expires_at"] + cls.STALE_GRACE - time.time(), epoch=epoch)
+        return entry
+
+    @classmethod
+    def get(cls, key: str, default=None):
+        """读取缓存值（不考虑是否过期）"""
+        entry = cls.get_entry(key)
+        return default if entry is None else entry["value"]
+
+    @classmethod
+    def get_many(cls, keys: Iterable[str]) -> Dict[str, object]:
+        """
+        批量读取缓存值（不考虑是否过期），一级缓存未命中的键只访问一次 Redis
+
+        Returns:
+            dict: 缓存键 -> 缓存值，只包含命中的键
+        """
+        local_cache = get_local_cache()
+        stats = get_cache_stats()
+        values, missing = {}, []
+        for key in keys:
+            if local_cache.enabled:
+                found, entry = local_cache.get(key)
+                stats.record("l1", found)
+                if found:
+                    values[key] = entry["value"]
+                    continue
+            missing.append(key)
+        if not missing:
+            return values
+
+        epoch = local_cache.get_epoch()
+        entries = cache.get_many(missing) or {}
+        for key in missing:
+            entry = entries.get(key)
+            if not (isinstance(entry, dict) and "expires_at" in entry and "value" in entry):
+                stats.record("l2", False)
+                continue
+            stats.record("l2", True)
+            local_cache.set(key, entry, timeout=entry["expires_at"] + cls.STALE_GRACE - time.time(), epoch=epoch)
+            values[key] = entry["value"]
+        return values
+
+    @classmethod
+    def set(cls, key: str, value, timeout: int, delta: float = 0.0, epoch: int = None):
+        """
+        写入缓存值
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            timeout: 逻辑过期时间（秒）
+            delta: 计算该值的耗时（秒），用于概率提前过期
+            epoch: 开始计算前的一级缓存失效序号，计算期间发生过失效时不写入一级缓存
+        """
+        if epoch is None:
+            epoch = get_local_cache().get_epoch()
+        entry = {"value": value, "expires_at": time.time() + timeout, "delta": delta}
+        cache.set(key, entry, timeout=timeout + cls.STALE_GRACE)
+        get_local_cache().set(key, entry, timeout=timeout + cls.STALE_GRACE, epoch=epoch)
+
+    @classmethod
+    def set_many(cls, values: Mapping[str, object], timeout: int, epoch: int = None):
+        """
+        批量写入缓存值（一次访问 Redis），参数含义同 set
+
+        Args:
+            values: 缓存键 -> 缓存值
+        """
+        if not values:
+            return
+        if epoch is None:
+            epoch = get_local_cache().get_epoch()
+        expires_at = time.time() + timeout
+        entries = {key: {"value": value, "expires_at": expires_at, "delta": 0.0} for key, value in values.items()}
+        cache.set_many(entries, timeout=timeout + cls.STALE_GRACE)
+        for key, entry in entries.items():
+            get_local_cache().set(key, entry, timeout=timeout + cls.STALE_GRACE, epoch=epoch)
+
+    @classmethod
+    def should_refresh(cls, entry) -> bool:
+        """判断条目是否需要刷新（已过期或被提前选中）"""
+        # 1 - random() 的取值范围是 (0, 1]，避免 log(0)
+        early = entry["delta"] * cls.BETA * -math.log(1.0 - random.random())
+        return time.time() + early >= entry["expires_at"]
+
+    @classmethod
+    def get_or_compute(cls, key: str, compute: Callable, timeout: int):
+        """
+        读取缓存，未命中或需要刷新时单飞计算
+
+        Args:
+            key: 缓存键
+            compute: 无参数的计算函数，抛出的异常会原样传出且不写入缓存
+            timeout: 逻辑过期时间（秒）
+
+        Returns:
+            缓存值或新计算的值
+        """
+        entry = cls.get_entry(key)
+        if entry is not None and not cls.should_refresh(entry):
+            return entry["value"]
+
+        lock_key = cls.get_lock_key(key)
+        locked = cache.add(lock_key, 1, timeout=cls.LOCK_TIMEOUT)
+        if locked is None:
+            # 缓存不可用（django_redis 忽略异常时返回 None），直接计算
+            return compute()
+        if not locked:
+            if entry is not None:
+                # 其他请求正在刷新，先返回旧值
+                return entry["value"]
+            entry = cls.wait_for_entry(key)
+            if entry is not None:
+                return entry["value"]
+            logger.warning(f"等待缓存 {key} 超时，直接计算")
+            return compute()
+
+        try:
+            epoch = get_local_cache().get_epoch()
+            start = time.monotonic()
+            value = compute()
+            cls.set(key, value, timeout, delta=time.monotonic() - start, epoch=epoch)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    @classmethod
+    def wait_for_entry(cls, key: str):
+        """等待其他请求写入缓存条目，超时返回 None"""
+        deadline = time.monotonic() + cls.WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(cls.WAIT_INTERVAL)
+            entry = cls.get_entry(key)
+            if entry is not None:
+                return entry
+            if not cache.get(cls.get_lock_key(key)):
+                # 计算方失败并释放了锁
+                return None
+        return None
@@ -0,0 +1,89 @@
+"""
+条件请求（ETag / Last-Modified）工具模块
+
+校验值由版本信息（更新时间、代际值、预渲染字节）直接计算，
+在序列化之前判断 If-None-Match / If-Modified-Since，匹配时返回 304，
+客户端轮询时不需要重新下载和渲染未变化的内容
+"""
+
+import hashlib
+from typing import Optional
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts, weak: bool = False) -> str:
+    """
+    由版本信息生成 ETag
+
+    Args:
+        parts: 决定响应内容的版本信息
+        weak: 是否为弱校验值（内容语义相同但字节可能不同时使用）
+
+    Returns:
+        str: 带引号的 ETag
+    """
+    digest = hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def get_content_etag(content: bytes) -> str:
+    """由响应体字节生成强校验值"""
+    return f'"{hashlib.md5(content).hexdigest()}"'
+
+
+def set_validators(response, etag: Optional[str] = None, last_modified: Optional[int] = None):
+    """
+    设置响应的校验头
+
+    Args:
+        response: 响应对象
+        etag: ETag
+        last_modified: 最后修改时间（Unix 时间戳，秒）
+
+    Returns:
+        响应对象本身
+    """
+    if etag:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def get_not_modified_response(request, etag: Optional[str] = None, last_modified: Optional[int] = None):
+    """
+    按 RFC 9110 的顺序判断条件请求头
+
+    Args:
+        request: 当前请求
+        etag: 当前内容的 ETag
+        last_modified: 当前内容的最后修改时间（Unix 时间戳，秒）
+
+    Returns:
+        条件匹配时返回带校验头的 304（或 412）响应，否则返回 None
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        return None
+    return set_validators(response, etag, last_modified)
+
+
+def conditional_response(request, response, etag: Optional[str] = None, last_modified: Optional[int] = None):
+    """
+    为已生成的响应设置校验头，条件匹配时以 304 代替
+
+    Args:
+        request: 当前请求
+        response: 完整响应
+        etag: ETag
+        last_modified: 最后修改时间（Unix 时间戳，秒）
+
+    Returns:
+        304 响应或设置了校验头的原响应
+    """
+    not_modified = get_not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    return set_validators(response, etag, last_modified)
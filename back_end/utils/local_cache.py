@@ -0,0 +1,278 @@
+"""
+进程内一级缓存模块
+
+在 django_redis（二级缓存）前面增加一个有容量和 TTL 上限的进程内 LRU 缓存：
+- 命中时直接返回 Python 对象，没有网络往返，也不需要解压和反序列化
+- 写操作通过 Redis 发布/订阅通知所有进程删除对应的一级缓存条目
+- 订阅线程未运行或与 Redis 断开时一级缓存自动停用并清空，
+  因此一级缓存只会在能收到失效通知的进程中使用
+- 一级缓存的 TTL 很短，作为通知丢失时的兜底
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Iterable, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# 表示"清空全部"的失效消息
+INVALIDATE_ALL = "*"
+
+
+class CacheStats:
+    """
+    分层缓存命中统计（进程内）
+
+    计数器名称形如 l1_hits、l1_misses、l2_hits、l2_misses
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, tier: str, hit: bool):
+        """记录一次读取"""
+        with self._lock:
+            self._counts[f"{tier}_{'hits' if hit else 'misses'}"] += 1
+
+    def snapshot(self) -> dict:
+        """
+        获取统计快照
+
+        Returns:
+            dict: 各层的命中次数、未命中次数和命中率
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        stats = {}
+        for tier in ("l1", "l2"):
+            hits = counts.get(f"{tier}_hits", 0)
+            misses = counts.get(f"{tier}_misses", 0)
+            total = hits + misses
+            stats[tier] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / total if total else 0.0,
+            }
+        return stats
+
+    def reset(self):
+        """清零统计"""
+        with self._lock:
+            self._counts.clear()
+
+
+class LocalLRUCache:
+    """
+    进程内 LRU 缓存
+
+    条目数量超过 max_entries 时淘汰最久未使用的条目，每个条目有独立的过期时间。
+    存入的对象直接返回给调用方，调用方不能修改它们。
+    """
+
+    def __init__(self, max_entries: int, timeout: float):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.enabled = False
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # 每次失效加一，读取二级缓存期间发生过失效时不写入一级缓存
+        self._epoch = 0
+
+    def enable(self):
+        """启用一级缓存（能收到失效通知时调用）"""
+        self.enabled = self.max_entries > 0
+
+    def disable(self):
+        """停用并清空一级缓存"""
+        self.enabled = False
+        self.clear()
+
+    def get(self, key: str) -> Tuple[bool, object]:
+        """
+        读取缓存
+
+        Returns:
+            tuple: (是否命中, 值)
+        """
+        if not self.enabled:
+            return False, None
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def get_epoch(self) -> int:
+        """获取当前失效序号，读取二级缓存前调用，并在写入时传回"""
+        return self._epoch
+
+    def set(self, key: str, value, timeout: float = None, epoch: int = None):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 值
+            timeout: 过期时间（秒），不超过一级缓存的 TTL 上限
+            epoch: 读取二级缓存前的失效序号，期间发生过失效时放弃写入
+        """
+        if not self.enabled:
+            return
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        if timeout <= 0:
+            return
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys: str):
+        """删除缓存条目"""
+        with self._lock:
+            self._epoch += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheInvalidationListener(threading.Thread):
+    """
+    一级缓存失效通知的订阅线程
+
+    连接成功后启用一级缓存，断开时停用并清空（期间的通知可能已经丢失），
+    重连成功后再次启用
+    """
+
+    # 断开后重连的间隔（秒）
+    RETRY_INTERVAL = 5
+
+    def __init__(self, local_cache: LocalLRUCache, channel: str, alias: str = "default"):
+        super().__init__(name="cache-invalidation-listener", daemon=True)
+        self.local_cache = local_cache
+        self.channel = channel
+        self.alias = alias
+        self._stopped = threading.Event()
+
+    def run(self):
+        from django_redis import get_redis_connection
+
+        while not self._stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = get_redis_connection(self.alias).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self.local_cache.clear()
+                self.local_cache.enable()
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.handle(message["data"])
+            except Exception as e:
+                logger.warning(f"缓存失效通知订阅中断，暂停使用进程内缓存: {e}")
+                self.local_cache.disable()
+                self._stopped.wait(self.RETRY_INTERVAL)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def handle(self, data):
+        """处理一条失效消息：以换行分隔的缓存键"""
+        if isinstance(data, bytes):
+            data = data.decode()
+        keys = [key for key in data.split("\n") if key]
+        if INVALIDATE_ALL in keys:
+            self.local_cache.clear()
+        else:
+            self.local_cache.delete(*keys)
+
+    def stop(self):
+        self._stopped.set()
+
+
+# 全局实例
+_local_cache = None
+_cache_stats = CacheStats()
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def get_local_cache() -> LocalLRUCache:
+    """获取进程内一级缓存实例"""
+    global _local_cache
+    if _local_cache is None:
+        _local_cache = LocalLRUCache(
+            max_entries=getattr(settings, "LOCAL_CACHE_MAX_ENTRIES", 1000),
+            timeout=getattr(settings, "LOCAL_CACHE_TIMEOUT", 30),
+        )
+    return _local_cache
+
+
+def get_cache_stats() -> CacheStats:
+    """获取分层缓存命中统计"""
+    return _cache_stats
+
+
+def get_invalidation_channel() -> str:
+    """获取失效通知的频道名"""
+    return f"{settings.CACHE_KEY_PREFIX}:cache:invalidate"
+
+
+def invalidate_local(keys: Iterable[str]):
+    """
+    删除本进程的一级缓存条目，并通知其他进程删除
+
+    Args:
+        keys: 缓存键
+    """
+    keys = list(keys)
+    if not keys:
+        return
+    get_local_cache().delete(*keys)
+    try:
+        from django_redis import get_redis_connection
+
+        get_redis_connection("default").publish(get_invalidation_channel(), "\n".join(keys))
+    except Exception as e:
+        # 非 django_redis 后端或 Redis 不可用：其他进程的订阅线程此时也已断开并停用一级缓存
+        logger.debug(f"发布缓存失效通知失败: {e}")
+
+
+def start_cache_invalidation_listener():
+    """
+    启动失效通知订阅线程，订阅成功后本进程开始使用一级缓存
+
+    由 WSGI/ASGI 入口调用；LOCAL_CACHE_MAX_ENTRIES 为 0 时不启动
+    """
+    global _listener
+    if getattr(settings, "LOCAL_CACHE_MAX_ENTRIES", 1000) <= 0:
+        return None
+
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = CacheInvalidationListener(get_local_cache(), get_invalidation_channel())
+            _listener.start()
+    return _listener
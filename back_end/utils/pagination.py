@@ -0,0 +1,219 @@
+"""
+分页工具模块
+提供基于索引的游标（keyset）分页，深分页的代价与第一页相同
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from utils.cache import normalize_bool
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    游标分页与页码分页的组合
+
+    - 不带 cursor 参数时与 PageNumberPagination 完全一致，保持现有客户端兼容
+    - 带 cursor 参数时（第一页传空值 ?cursor=）使用 keyset 分页：
+      按 (排序字段, id) 组成的键做范围查询，WHERE (created_at, id) < (上一页最后一条)，
+      直接命中 (status, -created_at) / (-view_count) 索引，没有 OFFSET
+    - 游标是签名后的不透明字符串，被篡改或与当前排序不匹配时返回404
+    - 默认返回总数，传 count=false 可以跳过 COUNT(*) 查询
+
+    视图通过 get_cursor_ordering() 提供排序字段（如 ['-created_at']），
+    未提供时使用查询集自身的排序；id 会自动追加为最后的排序字段
+    """
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = '无效的游标'
+    cursor_salt = 'utils.pagination.KeysetPagination'
+
+    def is_cursor_request(self, request):
+        """判断请求是否使用游标分页"""
+        return self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_cursor_request(request):
+            self.cursor_mode = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.cursor_mode = True
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        self.count = None
+        if self.should_count(request):
+            self.count = queryset.count()
+
+        # 向前翻页时反转排序，取到结果后再反转回来
+        order_by = [self.flip(field) if reverse else field for field in self.ordering]
+        queryset = queryset.order_by(*order_by)
+        if position is not None:
+            queryset = queryset.filter(self.build_keyset_filter(order_by, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page_results = results
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next or not self.page_results:
+            return None
+        return self.build_cursor_link(self.page_results[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page_results:
+            return None
+        return self.build_cursor_link(self.page_results[0], reverse=True)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count']['nullable'] = True
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.extend([
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': '游标分页：首次请求传空值，之后使用响应中 next/previous 链接携带的游标',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': '游标分页时传 false 跳过总数统计，count 返回 null',
+                'schema': {'type': 'boolean'},
+            },
+        ])
+        return parameters
+
+    def get_ordering(self, queryset, view):
+        """
+        获取排序字段列表，并追加 id 作为唯一的决胜字段
+
+        Returns:
+            list: 如 ['-created_at', '-id']
+        """
+        ordering = None
+        if view is not None and hasattr(view, 'get_cursor_ordering'):
+            ordering = view.get_cursor_ordering()
+        if not ordering:
+            ordering = list(queryset.query.order_by or queryset.model._meta.ordering or [])
+
+        ordering = [field for field in ordering if field.lstrip('-') not in ('id', 'pk')]
+        direction = '-' if ordering and ordering[-1].startswith('-') else ''
+        return ordering + [f'{direction}id']
+
+    def should_count(self, request):
+        """是否统计总数（count=false/0/no 时跳过）"""
+        return normalize_bool(request.query_params.get(self.count_query_param, 'true')) == 'true'
+
+    @staticmethod
+    def flip(field):
+        """反转排序方向"""
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def build_keyset_filter(order_by, position):
+        """
+        构建 keyset 条件
+
+        对排序 [-a, -b, -id] 和位置 (x, y, z) 生成：
+            a < x OR (a = x AND b < y) OR (a = x AND b = y AND id < z)
+        """
+        condition = Q()
+        equal_prefix = Q()
+        for field, value in zip(order_by, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal_prefix & Q(**{f'{name}__{lookup}': value})
+            equal_prefix &= Q(**{name: value})
+        return condition
+
+    def get_ordering_signature(self):
+        """游标与排序方式绑定，排序不同的游标不能混用"""
+        return ','.join(self.ordering)
+
+    def build_cursor_link(self, instance, reverse):
+        """根据边界记录生成游标链接"""
+        position = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip('-'))
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            position.append(value)
+
+        token = signing.dumps(
+            {'o': self.get_ordering_signature(), 'p': position, 'r': reverse},
+            salt=self.cursor_salt,
+            compress=True,
+        )
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        """
+        解析游标
+
+        Returns:
+            tuple: (位置值列表或None, 是否向前翻页)
+        """
+        token = request.query_params.get(self.cursor_query_param, '').strip()
+        if not token:
+            return None, False
+
+        try:
+            payload = signing.loads(token, salt=self.cursor_salt)
+            if payload['o'] != self.get_ordering_signature():
+                raise ValueError('ordering mismatch')
+            position = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, payload['p'])
+            ]
+            if len(position) != len(self.ordering):
+                raise ValueError('position mismatch')
+            return position, bool(payload['r'])
+        except (signing.BadSignature, KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
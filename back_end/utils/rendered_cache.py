@@ -0,0 +1,145 @@
+"""
+预渲染响应缓存模块
+
+缓存最终编码好的 JSON 字节而不是 response.data：
+- 命中时直接把字节作为响应体返回，不再经过序列化器和 JSONRenderer
+- 缓存中保存的是 bytes，反序列化代价与数据结构的复杂度无关
+- 只有协商结果为 JSON 的请求使用字节缓存，可浏览 API 等其他格式走正常渲染
+- 文章详情中随请求变化的 view_count、列表中随请求 URL 变化的分页链接
+  通过在字节中预留位置拼接，不需要重新渲染
+"""
+
+import json
+import uuid
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from utils.cache import ProtectedCache
+
+_json_renderer = JSONRenderer()
+
+
+class RenderedJSONResponse(Response):
+    """
+    使用预渲染字节作为响应体的 Response
+
+    rendered_content 直接返回缓存的字节，不调用渲染器；
+    data 只在被访问时（如测试客户端）才从字节解码
+    """
+
+    def __init__(self, body: bytes, status=None, headers=None):
+        super().__init__(data=None, status=status, headers=headers)
+        self.rendered_body = body
+
+    @property
+    def data(self):
+        if self._data is None and getattr(self, "rendered_body", None) is not None:
+            self._data = json.loads(self.rendered_body)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        self["Content-Type"] = _json_renderer.media_type
+        return self.rendered_body
+
+
+def render_json(data) -> bytes:
+    """用与 DRF JSONRenderer 相同的设置编码数据"""
+    return _json_renderer.render(data)
+
+
+def accepts_rendered_json(request) -> bool:
+    """请求的协商结果是否为普通 JSON（不带 indent 等参数）"""
+    return isinstance(getattr(request, "accepted_renderer", None), JSONRenderer) and (
+        request.accepted_media_type == _json_renderer.media_type
+    )
+
+
+def get_rendered_cache_key(base_key: str) -> str:
+    """
+    获取预渲染缓存键
+
+    随请求 URL 变化的内容（如分页链接）不能进入缓存的字节，
+    应在字节中预留位置（split_rendered_fields），每次请求拼接
+
+    Args:
+        base_key: 数据部分的缓存键（已包含代际值和规范化参数）
+
+    Returns:
+        str: 缓存键
+    """
+    return f"{base_key}:rendered"
+
+
+def cached_json_response(request, cache_key: str, compute: Callable, timeout: int) -> Response:
+    """
+    返回预渲染缓存的 JSON 响应，未命中时计算数据并渲染（单飞）
+
+    Args:
+        request: 当前请求
+        cache_key: 预渲染缓存键
+        compute: 返回响应数据的函数
+        timeout: 缓存时间（秒）
+
+    Returns:
+        Response: 预渲染响应；非 JSON 请求返回普通 Response
+    """
+    if not accepts_rendered_json(request):
+        return Response(compute())
+    body = ProtectedCache.get_or_compute(cache_key, lambda: render_json(compute()), timeout)
+    return RenderedJSONResponse(body)
+
+
+def split_rendered_fields(data: dict, fields: Sequence[str]) -> Optional[List[bytes]]:
+    """
+    渲染数据并在指定字段的值处切开，用于之后拼接随请求变化的值
+
+    Args:
+        data: 响应数据
+        fields: 需要预留位置的顶层字段（按在 data 中出现的顺序）
+
+    Returns:
+        list: len(fields) + 1 段字节；无法唯一定位时返回 None
+    """
+    token = uuid.uuid4().hex
+    placeholders = {field: f"__{field}_{token}__" for field in fields}
+    body = render_json({**data, **placeholders})
+    parts = [body]
+    for field in fields:
+        pieces = parts[-1].split(json.dumps(placeholders[field]).encode())
+        if len(pieces) != 2:
+            return None
+        parts[-1:] = pieces
+    return parts
+
+
+def join_rendered_fields(parts: Sequence[bytes], values: Sequence) -> bytes:
+    """把各字段的值依次拼接回 split_rendered_fields 切开的字节"""
+    chunks = [parts[0]]
+    for value, part in zip(values, parts[1:]):
+        # JSONRenderer 把 None 渲染为空字节，这里需要 JSON 的 null
+        chunks.append(b"null" if value is None else render_json(value))
+        chunks.append(part)
+    return b"".join(chunks)
+
+
+def split_rendered_field(data: dict, field: str) -> Optional[Tuple[bytes, bytes]]:
+    """
+    渲染数据并在单个字段的值处切开（见 split_rendered_fields）
+
+    Returns:
+        tuple: (字段值之前的字节, 字段值之后的字节)；无法唯一定位时返回 None
+    """
+    parts = split_rendered_fields(data, [field])
+    return tuple(parts) if parts is not None else None
+
+
+def join_rendered_field(parts: Tuple[bytes, bytes], value) -> bytes:
+    """把字段值拼接回 split_rendered_field 切开的字节"""
+    return join_rendered_fields(parts, [value])
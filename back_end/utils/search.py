@@ -5,8 +5,10 @@
 
 import re
 from django.db.models import Q
-from django.core.cache import cache
 from django.conf import settings
+from utils.cache import ProtectedCache, canonicalize_params, normalize_bool, normalize_page, normalize_text
+from utils.search_highlight import SearchHighlighter  # noqa: F401  兼容原有的导入路径
+from utils.search_query import SearchPlan, parse_search_query, to_query_string
 import hashlib
 
 
@@ -25,23 +27,22 @@ class SearchQueryBuilder:
         添加文本搜索条件
         
         Args:
-            query (str): 搜索关键词
+            query (str): 搜索关键词，支持 utils.search_query 的查询语法
             fields (list): 要搜索的字段列表
         """
         if not query or not fields:
             return self
             
-        # 清理搜索关键词
-        cleaned_query = self._clean_query(query)
-        if not cleaned_query:
+        # 解析查询语法（AND/OR/NOT、短语、字段前缀、前缀通配符）
+        node = parse_search_query(query)
+        if node is None:
             return self
             
-        # 构建搜索条件
-        text_conditions = Q()
-        for field in fields:
-            text_conditions |= Q(**{f"{field}__icontains": cleaned_query})
-            
-        self.query_conditions &= text_conditions
+        # 构建搜索条件：标题、正文由配置的搜索后端匹配，作者按用户名匹配；
+        # "与"查询从估计结果最少的词开始执行
+        fields = ['author' if field == 'author__username' else field for field in fields]
+        plan = SearchPlan(node, fields)
+        self.query_conditions &= plan.build_condition(self.model_class._default_manager.all())
         return self
     
     def add_exact_match(self, field, value):
@@ -80,7 +81,8 @@ class SearchQueryBuilder:
         """
         return self.query_conditions
     
-    def _clean_query(self, query):
+    @staticmethod
+    def _clean_query(query):
         """
         清理搜索关键词
         
@@ -102,13 +104,70 @@ class SearchQueryBuilder:
         return cleaned.strip()
 
 
+def normalize_search_query(query):
+    """
+    搜索关键词规范化：解析查询语法后还原为规范的查询字符串（词小写，运算符大写）
+
+    "Django  缓存"、" django 缓存! "、"django AND 缓存" 的搜索结果相同，得到同一个缓存键
+    """
+    return to_query_string(parse_search_query(str(query)))
+
+
+# 搜索缓存键参数规则：参数名 -> (默认值, 规范化函数)
+SEARCH_CACHE_PARAMS = {
+    'q': ('', normalize_search_query),
+    'type': ('all', normalize_text),
+    'ordering': ('relevance', normalize_text),
+    'page': ('1', normalize_page),
+    'cursor': ('', normalize_text),
+    'count': ('true', normalize_bool),
+}
+
+# 搜索命中缓存只与关键词、搜索类型和排序方式有关，所有页共用
+SEARCH_HITS_PARAMS = {name: SEARCH_CACHE_PARAMS[name] for name in ('q', 'type', 'ordering')}
+
+
+class SearchHits:
+    """
+    搜索命中：按排序排列的文章ID和总数，可直接交给分页器
+
+    缓存中只保存前 SEARCH_MAX_CACHED_HITS 个ID，切片得到该页的文章ID；
+    超出范围的深分页由 fetch(start, stop) 重新查询
+    """
+
+    def __init__(self, ids, count, fetch=None):
+        """
+        Args:
+            ids (list): 排在前面的文章ID
+            count (int): 命中总数
+            fetch (callable, optional): 查询 [start, stop) 范围内文章ID的函数
+        """
+        self.ids = ids
+        self._count = count
+        self.fetch = fetch
+
+    def count(self):
+        return self._count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _ = index.indices(self._count)
+        if stop <= len(self.ids) or self.fetch is None:
+            return self.ids[start:stop]
+        return list(self.fetch(start, stop))
+
+
 class SearchCache:
     """
     搜索缓存管理器
     """
     
     @staticmethod
-    def get_cache_key(query, search_type, ordering, page, user_id=None):
+    def get_cache_key(query, search_type, ordering, page, user_id=None, generation=None, cursor=None, count=None):
         """
         生成搜索缓存键
         
@@ -118,22 +177,49 @@ class SearchCache:
             ordering (str): 排序方式
             page (str): 页码
             user_id (int, optional): 用户ID
+            generation (int, optional): 已发布文章的代际值，文章变化后旧缓存自动失效
+            cursor (str, optional): 游标分页的游标，None 表示页码分页
+            count (str, optional): 游标分页时是否统计总数
             
         Returns:
             str: 缓存键
         """
+        params = {'q': query, 'type': search_type, 'ordering': ordering, 'page': page, 'count': count}
+        if cursor is not None:
+            # 加前缀区分 "?cursor=" （游标分页第一页）与不带游标的页码分页
+            params['cursor'] = f"~{cursor}"
+        canonical = canonicalize_params(params, SEARCH_CACHE_PARAMS)
         cache_key_parts = [
             f"{settings.CACHE_KEY_PREFIX}:search",
-            f"q:{hashlib.md5(query.encode()).hexdigest()}",
-            f"type:{search_type}",
-            f"ordering:{ordering}",
-            f"page:{page}"
+            f"gen:{generation}",
+            f"params:{hashlib.md5(canonical.encode()).hexdigest()}",
         ]
         
         if user_id:
             cache_key_parts.append(f"user:{user_id}")
             
         return ":".join(cache_key_parts)
+
+    @staticmethod
+    def get_hits_cache_key(query, search_type, ordering, generation=None):
+        """
+        生成搜索命中（文章ID列表）的缓存键，不含分页参数
+
+        Args:
+            query (str): 搜索关键词
+            search_type (str): 搜索类型
+            ordering (str): 排序方式
+            generation (int, optional): 已发布文章的代际值
+
+        Returns:
+            str: 缓存键
+        """
+        canonical = canonicalize_params({'q': query, 'type': search_type, 'ordering': ordering}, SEARCH_HITS_PARAMS)
+        return ":".join([
+            f"{settings.CACHE_KEY_PREFIX}:search:hits",
+            f"gen:{generation}",
+            f"params:{hashlib.md5(canonical.encode()).hexdigest()}",
+        ])
     
     @staticmethod
     def get_cached_result(cache_key):
@@ -146,7 +232,7 @@ class SearchCache:
         Returns:
             dict or None: 缓存的搜索结果
         """
-        return cache.get(cache_key)
+        return ProtectedCache.get(cache_key)
     
     @staticmethod
     def cache_result(cache_key, result, timeout=None):
@@ -159,66 +245,27 @@ class SearchCache:
             timeout (int, optional): 缓存超时时间（秒）
         """
         if timeout is None:
-            timeout = settings.CACHE_TIMEOUT.get('search_results', 300)
+            timeout = settings.CACHE_TIMEOUT.get('search_results', 3600)
         
-        cache.set(cache_key, result, timeout=timeout)
-
+        ProtectedCache.set(cache_key, result, timeout)
 
-class SearchHighlighter:
-    """
-    搜索结果高亮器
-    """
-    
     @staticmethod
-    def highlight_text(text, query, max_length=200):
+    def get_or_compute(cache_key, compute, timeout=None):
         """
-        在文本中高亮搜索关键词
+        获取缓存的搜索结果，未命中或即将过期时只由一个请求重新搜索
         
         Args:
-            text (str): 原始文本
-            query (str): 搜索关键词
-            max_length (int): 最大文本长度
+            cache_key (str): 缓存键
+            compute (callable): 执行搜索并返回结果的函数
+            timeout (int, optional): 缓存超时时间（秒）
             
         Returns:
-            str: 高亮后的文本
-        """
-        if not text or not query:
-            return text[:max_length] + "..." if len(text) > max_length else text
-        
-        # 清理搜索关键词
-        cleaned_query = re.sub(r'[^\w\s\u4e00-\u9fff]', ' ', query)
-        keywords = cleaned_query.split()
-        
-        if not keywords:
-            return text[:max_length] + "..." if len(text) > max_length else text
-        
-        # 查找关键词在文本中的位置
-        highlighted_text = text
-        for keyword in keywords:
-            if keyword:
-                # 使用正则表达式进行不区分大小写的替换
-                pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-                highlighted_text = pattern.sub(
-                    f'<mark>{keyword}</mark>', 
-                    highlighted_text
-                )
-        
-        # 截取文本长度
-        if len(highlighted_text) > max_length:
-            # 尝试在关键词附近截取
-            mark_pos = highlighted_text.find('<mark>')
-            if mark_pos != -1:
-                start = max(0, mark_pos - max_length // 2)
-                end = start + max_length
-                highlighted_text = highlighted_text[start:end]
-                if start > 0:
-                    highlighted_text = "..." + highlighted_text
-                if end < len(text):
-                    highlighted_text = highlighted_text + "..."
-            else:
-                highlighted_text = highlighted_text[:max_length] + "..."
-        
-        return highlighted_text
+            dict: 搜索结果
+        """
+        if timeout is None:
+            timeout = settings.CACHE_TIMEOUT.get('search_results', 3600)
+        
+        return ProtectedCache.get_or_compute(cache_key, compute, timeout)
 
 
 def validate_search_params(query, search_type, ordering):
@@ -246,7 +293,7 @@ def validate_search_params(query, search_type, ordering):
         return False, f"无效的搜索类型，支持的类型：{', '.join(valid_search_types)}"
     
     # 验证排序方式
-    valid_orderings = ['-created_at', 'created_at', '-view_count', 'view_count', 'title', '-title']
+    valid_orderings = ['relevance', '-created_at', 'created_at', '-view_count', 'view_count', 'title', '-title']
     if ordering not in valid_orderings:
         return False, f"无效的排序方式，支持的排序：{', '.join(valid_orderings)}"
     
@@ -0,0 +1,461 @@
+"""
+搜索后端模块
+
+SearchQueryBuilder 和文章搜索接口通过可替换的搜索后端匹配标题和正文：
+- fts5: SQLite FTS5 虚拟表（trigram 分词），由触发器随文章表同步
+- mysql: MySQL FULLTEXT 索引（ngram 分词器），由 InnoDB 自动维护
+- index: 自建的倒排索引（utils.search_index），与数据库无关
+- icontains: 原来的 LIKE '%q%' 查询，作为最后的兜底
+
+SEARCH_BACKEND 为 auto（默认）时使用当前数据库已安装的原生全文索引，
+没有安装时使用自建倒排索引。原生索引只负责足够长的中文段（子串匹配，语义与倒排索引一致），
+英文单词（区分整词和前缀）以及原生索引无法匹配的短词仍然查询自建倒排索引，
+因此各后端的匹配结果相同，也不会退回 LIKE '%q%' 全表扫描。原生索引由迁移安装，
+也可以用 python manage.py build_search_index 重建和校验。
+相关度排序（utils.search_ranking）始终使用自建倒排索引中的词频。
+"""
+
+import logging
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, connection as default_connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from utils.search_index import INDEXED_FIELDS, author_condition, get_search_index, iter_runs
+
+logger = logging.getLogger(__name__)
+
+def get_article_table() -> str:
+    from apps.articles.models import Article
+
+    return Article._meta.db_table
+
+
+class SearchBackend:
+    """
+    搜索后端基类
+
+    子类实现 build_text_condition() 匹配标题、正文；
+    作者按用户名匹配，其他字段使用 icontains，由基类统一处理
+    """
+
+    name = ""
+    # 支持的数据库（connection.vendor），None 表示所有数据库
+    vendor: Optional[str] = None
+
+    def is_supported(self, connection=None) -> bool:
+        """当前数据库是否支持该后端"""
+        connection = connection or default_connection
+        return self.vendor is None or connection.vendor == self.vendor
+
+    def is_installed(self, connection=None) -> bool:
+        """后端需要的索引是否已经安装"""
+        return self.is_supported(connection)
+
+    def install(self, connection=None):
+        """安装后端需要的索引（幂等）"""
+
+    def uninstall(self, connection=None):
+        """删除后端安装的索引"""
+
+    def build_index(self) -> int:
+        """
+        安装并重建索引
+
+        Returns:
+            int: 已索引的文章数
+        """
+        self.install()
+        return 0
+
+    def verify_index(self) -> List[str]:
+        """
+        校验索引
+
+        Returns:
+            List[str]: 发现的问题，为空表示索引完好
+        """
+        return []
+
+    def build_text_condition(self, query: str, fields: List[str], prefix: Optional[bool] = None) -> Optional[Q]:
+        """
+        构建标题、正文的匹配条件
+
+        Args:
+            query: 搜索关键词
+            fields: title、content 中的一个或多个
+            prefix: 单词是否按前缀匹配，None 表示后端默认；
+                icontains 后端总是按子串匹配
+
+        Returns:
+            Q: 匹配条件，关键词中没有可搜索的内容时返回 None
+        """
+        raise NotImplementedError
+
+    def build_condition(self, query: str, fields: Iterable[str], prefix: Optional[bool] = None) -> Optional[Q]:
+        """
+        构建文章过滤条件，各字段之间为"或"关系
+
+        Args:
+            query: 搜索关键词
+            fields: 搜索字段：title、content、author 或其他模型字段路径
+            prefix: 单词是否按前缀匹配，见 build_text_condition()
+
+        Returns:
+            Q: 过滤条件，关键词中没有可搜索的内容时返回 None
+        """
+        fields = list(fields)
+        conditions = []
+        text_fields = [field for field in fields if field in INDEXED_FIELDS]
+        if text_fields:
+            conditions.append(self.build_text_condition(query, text_fields, prefix))
+        for field in fields:
+            if field == "author":
+                conditions.append(author_condition(query))
+            elif field not in INDEXED_FIELDS and query.strip():
+                conditions.append(Q(**{f"{field}__icontains": query.strip()}))
+
+        conditions = [condition for condition in conditions if condition is not None]
+        if not conditions:
+            return None
+        combined = Q()
+        for condition in conditions:
+            combined |= condition
+        return combined
+
+    def filter(self, queryset, query: str, fields: Iterable[str]):
+        """按关键词过滤文章，没有可搜索的内容时返回空结果"""
+        condition = self.build_condition(query, fields)
+        if condition is None:
+            return queryset.none()
+        return queryset.filter(condition)
+
+
+class IcontainsBackend(SearchBackend):
+    """LIKE '%q%' 查询：整个关键词作为子串匹配，会扫描全部正文"""
+
+    name = "icontains"
+
+    def build_text_condition(self, query, fields, prefix=None):
+        query = query.strip()
+        if not query:
+            return None
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f"{field}__icontains": query})
+        return condition
+
+
+class InvertedIndexBackend(SearchBackend):
+    """自建倒排索引（SearchPosting 表）"""
+
+    name = "index"
+
+    def build_text_condition(self, query, fields, prefix=None):
+        return get_search_index().build_text_condition(query, fields, prefix)
+
+    def build_index(self):
+        from apps.articles.models import Article
+
+        published = Article.objects.filter(status=Article.Status.PUBLISHED).values_list("pk", flat=True)
+        article_ids = list(published)
+        index = get_search_index()
+        for start in range(0, len(article_ids), 500):
+            index.index_articles(article_ids[start:start + 500])
+        return len(article_ids)
+
+    def verify_index(self):
+        from apps.articles.models import Article, SearchDocument
+
+        published = set(Article.objects.filter(status=Article.Status.PUBLISHED).values_list("pk", flat=True))
+        indexed = set(SearchDocument.objects.values_list("article_id", flat=True))
+        problems = []
+        if published - indexed:
+            problems.append(f"{len(published - indexed)} 篇已发布文章没有索引")
+        if indexed - published:
+            problems.append(f"{len(indexed - published)} 篇未发布或已删除的文章仍有索引")
+        return problems
+
+
+class NativeFulltextBackend(SearchBackend):
+    """
+    数据库原生全文索引的基类
+
+    原生索引按子串匹配，只用于长度不少于 min_term_length 的中文段；
+    英文单词需要区分整词和前缀匹配，短词无法使用原生索引，这些词项交给自建倒排索引
+    """
+
+    min_term_length = 2
+
+    def split_terms(self, query: str):
+        """
+        把关键词分为原生索引查询的中文段和其余部分
+
+        Returns:
+            tuple: (中文段列表, 交给倒排索引的关键词)
+        """
+        native_runs, other_runs = [], []
+        for run, is_cjk in iter_runs(query):
+            if is_cjk and len(run) >= self.min_term_length:
+                native_runs.append(run)
+            else:
+                other_runs.append(run)
+        return list(dict.fromkeys(native_runs)), " ".join(other_runs)
+
+    def build_native_condition(self, runs: List[str], fields: List[str]) -> Q:
+        """所有中文段都出现在任一字段中的条件"""
+        raise NotImplementedError
+
+    def build_text_condition(self, query, fields, prefix=None):
+        native_runs, other_query = self.split_terms(query)
+        conditions = []
+        if native_runs:
+            conditions.append(self.build_native_condition(native_runs, fields))
+        if other_query:
+            conditions.append(get_search_index().build_text_condition(other_query, fields, prefix))
+        conditions = [condition for condition in conditions if condition is not None]
+        if not conditions:
+            return None
+        combined = Q()
+        for condition in conditions:
+            combined &= condition
+        return combined
+
+
+class SQLiteFTS5Backend(NativeFulltextBackend):
+    """
+    SQLite FTS5 全文索引
+
+    FTS5 表以文章表作为外部内容表，只保存索引不重复保存正文；
+    文章表上的触发器在插入、更新、删除时同步索引。
+    草稿也会被索引（外部内容表要求索引与整张表一致），搜索时由查询集过滤状态。
+    trigram 分词器按任意连续三个字符建立索引，支持中文等不以空格分词的语言；
+    少于三个字符的词无法使用 trigram 索引，由自建倒排索引匹配
+    """
+
+    name = "fts5"
+    vendor = "sqlite"
+
+    table = "articles_article_fts"
+    triggers = ("articles_article_fts_ai", "articles_article_fts_ad", "articles_article_fts_au")
+    min_term_length = 3
+
+    def get_install_statements(self) -> List[str]:
+        article_table = get_article_table()
+        delete_old = (
+            f"INSERT INTO {self.table}({self.table}, rowid, title, content) "
+            f"VALUES ('delete', old.id, old.title, old.content);"
+        )
+        insert_new = f"INSERT INTO {self.table}(rowid, title, content) VALUES (new.id, new.title, new.content);"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            f"title, content, content='{article_table}', content_rowid='id', tokenize='trigram')",
+            f"CREATE TRIGGER IF NOT EXISTS {self.triggers[0]} AFTER INSERT ON {article_table} "
+            f"BEGIN {insert_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.triggers[1]} AFTER DELETE ON {article_table} "
+            f"BEGIN {delete_old} END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.triggers[2]} AFTER UPDATE OF title, content ON {article_table} "
+            f"BEGIN {delete_old} {insert_new} END",
+        ]
+
+    def is_supported(self, connection=None):
+        connection = connection or default_connection
+        if connection.vendor != self.vendor:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(a, tokenize='trigram')")
+                cursor.execute("DROP TABLE temp.fts5_probe")
+        except DatabaseError:
+            return False
+        return True
+
+    def get_missing_objects(self, connection=None) -> List[str]:
+        connection = connection or default_connection
+        expected = [self.table, *self.triggers]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(expected))})",
+                expected,
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+        return [name for name in expected if name not in existing]
+
+    def is_installed(self, connection=None):
+        connection = connection or default_connection
+        return connection.vendor == self.vendor and not self.get_missing_objects(connection)
+
+    def install(self, connection=None):
+        connection = connection or default_connection
+        with connection.cursor() as cursor:
+            for statement in self.get_install_statements():
+                cursor.execute(statement)
+
+    def uninstall(self, connection=None):
+        connection = connection or default_connection
+        with connection.cursor() as cursor:
+            for trigger in self.triggers:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def build_index(self):
+        from apps.articles.models import Article
+
+        self.install()
+        with default_connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')")
+        return Article.objects.count()
+
+    def verify_index(self):
+        missing = self.get_missing_objects()
+        if missing:
+            # 文章表被迁移重建时触发器会随旧表一起删除
+            return [f"缺少数据库对象: {', '.join(missing)}"]
+        try:
+            with default_connection.cursor() as cursor:
+                # rank 为 1 时同时校验索引与外部内容表是否一致
+                cursor.execute(f"INSERT INTO {self.table}({self.table}, rank) VALUES ('integrity-check', 1)")
+        except DatabaseError as e:
+            return [f"FTS5 索引与文章内容不一致: {e}"]
+        return []
+
+    def build_native_condition(self, runs, fields):
+        columns = "{" + " ".join(fields) + "}" if len(fields) > 1 else fields[0]
+        match = " AND ".join(f'{columns} : "{run}"' for run in runs)
+        return Q(pk__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match]))
+
+
+class MySQLFulltextBackend(NativeFulltextBackend):
+    """
+    MySQL FULLTEXT 索引（ngram 分词器）
+
+    MATCH() 的列必须与某个 FULLTEXT 索引完全一致，
+    因此分别为标题、正文以及标题+正文建立索引；
+    按 ngram_token_size（默认 2）切分，单字由自建倒排索引匹配
+    """
+
+    name = "mysql"
+    vendor = "mysql"
+
+    indexes = {
+        "articles_title_fulltext": ("title",),
+        "articles_content_fulltext": ("content",),
+        "articles_title_content_fulltext": ("title", "content"),
+    }
+
+    def get_existing_indexes(self, connection=None) -> set:
+        connection = connection or default_connection
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_TYPE = 'FULLTEXT'",
+                [get_article_table()],
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def is_installed(self, connection=None):
+        connection = connection or default_connection
+        return connection.vendor == self.vendor and set(self.indexes) <= self.get_existing_indexes(connection)
+
+    def install(self, connection=None):
+        connection = connection or default_connection
+        existing = self.get_existing_indexes(connection)
+        with connection.cursor() as cursor:
+            for name, columns in self.indexes.items():
+                if name not in existing:
+                    cursor.execute(
+                        f"ALTER TABLE {get_article_table()} ADD FULLTEXT INDEX {name} "
+                        f"({', '.join(columns)}) WITH PARSER ngram"
+                    )
+
+    def uninstall(self, connection=None):
+        connection = connection or default_connection
+        existing = self.get_existing_indexes(connection)
+        with connection.cursor() as cursor:
+            for name in self.indexes:
+                if name in existing:
+                    cursor.execute(f"ALTER TABLE {get_article_table()} DROP INDEX {name}")
+
+    def build_index(self):
+        from apps.articles.models import Article
+
+        self.install()
+        with default_connection.cursor() as cursor:
+            # FULLTEXT 索引由 InnoDB 随写入维护，OPTIMIZE 合并删除标记
+            cursor.execute(f"OPTIMIZE TABLE {get_article_table()}")
+            cursor.fetchall()
+        return Article.objects.filter(status=Article.Status.PUBLISHED).count()
+
+    def verify_index(self):
+        missing = set(self.indexes) - self.get_existing_indexes()
+        if missing:
+            return [f"缺少 FULLTEXT 索引: {', '.join(sorted(missing))}"]
+        return []
+
+    def build_native_condition(self, runs, fields):
+        # 布尔模式：每个中文段都必须出现，段内按 ngram 短语匹配
+        against = " ".join(f'+"{run}"' for run in runs)
+        sql = (
+            f"SELECT id FROM {get_article_table()} "
+            f"WHERE MATCH({', '.join(fields)}) AGAINST (%s IN BOOLEAN MODE)"
+        )
+        return Q(pk__in=RawSQL(sql, [against]))
+
+
+SEARCH_BACKENDS = {
+    backend.name: backend
+    for backend in (SQLiteFTS5Backend, MySQLFulltextBackend, InvertedIndexBackend, IcontainsBackend)
+}
+
+# 全局搜索后端实例
+_search_backend = None
+
+
+def get_native_backend(connection=None) -> Optional[SearchBackend]:
+    """获取当前数据库的原生全文索引后端（不检查是否已安装）"""
+    connection = connection or default_connection
+    for backend_class in (SQLiteFTS5Backend, MySQLFulltextBackend):
+        backend = backend_class()
+        if backend.vendor == connection.vendor:
+            return backend
+    return None
+
+
+def select_search_backend(name: str) -> SearchBackend:
+    """
+    按名称选择搜索后端
+
+    Args:
+        name: 后端名称，auto 表示优先使用已安装的原生全文索引
+
+    Returns:
+        SearchBackend: 后端实例
+    """
+    if name != "auto":
+        if name not in SEARCH_BACKENDS:
+            raise ValueError(f"未知的搜索后端: {name}，支持: auto, {', '.join(SEARCH_BACKENDS)}")
+        return SEARCH_BACKENDS[name]()
+
+    native = get_native_backend()
+    try:
+        if native is not None and native.is_installed():
+            return native
+    except DatabaseError as e:
+        logger.warning(f"检查原生全文索引失败，使用自建倒排索引: {e}")
+    return InvertedIndexBackend()
+
+
+def get_search_backend() -> SearchBackend:
+    """获取配置的搜索后端实例（SEARCH_BACKEND）"""
+    global _search_backend
+    if _search_backend is None:
+        _search_backend = select_search_backend(getattr(settings, "SEARCH_BACKEND", "auto"))
+    return _search_backend
+
+
+def reset_search_backend():
+    """清除已选择的后端（索引安装或删除后重新选择）"""
+    global _search_backend
+    _search_backend = None
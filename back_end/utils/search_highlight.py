@@ -0,0 +1,353 @@
+"""
+搜索结果高亮模块
+
+把查询中的全部关键词合并为一个按字符展开的前缀树正则（组合自动机），对文本只扫描一次：
+- 关键词与倒排索引使用相同的规范化（全角半角、大小写、重音符号），
+  匹配在规范化后的文本上进行，再通过偏移映射换算回原文位置
+- 每个位置最多向后尝试关键词的最大长度个字符，总耗时与文本长度成线性关系
+- 用双指针在匹配列表上选出关键词种类最多、命中次数最多的窗口作为摘要
+- 输出原文偏移，或转义后的 <mark> 标记，不会截断标签
+"""
+
+import html
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from utils.search_index import CJK_PATTERN, CJK_RANGES, iter_runs, normalize_text_for_index
+from utils.search_query import get_positive_terms, parse_search_query
+
+# 默认摘要长度（字符数，不含省略号）
+SUMMARY_LENGTH = 200
+ELLIPSIS = "..."
+# 调整窗口边界时，为了不截断英文单词最多移动的字符数
+SNAP_DISTANCE = 15
+
+# 非中文的单词字符：英文单词的前后边界
+WORD_CHAR = rf"[^\W_{CJK_RANGES}]"
+WORD_CHAR_PATTERN = re.compile(WORD_CHAR)
+SEPARATOR_PATTERN = re.compile(r"[\W_]+")
+
+
+class Snippet(NamedTuple):
+    """摘要片段：原文 [start, end) 及其中关键词的位置（相对片段开头）"""
+
+    text: str
+    start: int
+    end: int
+    highlights: List[Tuple[int, int]]
+
+
+def fold_text(text: str) -> Tuple[str, Optional[List[int]]]:
+    """
+    按倒排索引的规则规范化文本，并记录偏移映射
+
+    Returns:
+        tuple: (规范化文本, 规范化文本每个位置对应的原文位置；长度不变时为 None)
+    """
+    if text.isascii():
+        return text.lower(), None
+    # 按不同的字符规范化（中文正文通常只有几千个不同的字符），逐字一一对应时直接整体替换
+    table = {ord(char): normalize_text_for_index(char) for char in set(text)}
+    if all(len(normalized) == 1 for normalized in table.values()):
+        return text.translate(table), None
+    folded, offsets = [], []
+    for index, char in enumerate(text):
+        normalized = table[ord(char)]
+        folded.append(normalized)
+        offsets.extend([index] * len(normalized))
+    offsets.append(len(text))
+    return "".join(folded), offsets
+
+
+def build_trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    把关键词展开为前缀树形状的正则
+
+    共同前缀只出现一次，某个位置上的匹配最多向后尝试最长关键词的长度；
+    可选分支贪婪匹配，因此优先匹配较长的关键词。关键词中的空格匹配单词之间的任意分隔（可以为空）
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: dict) -> str:
+        branches = [
+            (r"[\W_]*" if char == " " else re.escape(char)) + render(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        if "" in node:
+            return f"(?:{'|'.join(branches)})?"
+        return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+    return render(trie)
+
+
+def get_keywords(terms) -> Dict[str, set]:
+    """
+    把查询词转换为高亮关键词
+
+    中文段整段匹配；英文单词默认按前缀匹配，查询词不是前缀匹配时按整词匹配；
+    短语按原文连续匹配（单词之间的空白、标点不限）
+
+    Returns:
+        dict: {"prefix": 前缀匹配的单词, "exact": 整词匹配的单词或短语, "cjk": 中文段}
+    """
+    keywords = {"prefix": set(), "exact": set(), "cjk": set()}
+    for term in terms:
+        runs = [run for run, _ in iter_runs(term.text)]
+        if term.phrase and len(runs) > 1:
+            keywords["exact"].add(" ".join(runs))
+            continue
+        for run in runs:
+            if CJK_PATTERN.match(run):
+                keywords["cjk"].add(run)
+            else:
+                keywords["prefix" if not term.phrase or term.prefix else "exact"].add(run)
+    return keywords
+
+
+def build_highlight_pattern(keywords: Dict[str, set]) -> Optional["re.Pattern"]:
+    """把 get_keywords 的关键词编译为一个正则，没有可高亮的关键词时返回 None"""
+    branches = []
+    if keywords["exact"]:
+        branches.append(f"(?<!{WORD_CHAR}){build_trie_pattern(keywords['exact'])}(?!{WORD_CHAR})")
+    if keywords["prefix"]:
+        # 前缀匹配时标记整个单词
+        branches.append(f"(?<!{WORD_CHAR})(?:{build_trie_pattern(keywords['prefix'])}){WORD_CHAR}*")
+    if keywords["cjk"]:
+        branches.append(build_trie_pattern(keywords["cjk"]))
+    if not branches:
+        return None
+    return re.compile("|".join(branches))
+
+
+class SearchHighlighter:
+    """
+    搜索结果高亮器
+
+    按查询编译一次，同一页的所有结果复用
+    """
+
+    def __init__(self, query: str = "", field: Optional[str] = None, terms=None):
+        """
+        Args:
+            query: 搜索关键词，支持 utils.search_query 的查询语法
+            field: 高亮的字段，只使用没有字段前缀或前缀为该字段的查询词；None 表示使用全部查询词
+            terms: 直接指定查询词（Term 列表），指定时忽略 query
+        """
+        if terms is None:
+            terms = get_positive_terms(parse_search_query(query or ""))
+        terms = [term for term in terms if field is None or term.field in (None, field)]
+        keywords = get_keywords(terms)
+        self.pattern = build_highlight_pattern(keywords)
+        # 用于把命中的文本还原为关键词（统计窗口中的关键词种类），长的优先
+        self.keywords = sorted(
+            {SEPARATOR_PATTERN.sub("", keyword) for group in keywords.values() for keyword in group},
+            key=len, reverse=True,
+        )
+        self._keyword_memo: Dict[str, str] = {}
+
+    def get_keyword(self, matched: str) -> str:
+        """命中的文本对应的关键词（前缀匹配命中整个单词，短语命中的分隔符不限）"""
+        keyword = self._keyword_memo.get(matched)
+        if keyword is None:
+            stripped = SEPARATOR_PATTERN.sub("", matched)
+            keyword = next((key for key in self.keywords if stripped.startswith(key)), stripped)
+            self._keyword_memo[matched] = keyword
+        return keyword
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        扫描一次文本，找出全部关键词的位置
+
+        Returns:
+            List[tuple]: 按位置排列、互不重叠的 (开始, 结束, 关键词)，位置为原文偏移
+        """
+        if not text or self.pattern is None:
+            return []
+        folded, offsets = fold_text(text)
+        matches = []
+        for match in self.pattern.finditer(folded):
+            start, end = match.span()
+            if offsets is not None:
+                start, end = offsets[start], offsets[end]
+            matches.append((start, end, self.get_keyword(match.group())))
+        return matches
+
+    def snippets(self, text: str, max_length: int = SUMMARY_LENGTH, max_snippets: int = 1) -> List[Snippet]:
+        """
+        选出关键词最密集的摘要片段
+
+        Args:
+            text: 原始文本
+            max_length: 所有片段的总长度上限
+            max_snippets: 片段数上限
+
+        Returns:
+            List[Snippet]: 按原文顺序排列的片段；文本不超过上限时返回整个文本
+        """
+        text = text or ""
+        matches = self.find(text)
+        if len(text) <= max_length:
+            return [Snippet(text, 0, len(text), [(start, end) for start, end, _ in matches])]
+
+        window = max(1, max_length // max(1, max_snippets))
+        chosen: List[Tuple[int, int]] = []
+        seen = set()
+        remaining = matches
+        while remaining and len(chosen) < max_snippets:
+            first, last = select_densest(remaining, window, seen)
+            span_start, span_end = remaining[first][0], min(remaining[last - 1][1], remaining[first][0] + window)
+            lower = max([end for _, end in chosen if end <= span_start], default=0)
+            upper = min([start for start, _ in chosen if start >= span_end], default=len(text))
+            chosen.append(place_window(text, span_start, span_end, window, lower, upper))
+            seen.update(keyword for _, _, keyword in remaining[first:last])
+            remaining = [
+                match for match in remaining
+                if all(match[1] <= start or match[0] >= end for start, end in chosen)
+            ]
+        if not chosen:
+            chosen.append(place_window(text, 0, 0, window, 0, len(text)))
+
+        snippets = []
+        for start, end in sorted(chosen):
+            highlights = [
+                (max(match_start, start) - start, min(match_end, end) - start)
+                for match_start, match_end, _ in matches
+                if match_start < end and match_end > start
+            ]
+            snippets.append(Snippet(text[start:end], start, end, highlights))
+        return snippets
+
+    def summarize(self, text: str, max_length: int = SUMMARY_LENGTH,
+                  max_snippets: int = 1) -> Tuple[str, List[List[int]]]:
+        """
+        生成带省略号的纯文本摘要
+
+        Returns:
+            tuple: (摘要, 关键词在摘要中的 [开始, 结束] 列表)
+        """
+        parts, highlights, length = [], [], 0
+        text = text or ""
+        elided = False
+        for snippet in self.snippets(text, max_length, max_snippets):
+            if snippet.start > 0 and not elided:
+                parts.append(ELLIPSIS)
+                length += len(ELLIPSIS)
+            parts.append(snippet.text)
+            highlights.extend([length + start, length + end] for start, end in snippet.highlights)
+            length += len(snippet.text)
+            elided = snippet.end < len(text)
+            if elided:
+                parts.append(ELLIPSIS)
+                length += len(ELLIPSIS)
+        return "".join(parts), highlights
+
+    def highlight(self, text: str) -> str:
+        """整个文本转义后用 <mark> 标记关键词"""
+        return mark(text or "", [(start, end) for start, end, _ in self.find(text or "")])
+
+    @staticmethod
+    def highlight_text(text, query, max_length=SUMMARY_LENGTH):
+        """
+        在文本中高亮搜索关键词
+
+        Args:
+            text (str): 原始文本
+            query (str): 搜索关键词
+            max_length (int): 摘要长度（不含省略号和标记）
+
+        Returns:
+            str: 转义后的摘要，关键词用 <mark> 标记
+        """
+        summary, highlights = SearchHighlighter(query).summarize(text, max_length)
+        return mark(summary, highlights)
+
+
+def select_densest(matches: List[Tuple[int, int, str]], window: int, seen=frozenset()) -> Tuple[int, int]:
+    """
+    双指针选出长度不超过 window 的窗口中最好的一段匹配
+
+    按 (未展示过的关键词种类数, 关键词种类数, 命中次数) 比较，相同时取靠前的
+
+    Returns:
+        tuple: 匹配列表的下标区间 [first, last)
+    """
+    best, best_range = None, (0, 1)
+    counts = Counter()
+    last = 0
+    for first, (start, _, keyword) in enumerate(matches):
+        if last <= first:
+            last = first
+            counts.clear()
+        while last < len(matches) and (last == first or matches[last][1] - start <= window):
+            counts[matches[last][2]] += 1
+            last += 1
+        score = (sum(1 for key in counts if key not in seen), len(counts), last - first)
+        if best is None or score > best:
+            best, best_range = score, (first, last)
+        counts[keyword] -= 1
+        if not counts[keyword]:
+            del counts[keyword]
+    return best_range
+
+
+def place_window(text: str, span_start: int, span_end: int, window: int,
+                 lower: int, upper: int) -> Tuple[int, int]:
+    """
+    把长度为 window 的窗口放在匹配区间周围
+
+    关键词之前保留三分之一的剩余长度作为上下文，窗口限制在 [lower, upper) 内，
+    并尽量不截断英文单词
+
+    Returns:
+        tuple: 原文区间 [start, end)
+    """
+    slack = max(0, window - (span_end - span_start))
+    start = max(lower, span_start - slack // 3)
+    end = min(upper, start + window)
+    start = max(lower, end - window)
+
+    # 边界落在英文单词中间时向内移动到单词边界，但不越过关键词
+    def inside_word(position):
+        return bool(
+            0 < position < len(text)
+            and WORD_CHAR_PATTERN.match(text[position - 1])
+            and WORD_CHAR_PATTERN.match(text[position])
+        )
+
+    if inside_word(start):
+        for position in range(start + 1, min(span_start, start + SNAP_DISTANCE) + 1):
+            if not inside_word(position):
+                start = position
+                break
+    if inside_word(end):
+        for position in range(end - 1, max(span_end, end - SNAP_DISTANCE) - 1, -1):
+            if not inside_word(position):
+                end = position
+                break
+    return start, end
+
+
+def mark(text: str, highlights: Iterable) -> str:
+    """
+    转义文本并用 <mark> 标记关键词
+
+    Args:
+        text: 原始文本
+        highlights: 关键词的 (开始, 结束) 位置，按位置排列、互不重叠
+    """
+    parts, position = [], 0
+    for start, end in highlights:
+        parts.append(html.escape(text[position:start]))
+        parts.append(f"<mark>{html.escape(text[start:end])}</mark>")
+        position = end
+    parts.append(html.escape(text[position:]))
+    return "".join(parts)
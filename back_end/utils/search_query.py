@@ -0,0 +1,412 @@
+"""
+搜索查询语法模块
+
+把搜索关键词解析为布尔查询树，再编译为按选择性排序的执行计划：
+- 多个词默认为"与"关系，支持 AND / OR / NOT（大写）、-词、括号
+- "引号内的短语" 按原文连续匹配
+- title: / content: / author: 前缀限定搜索字段，可作用于短语和括号
+- 词末尾的 * 表示前缀匹配（djan* 匹配 django）
+
+执行"与"查询时先用倒排索引的文档频率估计每个子查询的结果数（文档频率和计数按代际值缓存），
+从最少的子查询开始执行；结果数不超过 MATERIALIZE_LIMIT 时取出文章ID，
+其余子查询只在这些ID中匹配，任一步为空时直接结束
+"""
+
+import hashlib
+import re
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from utils.cache import ARTICLE_SCOPE_ALL, CacheGeneration
+from utils.search_backends import get_search_backend
+from utils.search_index import INDEXED_FIELDS, get_document_frequencies, tokenize_query
+
+# 可以用 字段: 前缀指定的搜索字段
+QUERY_FIELDS = ("title", "content", "author")
+OPERATORS = ("AND", "OR", "NOT")
+
+# 子查询估计结果数不超过该值时取出文章ID，用于约束后续子查询
+MATERIALIZE_LIMIT = 500
+
+LEXER_PATTERN = re.compile(r'\s+|(\()|(\))|"([^"]*)"?|([^\s()"]+)')
+FIELD_PATTERN = re.compile(rf"^({'|'.join(QUERY_FIELDS)}):(.*)$", re.IGNORECASE)
+# 与 SearchQueryBuilder._clean_query 相同：只保留字母、数字、中文
+SPECIAL_CHARS_PATTERN = re.compile(r"[^\w\s\u4e00-\u9fff]")
+
+
+class Term(NamedTuple):
+    """查询词：text 可以包含多个单词（均需出现）"""
+
+    text: str
+    field: Optional[str] = None
+    phrase: bool = False
+    prefix: bool = False
+
+
+class And(NamedTuple):
+    children: Tuple["Node", ...]
+
+
+class Or(NamedTuple):
+    children: Tuple["Node", ...]
+
+
+class Not(NamedTuple):
+    child: "Node"
+
+
+Node = Union[Term, And, Or, Not]
+
+
+def clean_text(text: str) -> str:
+    """去掉特殊字符并合并空白"""
+    return " ".join(SPECIAL_CHARS_PATTERN.sub(" ", text).split())
+
+
+def lex(query: str) -> List[tuple]:
+    """
+    把关键词切分为语法单元
+
+    Returns:
+        List[tuple]: ("(",)、(")",)、("op", 运算符)、("field", 字段)、
+            ("term", 文本, 是否短语, 是否前缀匹配)
+    """
+    tokens = []
+    for match in LEXER_PATTERN.finditer(query or ""):
+        lparen, rparen, phrase, word = match.groups()
+        if lparen:
+            tokens.append(("(",))
+        elif rparen:
+            tokens.append((")",))
+        elif phrase is not None:
+            text = clean_text(phrase)
+            if text:
+                tokens.append(("term", text, True, False))
+        elif word:
+            tokens.extend(lex_word(word))
+    return tokens
+
+
+def lex_word(word: str) -> List[tuple]:
+    """切分一个不含空白、括号和引号的片段"""
+    if word in OPERATORS:
+        return [("op", word)]
+    tokens = []
+    if word.startswith("-"):
+        tokens.append(("op", "NOT"))
+        word = word[1:]
+    match = FIELD_PATTERN.match(word)
+    if match:
+        tokens.append(("field", match.group(1).lower()))
+        word = match.group(2)
+    prefix = word.endswith("*")
+    text = clean_text(word)
+    if text:
+        tokens.append(("term", text, False, prefix))
+    return tokens
+
+
+class QueryParser:
+    """
+    递归下降解析器，优先级 NOT > AND（含省略的 AND）> OR
+
+    语法错误不报错：缺少的右括号视为在末尾，多余的右括号、
+    没有操作数的运算符和字段前缀被忽略
+    """
+
+    def __init__(self, tokens: List[tuple]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[tuple]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def advance(self) -> tuple:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self) -> Optional[Node]:
+        nodes = []
+        while self.peek() is not None:
+            node = self.parse_or(None)
+            if node is not None:
+                nodes.append(node)
+            if self.peek() == (")",):
+                self.advance()
+        return combine(And, nodes)
+
+    def parse_or(self, field: Optional[str]) -> Optional[Node]:
+        nodes = [self.parse_and(field)]
+        while self.peek() == ("op", "OR"):
+            self.advance()
+            nodes.append(self.parse_and(field))
+        return combine(Or, [node for node in nodes if node is not None])
+
+    def parse_and(self, field: Optional[str]) -> Optional[Node]:
+        nodes = []
+        while self.peek() not in (None, (")",), ("op", "OR")):
+            if self.peek() == ("op", "AND"):
+                self.advance()
+                continue
+            node = self.parse_unary(field)
+            if node is not None:
+                nodes.append(node)
+        return combine(And, nodes)
+
+    def parse_unary(self, field: Optional[str]) -> Optional[Node]:
+        if self.peek() == ("op", "NOT"):
+            self.advance()
+            child = self.parse_unary(field)
+            if child is None:
+                return None
+            return child.child if isinstance(child, Not) else Not(child)
+        return self.parse_primary(field)
+
+    def parse_primary(self, field: Optional[str]) -> Optional[Node]:
+        token = self.peek()
+        if token is None or token in ((")",), ("op", "OR")):
+            return None
+        self.advance()
+        if token[0] == "field":
+            return self.parse_primary(token[1])
+        if token == ("(",):
+            node = self.parse_or(field)
+            if self.peek() == (")",):
+                self.advance()
+            return node
+        if token[0] == "term":
+            _, text, phrase, prefix = token
+            return Term(text, field, phrase, prefix)
+        # 运算符位置不对（如 "AND AND"），忽略
+        return None
+
+
+def combine(node_class, nodes: List[Node]) -> Optional[Node]:
+    """合并子节点：没有子节点返回 None，只有一个时返回该节点"""
+    if not nodes:
+        return None
+    if len(nodes) == 1:
+        return nodes[0]
+    return node_class(tuple(nodes))
+
+
+def parse_search_query(query: str) -> Optional[Node]:
+    """
+    解析搜索关键词
+
+    Args:
+        query: 搜索关键词
+
+    Returns:
+        Node: 查询树，没有可搜索的内容时返回 None
+    """
+    return QueryParser(lex(query)).parse()
+
+
+def to_query_string(node: Optional[Node]) -> str:
+    """
+    把查询树还原为规范的查询字符串（词小写，运算符大写），用于搜索缓存键
+    """
+    if node is None:
+        return ""
+    if isinstance(node, Term):
+        field = f"{node.field}:" if node.field else ""
+        if node.phrase:
+            return f'{field}"{node.text.casefold()}"'
+        # 多个单词的查询词与各单词的"与"查询等价
+        return " ".join(f"{field}{word}{'*' if node.prefix else ''}" for word in node.text.casefold().split())
+    if isinstance(node, Not):
+        child = to_query_string(node.child)
+        return f"NOT ({child})" if isinstance(node.child, (And, Or)) else f"NOT {child}"
+    parts = []
+    for child in node.children:
+        part = to_query_string(child)
+        parts.append(f"({part})" if isinstance(child, (And, Or)) else part)
+    return (" OR " if isinstance(node, Or) else " ").join(parts)
+
+
+def get_positive_terms(node: Optional[Node]) -> List[Term]:
+    """查询树中不在 NOT 之下的查询词（用于相关度排序和高亮）"""
+    if node is None or isinstance(node, Not):
+        return []
+    if isinstance(node, Term):
+        return [node]
+    return [term for child in node.children for term in get_positive_terms(child)]
+
+
+class SearchPlan:
+    """
+    查询执行计划
+
+    查询词通过搜索后端匹配；"与"节点的子查询按估计结果数从少到多执行，
+    结果足够少时取出文章ID并约束后续子查询（相当于求倒排列表的交集），
+    NOT 子查询最后执行
+    """
+
+    def __init__(self, node: Optional[Node], fields: Iterable[str], backend=None):
+        """
+        Args:
+            node: 查询树
+            fields: 没有字段前缀的查询词的搜索字段
+            backend: 搜索后端，默认使用配置的后端
+        """
+        self.node = node
+        self.fields = list(fields)
+        self.backend = backend or get_search_backend()
+        self._estimates = {}
+        # 执行顺序记录：(查询字符串, 估计结果数, 取出的文章数或 None)
+        self.steps = []
+
+    def get_fields(self, term: Term) -> List[str]:
+        return [term.field] if term.field else self.fields
+
+    def estimate(self, node: Node, queryset) -> int:
+        """估计子查询的结果数（倒排索引的文档频率，作者按作者的文章数）"""
+        if node not in self._estimates:
+            self._estimates[node] = self._estimate(node, queryset)
+        return self._estimates[node]
+
+    def _estimate(self, node: Node, queryset) -> int:
+        if isinstance(node, Not):
+            return self.count(queryset) - self.estimate(node.child, queryset)
+        if isinstance(node, And):
+            return min(self.estimate(child, queryset) for child in node.children)
+        if isinstance(node, Or):
+            return sum(self.estimate(child, queryset) for child in node.children)
+
+        fields = self.get_fields(node)
+        estimate = 0
+        index_fields = [field for field in fields if field in INDEXED_FIELDS]
+        if index_fields:
+            terms = tokenize_query(node.text, node.prefix)
+            if terms:
+                estimate += min(get_document_frequencies(terms, index_fields).values())
+        other_fields = [field for field in fields if field not in INDEXED_FIELDS]
+        if other_fields:
+            condition = self.backend.build_condition(node.text, other_fields)
+            estimate += self.count(queryset.filter(condition)) if condition is not None else 0
+        return estimate
+
+    @staticmethod
+    def count(queryset) -> int:
+        """
+        查询集的结果数（如匹配作者的文章数），按全部文章的代际值缓存
+
+        估计值只用于决定执行顺序，用户改名等不更新代际值的变化可以容忍
+        """
+        generation = CacheGeneration.get(ARTICLE_SCOPE_ALL)
+        digest = hashlib.md5(str(queryset.query).encode()).hexdigest()
+        cache_key = f"{settings.CACHE_KEY_PREFIX}:search:count:gen:{generation}:{digest}"
+        count = cache.get(cache_key)
+        if count is None:
+            count = queryset.count()
+            cache.set(cache_key, count, settings.CACHE_TIMEOUT.get("search_results", 3600))
+        return count
+
+    def build_condition(self, queryset) -> Q:
+        """
+        构建过滤条件
+
+        Args:
+            queryset: 搜索范围（如已发布文章），取出文章ID时在其中查询
+
+        Returns:
+            Q: 过滤条件，查询树为空时不匹配任何文章
+        """
+        if self.node is None:
+            return Q(pk__in=[])
+        return self.compile(self.node, queryset)
+
+    def filter(self, queryset):
+        """按查询过滤文章"""
+        if self.node is None:
+            return queryset.none()
+        return queryset.filter(self.build_condition(queryset))
+
+    def compile(self, node: Node, queryset) -> Q:
+        if isinstance(node, Term):
+            return self.compile_term(node)
+        if isinstance(node, Not):
+            return ~self.compile(node.child, queryset)
+        if isinstance(node, Or):
+            condition = Q()
+            for child in node.children:
+                condition |= self.compile(child, queryset)
+            return condition
+        return self.compile_and(node, queryset)
+
+    def compile_term(self, term: Term) -> Q:
+        fields = self.get_fields(term)
+        condition = self.backend.build_condition(term.text, fields, prefix=term.prefix)
+        if condition is None:
+            return Q(pk__in=[])
+        if term.phrase and " " in term.text:
+            # 后端只保证每个词都出现，短语在这些结果中再按原文连续匹配
+            phrase = Q()
+            for field in fields:
+                phrase |= Q(**{f"{'author__username' if field == 'author' else field}__icontains": term.text})
+            condition &= phrase
+        return condition
+
+    def compile_and(self, node: And, queryset) -> Q:
+        positives = [child for child in node.children if not isinstance(child, Not)]
+        negatives = [child for child in node.children if isinstance(child, Not)]
+        positives.sort(key=lambda child: self.estimate(child, queryset))
+
+        condition = Q()
+        article_ids = None
+        for child in positives:
+            estimate = self.estimate(child, queryset)
+            child_condition = self.compile(child, queryset)
+            if article_ids is None and estimate > MATERIALIZE_LIMIT:
+                # 结果太多时交给数据库组合条件
+                condition &= child_condition
+                self.steps.append((to_query_string(child), estimate, None))
+                continue
+            matched = queryset.filter(child_condition)
+            if article_ids is not None:
+                matched = matched.filter(pk__in=article_ids)
+            matched_ids = list(matched.values_list("pk", flat=True)[:MATERIALIZE_LIMIT + 1])
+            if len(matched_ids) > MATERIALIZE_LIMIT:
+                # 估计偏低（如后端按子串匹配），结果太多时仍交给数据库
+                condition &= child_condition
+                self.steps.append((to_query_string(child), estimate, None))
+                continue
+            article_ids = matched_ids
+            self.steps.append((to_query_string(child), estimate, len(article_ids)))
+            if not article_ids:
+                return Q(pk__in=[])
+
+        for child in negatives:
+            child_condition = self.compile(child, queryset)
+            if article_ids is None:
+                condition &= child_condition
+                self.steps.append((to_query_string(child), None, None))
+                continue
+            article_ids = list(queryset.filter(child_condition, pk__in=article_ids).values_list("pk", flat=True))
+            self.steps.append((to_query_string(child), None, len(article_ids)))
+            if not article_ids:
+                return Q(pk__in=[])
+
+        if article_ids is not None:
+            condition &= Q(pk__in=article_ids)
+        return condition
+
+
+def compile_search_query(query: str, fields: Iterable[str], backend=None) -> SearchPlan:
+    """
+    解析搜索关键词并生成执行计划
+
+    Args:
+        query: 搜索关键词
+        fields: 没有字段前缀的查询词的搜索字段
+        backend: 搜索后端，默认使用配置的后端
+
+    Returns:
+        SearchPlan: 执行计划
+    """
+    return SearchPlan(parse_search_query(query), fields, backend)
@@ -0,0 +1,196 @@
+"""
+搜索相关度排序模块
+
+使用 BM25 为倒排索引的搜索结果打分：
+- 词频来自 SearchPosting，文档长度来自 SearchDocument，均在文章保存时预先计算
+- 标题、内容、作者分别计分并按字段权重（标题 > 内容 > 作者）加权求和
+- 语料统计（文档数、平均长度）按已发布文章的代际值缓存，文章变化后自动更新
+- 分页时用堆选出前 k 个结果（O(n log k)），不对全部结果排序
+"""
+
+import heapq
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Avg, Count, Q
+
+from utils.cache import ARTICLE_SCOPE_PUBLISHED, CacheGeneration, ProtectedCache
+from utils.search_index import INDEXED_FIELDS, get_document_frequencies, term_condition, tokenize_query
+
+# 相关度排序的 ordering 参数值
+RELEVANCE_ORDERING = "relevance"
+
+# BM25 参数：词频饱和度和文档长度归一化程度
+K1 = 1.2
+B = 0.75
+
+# 字段权重：标题 > 内容 > 作者
+FIELD_BOOSTS = {
+    "title": 3.0,
+    "content": 1.0,
+    "author": 0.5,
+}
+
+
+def get_corpus_stats() -> dict:
+    """
+    获取语料统计，按已发布文章的代际值缓存
+
+    Returns:
+        dict: {'count': 文档数, 'title': 平均标题长度, 'content': 平均内容长度}
+    """
+    from apps.articles.models import SearchDocument
+
+    def compute():
+        stats = SearchDocument.objects.aggregate(
+            count=Count("pk"), title=Avg("title_length"), content=Avg("content_length")
+        )
+        return {
+            "count": stats["count"],
+            "title": stats["title"] or 0.0,
+            "content": stats["content"] or 0.0,
+        }
+
+    generation = CacheGeneration.get(ARTICLE_SCOPE_PUBLISHED)
+    cache_key = f"{settings.CACHE_KEY_PREFIX}:search:corpus_stats:gen:{generation}"
+    return ProtectedCache.get_or_compute(
+        cache_key, compute, settings.CACHE_TIMEOUT.get("search_results", 3600)
+    )
+
+
+def idf(total: int, document_frequency: int) -> float:
+    """BM25 的逆文档频率（加一保证非负）"""
+    return math.log(1 + (total - document_frequency + 0.5) / (document_frequency + 0.5))
+
+
+def saturate(frequency: float, length: float, average_length: float) -> float:
+    """BM25 的词频饱和与长度归一化"""
+    norm = 1 - B + B * (length / average_length if average_length else 1.0)
+    return frequency * (K1 + 1) / (frequency + K1 * norm)
+
+
+class BM25Ranker:
+    """
+    BM25 打分器
+
+    查询词项与 utils.search_index 的切分规则一致；前缀词项的所有展开词项
+    视为同一个词项，文档频率按包含任一展开词项的文章计算
+    """
+
+    def __init__(self, query: str, fields: Iterable[str]):
+        self.query = query.strip()
+        self.fields = list(fields)
+        self.index_fields = [field for field in self.fields if field in INDEXED_FIELDS]
+        self.terms = tokenize_query(query) if self.index_fields else []
+
+    def score(self, candidates) -> Dict[int, float]:
+        """
+        为候选文章打分
+
+        Args:
+            candidates: 候选文章查询集（已按关键词过滤）
+
+        Returns:
+            Dict[int, float]: 文章ID -> 分数
+        """
+        from apps.articles.models import Article, SearchDocument, SearchPosting
+
+        candidate_ids = candidates.values("pk")
+        scores = {pk: 0.0 for pk in candidates.values_list("pk", flat=True)}
+        if not scores:
+            return scores
+
+        stats = get_corpus_stats()
+        total = max(stats["count"], len(scores))
+
+        if self.terms:
+            any_term = Q()
+            for term, prefix in self.terms:
+                any_term |= term_condition(term, prefix)
+            postings = SearchPosting.objects.filter(
+                any_term, field__in=self.index_fields, article_id__in=candidate_ids
+            ).values_list("article_id", "field", "term", "frequency")
+
+            # (查询词项序号, 文章ID, 字段) -> 词频
+            frequencies = defaultdict(int)
+            for article_id, field, term, frequency in postings.iterator():
+                for position, (query_term, prefix) in enumerate(self.terms):
+                    if term == query_term or (prefix and term.startswith(query_term)):
+                        frequencies[position, article_id, field] += frequency
+
+            lengths = {
+                row[0]: {"title": row[1], "content": row[2]}
+                for row in SearchDocument.objects.filter(article_id__in=candidate_ids).values_list(
+                    "article_id", "title_length", "content_length"
+                )
+            }
+            document_frequencies = get_document_frequencies(self.terms, self.index_fields)
+            weights = [idf(total, document_frequencies[term, prefix]) for term, prefix in self.terms]
+            for (position, article_id, field), frequency in frequencies.items():
+                length = lengths.get(article_id, {}).get(field, frequency)
+                scores[article_id] += weights[position] * FIELD_BOOSTS[field] * saturate(
+                    frequency, length, stats[field]
+                )
+
+        if "author" in self.fields and self.query:
+            # 查询中的每个词分别匹配用户名（如 "django OR flask" 两位作者都计分）
+            matches_author = Q()
+            for word in dict.fromkeys(self.query.split()):
+                matches_author |= Q(username__icontains=word)
+            authors = get_user_model().objects.filter(matches_author).values("pk")
+            authored = Article.objects.filter(status=Article.Status.PUBLISHED, author__in=authors)
+            # 作者字段的词频和长度都视为 1
+            weight = idf(total, authored.count()) * FIELD_BOOSTS["author"]
+            for pk in candidates.filter(author__in=authors).values_list("pk", flat=True):
+                scores[pk] += weight
+
+        return scores
+
+
+def top_k(scores: Dict[int, float], k: int) -> List[int]:
+    """
+    用堆选出分数最高的 k 篇文章
+
+    分数相同时较新的文章（ID 较大）在前
+
+    Returns:
+        List[int]: 按分数降序的文章ID
+    """
+    return [pk for pk, _ in heapq.nlargest(k, scores.items(), key=lambda item: (item[1], item[0]))]
+
+
+class RankedResults:
+    """
+    按相关度排序的搜索结果，可直接交给分页器
+
+    分页器先调用 count() 再取切片；打分只执行一次，
+    切片时只用堆选出前 stop 个结果并查询这一页的文章
+    """
+
+    def __init__(self, queryset, ranker: BM25Ranker):
+        self.queryset = queryset
+        self.ranker = ranker
+        self._scores: Optional[Dict[int, float]] = None
+
+    @property
+    def scores(self) -> Dict[int, float]:
+        if self._scores is None:
+            self._scores = self.ranker.score(self.queryset)
+        return self._scores
+
+    def count(self) -> int:
+        return len(self.scores)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _ = index.indices(len(self))
+        page_ids = top_k(self.scores, stop)[start:]
+        articles = self.queryset.in_bulk(page_ids)
+        return [articles[pk] for pk in page_ids if pk in articles]
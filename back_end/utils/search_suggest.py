@@ -0,0 +1,660 @@
+"""
+搜索建议（输入联想）模块
+
+每个进程在内存中保存一份按键排序的数组，前缀查询用 bisect 定位范围，
+不访问数据库：
+- 建议来源：已发布文章的标题、有已发布文章的作者用户名、搜索次数较多的关键词
+- 一到两个字符的前缀在加载时预先计算前 N 个结果，长前缀只扫描很小的范围
+- 索引序列化为压缩快照保存在 Redis 中，各进程每 VERSION_CHECK_INTERVAL 秒比较一次代际值，
+  版本变化后在后台线程加载快照，加载期间查询继续使用旧索引；只有一个进程从数据库重建
+- 文章发布、修改、撤回、删除的事务提交后登记该文章，登记的文章按 UPDATE_INTERVAL
+  合并为一次快照修改（增量更新），在提交回调或后台定时线程中写入，不占用查询；
+  快照超过 SNAPSHOT_MAX_AGE 后整体重建，刷新访问量权重和热门关键词
+"""
+
+import heapq
+import json
+import logging
+import math
+import threading
+import time
+import zlib
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from utils.cache import CacheGeneration
+from utils.search_index import normalize_text_for_index, prefix_upper_bound
+from utils.search_query import And, Term, parse_search_query
+
+logger = logging.getLogger(__name__)
+
+# 搜索建议快照的代际作用域
+SUGGEST_SCOPE = "search:suggest"
+
+# 默认和最大返回数量
+SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 20
+# 预先计算结果的前缀长度
+SHORT_PREFIX_LENGTH = 2
+# 长前缀最多扫描的键数
+MAX_SCAN = 5000
+# 每个进程记住的长前缀结果数（索引只读，结果在重新加载前不变）
+PREFIX_MEMO_SIZE = 10000
+# 标题除整个标题外，还可以从后面第几个单词开始匹配
+TITLE_WORD_KEYS = 4
+# 进入建议的关键词：最少搜索次数、最长长度、最多条数
+MIN_QUERY_COUNT = 3
+MAX_QUERY_LENGTH = 50
+MAX_QUERY_SUGGESTIONS = 2000
+# 快照整体重建的间隔（秒）
+SNAPSHOT_MAX_AGE = 3600
+# 比较快照版本的间隔（秒），间隔内的查询不访问 Redis
+VERSION_CHECK_INTERVAL = 1
+# 快照加载失败或正在重建时，继续使用当前索引的秒数
+RELOAD_RETRY_INTERVAL = 5
+# 增量更新的最短间隔（秒），间隔内登记的文章合并为一次快照修改
+UPDATE_INTERVAL = 30
+# 重建锁的超时时间（秒）
+REBUILD_LOCK_TIMEOUT = 60
+# Redis 不可用时进程内记录的关键词数上限
+LOCAL_QUERY_LIMIT = 10000
+
+
+class Suggestion(NamedTuple):
+    """一条建议：展示文本、类型（title/author/query）、权重、文章ID"""
+
+    text: str
+    kind: str
+    weight: float
+    article_id: Optional[int] = None
+
+
+def normalize_prefix(text: str) -> str:
+    """与索引键相同的规范化：统一全角半角、大小写、重音符号并合并空白"""
+    return " ".join(normalize_text_for_index(text).split())
+
+
+def is_plain_query(query: str) -> bool:
+    """关键词是否只由普通词组成（不含运算符、短语、字段前缀和通配符）"""
+    node = parse_search_query(query)
+    terms = node.children if isinstance(node, And) else (node,)
+    return node is not None and all(
+        isinstance(term, Term) and not (term.field or term.phrase or term.prefix) for term in terms
+    )
+
+
+class SuggestionIndex:
+    """
+    建议索引：keys 为排序后的规范化键，targets[i] 为 keys[i] 对应的条目下标
+
+    一个条目可以有多个键（如标题从第二个单词开始的部分）；
+    删除条目时只把条目置为 None，序列化时再压缩
+    """
+
+    def __init__(self, version: int = 0, built_at: Optional[float] = None):
+        self.version = version
+        self.built_at = time.time() if built_at is None else built_at
+        self.entries: List[Optional[Suggestion]] = []
+        self.keys: List[str] = []
+        self.targets: List[int] = []
+        self._by_article: Dict[int, List[int]] = {}
+        self._by_name: Dict[Tuple[str, str], int] = {}
+        self._short_prefixes: Dict[str, List[int]] = {}
+        self._memo: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def get_keys(suggestion: Suggestion) -> List[str]:
+        """条目的索引键"""
+        key = normalize_prefix(suggestion.text)
+        if not key:
+            return []
+        keys = [key]
+        if suggestion.kind == "title":
+            position = key.find(" ")
+            while position != -1 and len(keys) <= TITLE_WORD_KEYS:
+                keys.append(key[position + 1:])
+                position = key.find(" ", position + 1)
+        return keys
+
+    @classmethod
+    def build(cls, suggestions: Iterable[Suggestion], version: int = 0) -> "SuggestionIndex":
+        """由建议条目一次性构建索引"""
+        index = cls(version)
+        pairs = []
+        for suggestion in suggestions:
+            position = index._append_entry(suggestion)
+            pairs.extend((key, position) for key in cls.get_keys(suggestion))
+        pairs.sort()
+        index.keys = [key for key, _ in pairs]
+        index.targets = [position for _, position in pairs]
+        index.freeze()
+        return index
+
+    def _append_entry(self, suggestion: Suggestion) -> int:
+        position = len(self.entries)
+        self.entries.append(suggestion)
+        if suggestion.article_id is not None:
+            self._by_article.setdefault(suggestion.article_id, []).append(position)
+        else:
+            self._by_name[suggestion.kind, suggestion.text] = position
+        return position
+
+    def add_many(self, suggestions: Iterable[Suggestion]):
+        """批量添加条目：新键排序后与原有键归并一次，而不是逐个插入"""
+        pairs = []
+        for suggestion in suggestions:
+            position = self._append_entry(suggestion)
+            pairs.extend((key, position) for key in self.get_keys(suggestion))
+        if not pairs:
+            return
+        pairs.sort()
+        merged = list(heapq.merge(zip(self.keys, self.targets), pairs))
+        self.keys = [key for key, _ in merged]
+        self.targets = [position for _, position in merged]
+
+    def remove_article(self, article_id: int):
+        """删除文章的条目"""
+        for position in self._by_article.pop(article_id, []):
+            self.entries[position] = None
+
+    def remove_named(self, kind: str, text: str):
+        """删除作者、关键词条目"""
+        position = self._by_name.pop((kind, text), None)
+        if position is not None:
+            self.entries[position] = None
+
+    def freeze(self):
+        """预先计算短前缀的结果（只读索引在加载后调用）"""
+        heaps: Dict[str, list] = {}
+        for key, position in zip(self.keys, self.targets):
+            suggestion = self.entries[position]
+            if suggestion is None:
+                continue
+            for length in range(1, min(SHORT_PREFIX_LENGTH, len(key)) + 1):
+                heap = heaps.setdefault(key[:length], [])
+                item = (suggestion.weight, -position)
+                if item in heap:
+                    continue
+                if len(heap) < MAX_SUGGEST_LIMIT:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        self._short_prefixes = {
+            prefix: [-position for _, position in sorted(heap, reverse=True)] for prefix, heap in heaps.items()
+        }
+
+    def lookup(self, prefix: str, limit: int = SUGGEST_LIMIT) -> List[Suggestion]:
+        """
+        查询以 prefix 开头的建议
+
+        Args:
+            prefix: 用户输入
+            limit: 返回数量
+
+        Returns:
+            List[Suggestion]: 按权重降序的建议
+        """
+        prefix = normalize_prefix(prefix)
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            positions = self._short_prefixes.get(prefix, [])
+        else:
+            positions = self._memo.get(prefix)
+            if positions is None:
+                positions = self._top_positions(prefix)
+                if len(self._memo) >= PREFIX_MEMO_SIZE:
+                    self._memo.clear()
+                self._memo[prefix] = positions
+        return [self.entries[position] for position in positions[:limit]]
+
+    def _top_positions(self, prefix: str) -> List[int]:
+        """扫描以 prefix 开头的键，返回权重最高的 MAX_SUGGEST_LIMIT 个条目下标"""
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix_upper_bound(prefix), start, min(len(self.keys), start + MAX_SCAN))
+        matched = [position for position in set(self.targets[start:end]) if self.entries[position] is not None]
+        return heapq.nlargest(
+            MAX_SUGGEST_LIMIT, matched, key=lambda position: (self.entries[position].weight, -position)
+        )
+
+    def to_snapshot(self) -> bytes:
+        """序列化为压缩快照（去掉已删除的条目）"""
+        remap, entries = {}, []
+        for position, suggestion in enumerate(self.entries):
+            if suggestion is not None:
+                remap[position] = len(entries)
+                entries.append(list(suggestion))
+        keys, targets = [], []
+        for key, position in zip(self.keys, self.targets):
+            if position in remap:
+                keys.append(key)
+                targets.append(remap[position])
+        data = {
+            "version": self.version,
+            "built_at": self.built_at,
+            "entries": entries,
+            "keys": keys,
+            "targets": targets,
+        }
+        return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode())
+
+    @classmethod
+    def from_snapshot(cls, snapshot: bytes, freeze: bool = True) -> "SuggestionIndex":
+        """
+        从压缩快照加载索引
+
+        Args:
+            snapshot: to_snapshot() 的结果
+            freeze: 是否预先计算短前缀结果（只用于增量修改时不需要）
+        """
+        data = json.loads(zlib.decompress(snapshot))
+        index = cls(data["version"], data["built_at"])
+        for entry in data["entries"]:
+            index._append_entry(Suggestion(*entry))
+        index.keys = data["keys"]
+        index.targets = data["targets"]
+        if freeze:
+            index.freeze()
+        return index
+
+
+class SearchSuggester:
+    """
+    搜索建议服务
+
+    快照保存在 {prefix}:search:suggest:snapshot，版本为 SUGGEST_SCOPE 的代际值；
+    搜索关键词的次数保存在 Redis 有序集合 {prefix}:search:suggest:queries 中，
+    Redis 不可用时在进程内累加
+    """
+
+    # Redis 故障后暂停访问 Redis 的秒数
+    REDIS_RETRY_INTERVAL = 30
+
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+        self._index: Optional[SuggestionIndex] = None
+        self._check_at = 0.0
+        self._redis_retry_at = 0.0
+        self._lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self._flush_timer: Optional[threading.Timer] = None
+        self._local_queries = Counter()
+        # 已登记、尚未写入快照的文章：文章ID -> 作者ID
+        self._pending: Dict[int, Optional[int]] = {}
+        self._pending_lock = threading.Lock()
+        self._next_update_at = 0.0
+
+        prefix = settings.CACHE_KEY_PREFIX
+        self.snapshot_key = f"{prefix}:search:suggest:snapshot"
+        self.lock_key = f"{prefix}:search:suggest:lock"
+        self.queries_key = f"{prefix}:search:suggest:queries"
+
+    def _get_redis(self):
+        """
+        获取原生 Redis 连接
+
+        Returns:
+            Redis客户端，不可用时返回 None
+        """
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            from django_redis import get_redis_connection
+
+            return get_redis_connection(self.alias)
+        except Exception:
+            # 非 django_redis 缓存后端（如测试环境的本地内存缓存）
+            return None
+
+    def _mark_redis_down(self, error: Exception):
+        logger.warning(f"搜索建议 Redis 不可用，关键词改为进程内计数: {error}")
+        self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_INTERVAL
+
+    def suggest(self, prefix: str, limit: int = SUGGEST_LIMIT) -> List[Suggestion]:
+        """
+        获取搜索建议
+
+        Args:
+            prefix: 用户输入
+            limit: 返回数量（不超过 MAX_SUGGEST_LIMIT）
+
+        Returns:
+            List[Suggestion]: 建议列表
+        """
+        return self.get_index().lookup(prefix, max(1, min(limit, MAX_SUGGEST_LIMIT)))
+
+    def get_index(self) -> SuggestionIndex:
+        """
+        获取当前进程的索引
+
+        版本落后时在后台线程加载新版本，本次仍返回旧索引；
+        只有进程启动后的第一次调用会同步加载
+        """
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    # 冷启动且无法获得重建锁（如 Redis 不可用）：在进程内构建但不保存
+                    self._index = self.load() or SuggestionIndex.build(
+                        self.collect(), CacheGeneration.get(SUGGEST_SCOPE)
+                    )
+                return self._index
+        now = time.monotonic()
+        if now >= self._check_at:
+            self._check_at = now + VERSION_CHECK_INTERVAL
+            if not self._is_current(index):
+                self.reload_in_background()
+        return index
+
+    @staticmethod
+    def _is_current(index: SuggestionIndex) -> bool:
+        return index.version == CacheGeneration.get(SUGGEST_SCOPE) and time.time() - index.built_at < SNAPSHOT_MAX_AGE
+
+    def reload_in_background(self):
+        """启动后台线程加载新版本（已有线程在运行时不重复启动）"""
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return
+            self._check_at = time.monotonic() + RELOAD_RETRY_INTERVAL
+            self._reload_thread = threading.Thread(
+                target=self._run_and_close, args=(self.reload,), name="search-suggest-reload", daemon=True
+            )
+            self._reload_thread.start()
+
+    @staticmethod
+    def _run_and_close(target):
+        try:
+            target()
+        finally:
+            # 后台线程可能打开了数据库连接
+            connections.close_all()
+
+    def reload(self) -> bool:
+        """
+        在当前线程加载最新版本并替换
+
+        Returns:
+            bool: 是否已替换为最新版本
+        """
+        try:
+            loaded = self.load()
+        except Exception as e:
+            logger.warning(f"搜索建议索引加载失败，继续使用当前索引: {e}")
+            return False
+        if loaded is None:
+            return False
+        # 替换引用是原子的，正在使用旧索引的查询不受影响
+        self._index = loaded
+        return True
+
+    def load(self) -> Optional[SuggestionIndex]:
+        """
+        加载当前版本的索引：优先使用快照，快照不存在或已过期时获取重建锁后从数据库重建
+
+        Returns:
+            SuggestionIndex: 索引；其他进程正在重建或修改快照时返回 None
+        """
+        version = CacheGeneration.get(SUGGEST_SCOPE)
+        snapshot = cache.get(self.snapshot_key)
+        if snapshot is not None:
+            loaded = SuggestionIndex.from_snapshot(snapshot)
+            if loaded.version == version and time.time() - loaded.built_at < SNAPSHOT_MAX_AGE:
+                return loaded
+
+        if cache.add(self.lock_key, 1, REBUILD_LOCK_TIMEOUT):
+            try:
+                return self.rebuild()
+            finally:
+                cache.delete(self.lock_key)
+        return None
+
+    def collect(self) -> List[Suggestion]:
+        """从数据库和关键词计数收集全部建议条目"""
+        from django.contrib.auth import get_user_model
+        from django.db.models import Count, Q
+
+        from apps.articles.models import Article
+
+        suggestions = [
+            Suggestion(title, "title", math.log2(2 + view_count), pk)
+            for pk, title, view_count in Article.objects.filter(status=Article.Status.PUBLISHED)
+            .values_list("pk", "title", "view_count")
+            .iterator(chunk_size=1000)
+        ]
+        authors = (
+            get_user_model()
+            .objects.annotate(published=Count("articles", filter=Q(articles__status=Article.Status.PUBLISHED)))
+            .filter(published__gt=0)
+            .values_list("username", "published")
+        )
+        suggestions.extend(Suggestion(username, "author", self.get_author_weight(count)) for username, count in authors)
+        suggestions.extend(
+            Suggestion(query, "query", math.log2(1 + count)) for query, count in self.get_popular_queries()
+        )
+        return suggestions
+
+    @staticmethod
+    def get_author_weight(published_count: int) -> float:
+        return math.log2(1 + published_count)
+
+    def rebuild(self) -> SuggestionIndex:
+        """
+        从数据库整体重建索引并保存快照
+
+        Returns:
+            SuggestionIndex: 新索引
+        """
+        # 登记的文章都已提交，整体重建时会从数据库读取
+        with self._pending_lock:
+            self._pending.clear()
+        suggestions = self.collect()
+        CacheGeneration.bump(SUGGEST_SCOPE)
+        index = SuggestionIndex.build(suggestions, CacheGeneration.get(SUGGEST_SCOPE))
+        cache.set(self.snapshot_key, index.to_snapshot(), timeout=None)
+        self._index = index
+        return index
+
+    def schedule_update(self, article_id: int, author_id: Optional[int] = None):
+        """
+        登记一篇文章（及其作者）需要更新的条目（文章保存或删除的事务提交后调用）
+
+        距上次修改快照不足 UPDATE_INTERVAL 时只登记，由后台定时线程在间隔结束后合并写入；
+        快照整体重建时从数据库读取，登记的修改随之生效
+
+        Args:
+            article_id: 文章ID
+            author_id: 作者ID，用于更新作者的权重
+        """
+        with self._pending_lock:
+            if self._pending.get(article_id) is None:
+                self._pending[article_id] = author_id
+        self.apply_pending_updates(force=False)
+        if self._pending:
+            self._flush_later()
+
+    def _flush_later(self):
+        """在 UPDATE_INTERVAL 结束后由后台线程写入登记的文章（已有定时线程时不重复启动）"""
+        with self._lock:
+            if self._flush_timer is not None and self._flush_timer.is_alive():
+                return
+            delay = max(0.0, self._next_update_at - time.monotonic())
+            self._flush_timer = threading.Timer(delay, self._run_and_close, args=(self._flush_pending,))
+            self._flush_timer.name = "search-suggest-flush"
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush_pending(self):
+        self.apply_pending_updates()
+        if self._pending:
+            # 其他进程正在修改快照：下个间隔再试
+            self._flush_timer = None
+            self._flush_later()
+
+    def apply_pending_updates(self, force: bool = True) -> int:
+        """
+        把登记的文章合并为一次快照修改
+
+        Args:
+            force: 是否忽略 UPDATE_INTERVAL 立即写入
+
+        Returns:
+            int: 已更新的文章数
+        """
+        with self._pending_lock:
+            if not self._pending or (not force and time.monotonic() < self._next_update_at):
+                return 0
+            pending, self._pending = self._pending, {}
+            self._next_update_at = time.monotonic() + UPDATE_INTERVAL
+
+        try:
+            applied = self._update_snapshot(pending)
+        except Exception as e:
+            logger.warning(f"搜索建议增量更新失败，稍后重试: {e}")
+            applied = False
+        if not applied:
+            # 其他进程正在修改快照：保留登记，下个间隔再写入
+            with self._pending_lock:
+                for article_id, author_id in pending.items():
+                    if self._pending.get(article_id) is None:
+                        self._pending[article_id] = author_id
+            return 0
+        return len(pending)
+
+    def _update_snapshot(self, pending: Dict[int, Optional[int]]) -> bool:
+        """
+        在快照中更新文章及其作者的条目
+
+        Returns:
+            bool: 是否已处理（没有快照时无需处理），获取不到锁时返回 False
+        """
+        from django.contrib.auth import get_user_model
+        from django.db.models import Count, Q
+
+        from apps.articles.models import Article
+
+        if not cache.add(self.lock_key, 1, REBUILD_LOCK_TIMEOUT):
+            return False
+        try:
+            snapshot = cache.get(self.snapshot_key)
+            if snapshot is None:
+                # 还没有快照，下次查询时整体重建
+                return True
+            index = SuggestionIndex.from_snapshot(snapshot, freeze=False)
+            for article_id in pending:
+                index.remove_article(article_id)
+            articles = Article.objects.filter(pk__in=list(pending), status=Article.Status.PUBLISHED)
+            suggestions = [
+                Suggestion(title, "title", math.log2(2 + view_count), pk)
+                for pk, title, view_count in articles.values_list("pk", "title", "view_count")
+            ]
+
+            author_ids = {author_id for author_id in pending.values() if author_id is not None}
+            authors = (
+                get_user_model()
+                .objects.filter(pk__in=author_ids)
+                .annotate(published=Count("articles", filter=Q(articles__status=Article.Status.PUBLISHED)))
+                .values_list("username", "published")
+            )
+            for username, published in authors:
+                index.remove_named("author", username)
+                if published:
+                    suggestions.append(Suggestion(username, "author", self.get_author_weight(published)))
+            index.add_many(suggestions)
+
+            CacheGeneration.bump(SUGGEST_SCOPE)
+            index.version = CacheGeneration.get(SUGGEST_SCOPE)
+            cache.set(self.snapshot_key, index.to_snapshot(), timeout=None)
+            # 当前进程直接使用修改后的索引，其他进程在后台加载快照
+            index.freeze()
+            self._index = index
+            return True
+        finally:
+            cache.delete(self.lock_key)
+
+    def invalidate(self):
+        """删除快照，下次查询时整体重建（用于不触发信号的批量更新）"""
+        cache.delete(self.snapshot_key)
+        CacheGeneration.bump(SUGGEST_SCOPE)
+
+    def record_query(self, query: str):
+        """
+        记录一次搜索关键词（只记录普通关键词，下次整体重建时进入建议）
+
+        Args:
+            query: 用户输入的搜索关键词
+        """
+        query = " ".join(query.split())
+        if not query or len(query) > MAX_QUERY_LENGTH or not is_plain_query(query):
+            return
+        query = query.casefold()
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.zincrby(self.queries_key, 1, query)
+                return
+            except Exception as e:
+                self._mark_redis_down(e)
+
+        self._local_queries[query] += 1
+        if len(self._local_queries) > LOCAL_QUERY_LIMIT:
+            self._local_queries = Counter(dict(self._local_queries.most_common(LOCAL_QUERY_LIMIT // 2)))
+
+    def get_popular_queries(self) -> List[Tuple[str, int]]:
+        """获取搜索次数不少于 MIN_QUERY_COUNT 的关键词"""
+        client = self._get_redis()
+        if client is not None:
+            try:
+                # 只保留排名靠前的关键词，避免有序集合无限增长
+                client.zremrangebyrank(self.queries_key, 0, -(MAX_QUERY_SUGGESTIONS * 5) - 1)
+                members = client.zrevrangebyscore(
+                    self.queries_key, "+inf", MIN_QUERY_COUNT, start=0, num=MAX_QUERY_SUGGESTIONS, withscores=True
+                )
+                return [
+                    (member.decode() if isinstance(member, bytes) else member, int(score))
+                    for member, score in members
+                ]
+            except Exception as e:
+                self._mark_redis_down(e)
+
+        return [
+            (query, count)
+            for query, count in self._local_queries.most_common(MAX_QUERY_SUGGESTIONS)
+            if count >= MIN_QUERY_COUNT
+        ]
+
+    def clear(self):
+        """清空快照、关键词计数和进程内索引（用于测试和数据重置）"""
+        cache.delete(self.snapshot_key)
+        self._index = None
+        self._check_at = 0.0
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        with self._pending_lock:
+            self._pending.clear()
+        self._next_update_at = 0.0
+        self._local_queries.clear()
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.delete(self.queries_key)
+            except Exception as e:
+                self._mark_redis_down(e)
+
+
+# 全局搜索建议实例
+_search_suggester = None
+
+
+def get_search_suggester() -> SearchSuggester:
+    """获取搜索建议实例"""
+    global _search_suggester
+    if _search_suggester is None:
+        _search_suggester = SearchSuggester()
+    return _search_suggester
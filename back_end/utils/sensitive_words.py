@@ -0,0 +1,221 @@
+"""
+数据库敏感词词库
+
+词库保存在 SensitiveWord 表中，修改后不需要重新部署：
+- 每次修改把 SENSITIVE_WORDS_SCOPE 的代际值加一，代际值就是词库的版本
+- 只有一个进程从数据库读取词库并构建自动机，构建结果序列化为压缩快照保存在 Redis 中，
+  快照带有构建时的版本
+- 其他进程发现版本变化后在后台线程加载快照，加载完成后一次替换过滤器引用；
+  加载期间请求继续使用旧版本，不会等待构建
+"""
+
+import json
+import logging
+import threading
+import time
+import zlib
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from utils.cache import CacheGeneration
+from utils.text_filter import SensitiveWordFilter
+
+logger = logging.getLogger(__name__)
+
+# 敏感词词库的代际作用域
+SENSITIVE_WORDS_SCOPE = "comments:sensitive_words"
+
+# 快照格式，规范化规则（TextNormalizer）变化时加一，旧格式的快照不再加载
+SNAPSHOT_FORMAT = 1
+# 加载失败或其他进程正在构建时，重新检查的间隔（秒）
+RELOAD_RETRY_INTERVAL = 5
+# 构建锁的超时时间（秒）
+REBUILD_LOCK_TIMEOUT = 60
+
+
+class SensitiveWordDictionary:
+    """
+    敏感词词库服务
+
+    快照保存在 {prefix}:comments:sensitive_words:snapshot，
+    内容为版本号和 SensitiveWordFilter.to_state() 的结果（包含构建好的自动机）
+    """
+
+    def __init__(self):
+        # (版本, 过滤器)，作为一个整体替换
+        self._current: Optional[Tuple[int, SensitiveWordFilter]] = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+
+        prefix = settings.CACHE_KEY_PREFIX
+        self.snapshot_key = f"{prefix}:comments:sensitive_words:snapshot"
+        self.lock_key = f"{prefix}:comments:sensitive_words:lock"
+
+    @property
+    def version(self) -> Optional[int]:
+        """当前进程使用的词库版本"""
+        current = self._current
+        return current[0] if current is not None else None
+
+    def get_filter(self) -> SensitiveWordFilter:
+        """
+        获取当前进程的敏感词过滤器
+
+        Returns:
+            SensitiveWordFilter: 过滤器（只读，可以在多个线程间共享）
+        """
+        return self.get_versioned_filter()[1]
+
+    def get_versioned_filter(self) -> Tuple[int, SensitiveWordFilter]:
+        """
+        获取当前进程的敏感词过滤器及其版本
+
+        版本落后时在后台线程加载新版本，本次仍返回旧版本；
+        只有进程启动后的第一次调用会同步加载
+
+        Returns:
+            tuple: (版本, 过滤器)
+        """
+        current = self._current
+        if current is None:
+            with self._lock:
+                if self._current is None:
+                    self._swap(*(self.load() or self.build()))
+                return self._current
+        if time.monotonic() >= self._retry_at and current[0] != CacheGeneration.get(SENSITIVE_WORDS_SCOPE):
+            self.reload_in_background()
+        return current
+
+    def _swap(self, version: int, word_filter: SensitiveWordFilter):
+        # 替换引用是原子的，正在使用旧过滤器的请求不受影响
+        self._current = (version, word_filter)
+
+    def reload_in_background(self):
+        """启动后台线程加载新版本（已有线程在运行时不重复启动）"""
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return
+            self._retry_at = time.monotonic() + RELOAD_RETRY_INTERVAL
+            self._reload_thread = threading.Thread(
+                target=self._reload_and_close, name="sensitive-words-reload", daemon=True
+            )
+            self._reload_thread.start()
+
+    def _reload_and_close(self):
+        try:
+            self.reload()
+        finally:
+            # 后台线程可能打开了数据库连接
+            connections.close_all()
+
+    def reload(self) -> bool:
+        """
+        在当前线程加载最新版本并替换
+
+        Returns:
+            bool: 是否已替换为最新版本
+        """
+        try:
+            loaded = self.load()
+        except Exception as e:
+            logger.warning(f"敏感词词库加载失败，继续使用版本 {self.version}: {e}")
+            return False
+        if loaded is None:
+            return False
+        self._swap(*loaded)
+        return True
+
+    def load(self) -> Optional[Tuple[int, SensitiveWordFilter]]:
+        """
+        加载当前版本的词库：优先使用快照，快照不存在或已过期时获取构建锁后从数据库构建并发布快照
+
+        Returns:
+            tuple: (版本, 过滤器)；其他进程正在构建时返回 None
+        """
+        version = CacheGeneration.get(SENSITIVE_WORDS_SCOPE)
+        snapshot = cache.get(self.snapshot_key)
+        if snapshot is not None:
+            loaded = self.from_snapshot(snapshot)
+            if loaded is not None and loaded[0] == version:
+                return loaded
+
+        if cache.add(self.lock_key, 1, REBUILD_LOCK_TIMEOUT):
+            try:
+                return self.publish()
+            finally:
+                cache.delete(self.lock_key)
+        return None
+
+    def build(self) -> Tuple[int, SensitiveWordFilter]:
+        """
+        从数据库构建当前版本的过滤器（不发布快照）
+
+        版本在读取数据库之前获取：构建期间词库又被修改时，新的版本号会使这次的结果过期
+
+        Returns:
+            tuple: (版本, 过滤器)
+        """
+        from apps.comments.models import SensitiveWord
+
+        version = CacheGeneration.get(SENSITIVE_WORDS_SCOPE)
+        words = dict(SensitiveWord.objects.filter(is_active=True).values_list("word", "severity"))
+        word_filter = SensitiveWordFilter(list(words), severities=words, include_defaults=False)
+        # 构建自动机
+        word_filter.compiled
+        return version, word_filter
+
+    def publish(self) -> Tuple[int, SensitiveWordFilter]:
+        """
+        从数据库构建过滤器并发布快照
+
+        Returns:
+            tuple: (版本, 过滤器)
+        """
+        version, word_filter = self.build()
+        cache.set(self.snapshot_key, self.to_snapshot(version, word_filter), timeout=None)
+        return version, word_filter
+
+    @staticmethod
+    def to_snapshot(version: int, word_filter: SensitiveWordFilter) -> bytes:
+        """序列化为压缩快照"""
+        data = {"format": SNAPSHOT_FORMAT, "version": version, "filter": word_filter.to_state()}
+        return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode())
+
+    @staticmethod
+    def from_snapshot(snapshot: bytes) -> Optional[Tuple[int, SensitiveWordFilter]]:
+        """
+        从压缩快照恢复过滤器
+
+        Returns:
+            tuple: (版本, 过滤器)；快照格式不同时返回 None
+        """
+        data = json.loads(zlib.decompress(snapshot))
+        if data.get("format") != SNAPSHOT_FORMAT:
+            return None
+        return data["version"], SensitiveWordFilter.from_state(data["filter"])
+
+    def invalidate(self):
+        """词库修改后调用：增加版本，各进程在下次过滤时发现并加载新版本"""
+        CacheGeneration.bump(SENSITIVE_WORDS_SCOPE)
+
+    def clear(self):
+        """清空快照和进程内过滤器（用于测试和数据重置）"""
+        cache.delete(self.snapshot_key)
+        self._current = None
+        self._retry_at = 0.0
+
+
+# 全局敏感词词库实例
+_sensitive_word_dictionary = None
+
+
+def get_sensitive_word_dictionary() -> SensitiveWordDictionary:
+    """获取敏感词词库实例"""
+    global _sensitive_word_dictionary
+    if _sensitive_word_dictionary is None:
+        _sensitive_word_dictionary = SensitiveWordDictionary()
+    return _sensitive_word_dictionary
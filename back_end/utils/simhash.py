@@ -0,0 +1,165 @@
+"""
+SimHash 近似重复内容检测
+
+评论内容规范化（TextNormalizer）后取相邻两个字符为特征，计算 64 位 SimHash 指纹：
+内容相近的评论指纹只有少数几位不同（海明距离小），内容无关的评论平均相差 32 位。
+
+查找时把指纹分成 SIMHASH_DISTANCE + 1 段：海明距离不超过 SIMHASH_DISTANCE 的两个指纹
+至少有一段完全相同（抽屉原理）。每段保存为一个带索引的列，
+查询只读取某一段相同的评论，再逐个计算海明距离，不需要扫描全表
+"""
+
+import hashlib
+from datetime import timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from utils.text_filter import get_text_normalizer
+
+SIMHASH_BITS = 64
+# 视为近似重复的最大海明距离
+SIMHASH_DISTANCE = 4
+# 分段数及每段的位数（13, 13, 13, 13, 12）
+SIMHASH_BANDS = SIMHASH_DISTANCE + 1
+BAND_WIDTHS = [
+    SIMHASH_BITS // SIMHASH_BANDS + (1 if index < SIMHASH_BITS % SIMHASH_BANDS else 0)
+    for index in range(SIMHASH_BANDS)
+]
+# 特征的字符数
+SHINGLE_SIZE = 2
+# 规范化后少于该字符数的内容不计算指纹（短评论如“谢谢分享”本来就经常相同）
+MIN_SIMHASH_LENGTH = 20
+# 每次查找最多比较的评论数（最近的优先）
+MAX_CANDIDATES = 1000
+
+MASK = (1 << SIMHASH_BITS) - 1
+
+
+@lru_cache(maxsize=1 << 16)
+def get_feature_hash(feature: str) -> int:
+    """特征的 64 位哈希（常见的字符组合会重复出现，缓存计算结果）"""
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    计算文本的 SimHash 指纹
+
+    每一位的取值为：该位为 1 的特征是否超过半数。
+    各位的计数用按位并行的二进制计数器累加（planes[i] 的第 j 位是第 j 位计数的第 i 个二进制位），
+    每个特征只需要几次整数运算，而不是逐位循环 64 次
+
+    Args:
+        text: 原文
+
+    Returns:
+        int: 64 位无符号指纹，内容太短时返回 None
+    """
+    normalized = get_text_normalizer().normalize(text)[0]
+    if len(normalized) < MIN_SIMHASH_LENGTH:
+        return None
+
+    planes: List[int] = []
+    count = 0
+    for position in range(len(normalized) - SHINGLE_SIZE + 1):
+        carry = get_feature_hash(normalized[position:position + SHINGLE_SIZE])
+        count += 1
+        for index, plane in enumerate(planes):
+            planes[index] = plane ^ carry
+            carry &= plane
+            if not carry:
+                break
+        else:
+            planes.append(carry)
+
+    # 按位并行比较：计数 >= threshold 的位为 1
+    threshold = count // 2 + 1
+    greater, equal = 0, MASK
+    for index in range(max(len(planes), threshold.bit_length()) - 1, -1, -1):
+        plane = planes[index] if index < len(planes) else 0
+        if threshold >> index & 1:
+            equal &= plane
+        else:
+            greater |= equal & plane
+            equal &= ~plane & MASK
+    return greater | equal
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """两个指纹不同的位数"""
+    return ((first ^ second) & MASK).bit_count()
+
+
+def split_bands(fingerprint: int) -> List[int]:
+    """把指纹分成 SIMHASH_BANDS 段"""
+    bands = []
+    for width in BAND_WIDTHS:
+        bands.append(fingerprint & ((1 << width) - 1))
+        fingerprint >>= width
+    return bands
+
+
+def to_signed(fingerprint: int) -> int:
+    """无符号指纹转换为有符号 64 位整数（BigIntegerField）"""
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >> (SIMHASH_BITS - 1) else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    """数据库中的有符号 64 位整数转换回指纹"""
+    return value & MASK
+
+
+def get_simhash_fields(fingerprint: Optional[int]) -> Dict[str, Optional[int]]:
+    """
+    获取评论模型中保存指纹的字段值
+
+    Args:
+        fingerprint: simhash() 的结果
+
+    Returns:
+        Dict: simhash 及 simhash_band0 ~ simhash_band{N-1}，没有指纹时都为 None
+    """
+    bands = split_bands(fingerprint) if fingerprint is not None else [None] * SIMHASH_BANDS
+    fields = {"simhash": to_signed(fingerprint) if fingerprint is not None else None}
+    fields.update({f"simhash_band{index}": band for index, band in enumerate(bands)})
+    return fields
+
+
+def find_near_duplicates(
+    fingerprint: int, exclude_pk: int = None, exclude_user_id: int = None, article_id: int = None
+) -> List[int]:
+    """
+    查找最近 COMMENT_NEAR_DUPLICATE_DAYS 天内指纹相近的评论
+
+    每一段用 (段, 创建时间) 组合索引查询，候选评论数与评论总数基本无关
+
+    Args:
+        fingerprint: simhash() 的结果
+        exclude_pk: 排除的评论ID
+        exclude_user_id: 排除该用户在 article_id 文章下自己的评论（同一篇文章下的追评不视为刷屏，
+            同一用户在其他文章下发布的相近内容仍然会被找出）
+        article_id: 与 exclude_user_id 一起使用的文章ID
+
+    Returns:
+        List[int]: 海明距离不超过 SIMHASH_DISTANCE 的评论ID
+    """
+    from apps.comments.models import Comment
+
+    days = getattr(settings, "COMMENT_NEAR_DUPLICATE_DAYS", 7)
+    condition = Q()
+    for index, band in enumerate(split_bands(fingerprint)):
+        condition |= Q(**{f"simhash_band{index}": band})
+    candidates = Comment.objects.filter(condition, created_at__gte=timezone.now() - timedelta(days=days))
+    if exclude_pk is not None:
+        candidates = candidates.exclude(pk=exclude_pk)
+    if exclude_user_id is not None:
+        candidates = candidates.exclude(user_id=exclude_user_id, article_id=article_id)
+    return [
+        pk
+        for pk, value in candidates.order_by("-created_at").values_list("pk", "simhash")[:MAX_CANDIDATES]
+        if hamming_distance(fingerprint, to_unsigned(value)) <= SIMHASH_DISTANCE
+    ]
@@ -3,15 +3,143 @@
 用于过滤敏感词和不当内容
 """
 
+import hashlib
 import re
-from typing import List, Tuple, Dict
+import unicodedata
+from typing import List, Optional, Tuple, Dict
 from django.conf import settings
+from django.core.cache import cache
+from utils.aho_corasick import AhoCorasick
+from utils.local_cache import LocalLRUCache
+
+
+# 敏感词的严重程度
+SEVERITY_MASK = 1  # 只替换，评论照常自动通过
+SEVERITY_REVIEW = 2  # 替换并进入人工审核（默认）
+SEVERITY_BLOCK = 3  # 拒绝发布
+
+# 常用繁体字 -> 简体字（每两个字符为一对）
+TRADITIONAL_TO_SIMPLIFIED = (
+    '愛爱礙碍襖袄罷罢擺摆敗败頒颁辦办幫帮綁绑寶宝飽饱報报貝贝備备筆笔畢毕邊边變变標标別别'
+    '賓宾餅饼並并撥拨補补財财參参蠶蚕慘惨倉仓層层產产長长場场廠厂車车徹彻塵尘陳陈稱称懲惩'
+    '遲迟齒齿衝冲蟲虫醜丑處处傳传創创詞词從从聰聪錯错達达帶带貸贷單单擔担膽胆當当黨党導导'
+    '燈灯鄧邓敵敌遞递點点電电調调釘钉頂顶訂订東东動动凍冻鬥斗獨独讀读賭赌斷断隊队對对噸吨'
+    '奪夺惡恶兒儿爾尔發发髮发罰罚範范飯饭訪访飛飞費费紛纷墳坟奮奋憤愤風风鳳凤婦妇復复負负'
+    '該该蓋盖趕赶幹干乾干剛刚綱纲鋼钢個个給给鞏巩貢贡溝沟構构購购夠够穀谷顧顾關关觀观館馆'
+    '慣惯廣广歸归櫃柜貴贵國国過过還还漢汉號号紅红後后護护畫画劃划話话懷怀壞坏歡欢環环換换'
+    '黃黄揮挥輝辉匯汇會会繪绘獲获貨货禍祸機机積积擊击極极級级幾几計计記记際际濟济繼继價价'
+    '駕驾堅坚間间監监檢检減减見见鑒鉴將将獎奖講讲膠胶驕骄腳脚較较階阶節节潔洁結结屆届緊紧'
+    '僅仅進进盡尽經经驚惊競竞鏡镜糾纠舊旧舉举據据劇剧覺觉絕绝軍军開开凱凯課课墾垦懇恳庫库'
+    '誇夸塊块寬宽礦矿虧亏擴扩蘭兰藍蓝欄栏爛烂勞劳樂乐類类淚泪離离禮礼裡里裏里歷历麗丽厲厉'
+    '勵励聯联連连憐怜臉脸練练糧粮兩两輛辆諒谅療疗獵猎臨临靈灵齡龄領领劉刘龍龙樓楼錄录陸陆'
+    '亂乱輪轮論论羅罗邏逻馬马嗎吗買买賣卖麥麦滿满貓猫貿贸門门們们夢梦彌弥覓觅綿绵滅灭廟庙'
+    '鳴鸣謀谋畝亩納纳難难腦脑鬧闹內内擬拟鳥鸟寧宁農农濃浓歐欧盤盘賠赔噴喷鵬鹏騙骗飄飘頻频'
+    '憑凭評评撲扑僕仆樸朴齊齐騎骑豈岂啟启氣气棄弃牽牵鉛铅遷迁錢钱槍枪牆墙搶抢橋桥僑侨親亲'
+    '輕轻傾倾請请慶庆窮穷區区驅驱權权勸劝確确讓让擾扰熱热認认榮荣軟软銳锐潤润灑洒賽赛傘伞'
+    '喪丧掃扫殺杀曬晒傷伤賞赏燒烧紹绍設设攝摄審审嬸婶腎肾滲渗聲声勝胜繩绳聖圣師师詩诗時时'
+    '實实識识勢势視视試试飾饰適适釋释壽寿獸兽書书數数樹树帥帅雙双誰谁稅税順顺說说碩硕絲丝'
+    '飼饲鬆松頌颂訴诉肅肃雖虽隨随歲岁孫孙損损鎖锁臺台態态攤摊談谈嘆叹湯汤燙烫濤涛討讨騰腾'
+    '題题體体鐵铁聽听廳厅頭头圖图塗涂團团頹颓託托脫脱襪袜灣湾萬万網网為为違违圍围偉伟衛卫'
+    '謂谓溫温聞闻穩稳問问窩窝烏乌無无誤误霧雾務务習习係系細细蝦虾嚇吓鮮鲜閒闲顯显險险現现'
+    '線线縣县憲宪獻献鄉乡詳详響响項项蕭萧銷销曉晓協协脅胁寫写謝谢興兴兇凶選选學学尋寻訓训'
+    '詢询壓压鴉鸦亞亚嚴严顏颜鹽盐驗验陽阳楊杨養养樣样藥药爺爷業业葉叶頁页醫医儀仪遺遗億亿'
+    '憶忆藝艺議议譯译義义陰阴銀银飲饮隱隐應应營营贏赢擁拥傭佣湧涌優优郵邮猶犹遊游於于餘余'
+    '魚鱼與与語语獄狱預预園园員员圓圆緣缘遠远願愿約约躍跃閱阅雲云運运雜杂災灾載载贊赞髒脏'
+    '棗枣竈灶責责擇择澤泽賊贼贈赠閘闸詐诈齋斋債债佔占戰战張张漲涨帳帐脹胀趙赵這这鎮镇陣阵'
+    '爭争睜睁證证鄭郑織织職职執执紙纸誌志製制質质鐘钟種种眾众週周軸轴豬猪諸诸燭烛囑嘱築筑'
+    '註注專专轉转賺赚莊庄裝装狀状壯壮準准濁浊資资總总縱纵組组鑽钻蹤踪鬱郁麼么淨净況况黴霉'
+    '煙烟傑杰隻只颱台蘇苏龜龟槓杠嬰婴鏈链懶懒壟垄罵骂諷讽誘诱'
+)
+
+
+class TextNormalizer:
+    """
+    匹配前的文本规范化
+
+    用一张字符转换表（str.translate）一次完成：
+    - 全角转半角（NFKC，如 'Ａ' -> 'A'）和大小写折叠
+    - 繁体转简体（TRADITIONAL_TO_SIMPLIFIED）
+    - 删除可跳过的分隔字符：空白、标点、符号、控制和零宽字符（如 '赌 博'、'赌.博'）
+
+    每个字符最多转换为一个字符，删除分隔字符时记录规范化文本每个字符在原文中的位置，
+    在规范化文本上的匹配可以映射回原文替换。
+    转换表预先填入 ASCII、全角字符和繁体字，其他字符在第一次出现时计算并记住
+    """
+
+    # 可跳过字符的 Unicode 类别：标点、符号、分隔符、控制字符和格式字符（零宽字符）
+    SEPARATOR_CATEGORIES = ('P', 'S', 'Z', 'Cc', 'Cf')
+
+    class Table(dict):
+        """字符转换表：码位 -> 码位，或 None（删除）"""
+
+        def __init__(self, normalizer):
+            super().__init__()
+            self.normalizer = normalizer
+
+        def __missing__(self, code):
+            value = self[code] = self.normalizer.translate_char(chr(code))
+            return value
+
+    def __init__(self, variants: str = TRADITIONAL_TO_SIMPLIFIED):
+        """
+        Args:
+            variants: 变体字 -> 标准字的映射，每两个字符为一对
+        """
+        self.variants = dict(zip(variants[0::2], variants[1::2]))
+        self.table = self.Table(self)
+        # 预先计算常用字符
+        for code in list(range(0x80)) + list(range(0x3000, 0x3040)) + list(range(0xFF00, 0xFFF0)):
+            self.table[code]
+        for char in self.variants:
+            self.table[ord(char)]
+
+    def translate_char(self, char: str) -> Optional[int]:
+        """计算单个字符的转换结果（码位），可跳过的分隔字符返回 None"""
+        category = unicodedata.category(char)
+        if category[0] in self.SEPARATOR_CATEGORIES or category in self.SEPARATOR_CATEGORIES:
+            return None
+        folded = unicodedata.normalize('NFKC', char).lower()
+        if len(folded) != 1:
+            # 展开为多个字符的（如 'ﬁ'）只折叠大小写
+            folded = char.lower() if len(char.lower()) == 1 else char
+        return ord(self.variants.get(folded, folded))
+
+    def normalize(self, text: str) -> Tuple[str, Optional[List[int]]]:
+        """
+        规范化文本
+
+        Args:
+            text: 原文
+
+        Returns:
+            tuple: (规范化文本, 每个字符在原文中的位置)；没有删除字符时位置为 None，与原文一一对应
+        """
+        table = self.table
+        normalized = text.translate(table)
+        if len(normalized) == len(text):
+            return normalized, None
+        return normalized, [index for index, char in enumerate(text) if table[ord(char)] is not None]
+
+
+# 全局规范化器实例
+_text_normalizer = None
+
+def get_text_normalizer() -> TextNormalizer:
+    """获取文本规范化器实例"""
+    global _text_normalizer
+    if _text_normalizer is None:
+        _text_normalizer = TextNormalizer()
+    return _text_normalizer
 
 
 class SensitiveWordFilter:
     """
     敏感词过滤器
-    采用简单的关键词匹配算法，支持替换和检测
+    使用 Aho-Corasick 自动机匹配：对文本只扫描一次得到全部敏感词及其位置，
+    检测、查找和替换都由这些位置得出，耗时与词库大小无关。
+    敏感词和文本都先经过 TextNormalizer 规范化，全角、大小写、繁体和插入的空格标点不影响匹配，
+    匹配位置映射回原文后替换。
+    每个敏感词有严重程度（SEVERITY_*），没有指定的按 SEVERITY_REVIEW 处理
     """
     
     # 默认敏感词列表（基础版本）
@@ -20,41 +148,66 @@ class SensitiveWordFilter:
         '政治敏感', '反动', '诈骗', '赌博', '毒品',
     ]
     
-    def __init__(self, custom_words: List[str] = None):
+    def __init__(
+        self,
+        custom_words: List[str] = None,
+        normalizer: TextNormalizer = None,
+        severities: Dict[str, int] = None,
+        include_defaults: bool = True,
+    ):
         """
         初始化敏感词过滤器
         
         Args:
             custom_words: 自定义敏感词列表
+            normalizer: 文本规范化器，默认使用全局实例
+            severities: 敏感词 -> 严重程度
+            include_defaults: 是否包含默认敏感词（词库来自数据库时为 False）
         """
-        self.sensitive_words = set(self.DEFAULT_SENSITIVE_WORDS)
+        self.sensitive_words = set(self.DEFAULT_SENSITIVE_WORDS) if include_defaults else set()
         if custom_words:
             self.sensitive_words.update(custom_words)
+        self.severities = dict(severities or {})
+        self.normalizer = normalizer or get_text_normalizer()
             
-        # 编译正则表达式模式
-        self._compile_patterns()
+        # (自动机, 每个自动机词的严重程度)，在第一次匹配时构建，连续修改词库只重建一次
+        self._compiled = None
     
-    def _compile_patterns(self):
-        """编译敏感词正则表达式模式"""
-        # 按长度降序排列，优先匹配更长的词
-        sorted_words = sorted(self.sensitive_words, key=len, reverse=True)
-        
-        # 转义特殊字符并构建模式
-        escaped_words = [re.escape(word) for word in sorted_words]
-        pattern = '|'.join(escaped_words)
-        
-        # 编译不区分大小写的模式
-        self.pattern = re.compile(pattern, re.IGNORECASE) if pattern else None
+    @property
+    def compiled(self) -> Tuple[AhoCorasick, List[int]]:
+        """
+        编译后的词库（词库变化后的第一次匹配时重建）
+
+        自动机由规范化后的敏感词构建，规范化后相同的词取最高的严重程度
+        """
+        compiled = self._compiled
+        if compiled is None:
+            normalize = self.normalizer.normalize
+            levels = {}
+            for word in self.sensitive_words:
+                key = normalize(word)[0]
+                levels[key] = max(levels.get(key, 0), self.severities.get(word, SEVERITY_REVIEW))
+            automaton = AhoCorasick(levels)
+            compiled = self._compiled = (automaton, [levels[word] for word in automaton.words])
+        return compiled
+
+    @property
+    def automaton(self) -> AhoCorasick:
+        """敏感词自动机"""
+        return self.compiled[0]
         
-    def add_words(self, words: List[str]):
+    def add_words(self, words: List[str], severity: int = None):
         """
         添加敏感词
         
         Args:
             words: 要添加的敏感词列表
+            severity: 严重程度，默认为 SEVERITY_REVIEW
         """
         self.sensitive_words.update(words)
-        self._compile_patterns()
+        if severity is not None:
+            self.severities.update(dict.fromkeys(words, severity))
+        self._compiled = None
     
     def remove_words(self, words: List[str]):
         """
@@ -64,7 +217,60 @@ class SensitiveWordFilter:
             words: 要移除的敏感词列表
         """
         self.sensitive_words.difference_update(words)
-        self._compile_patterns()
+        for word in words:
+            self.severities.pop(word, None)
+        self._compiled = None
+
+    def to_state(self) -> Dict:
+        """
+        导出词库和编译好的自动机（可以 JSON 序列化）
+
+        Returns:
+            Dict: from_state() 可以恢复的数据
+        """
+        automaton, levels = self.compiled
+        return {
+            "words": sorted(self.sensitive_words),
+            "severities": self.severities,
+            "automaton": automaton.to_state(),
+            "levels": levels,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict, normalizer: TextNormalizer = None) -> "SensitiveWordFilter":
+        """
+        从 to_state() 的结果恢复过滤器，不需要重新构建自动机
+
+        Args:
+            state: to_state() 的结果
+            normalizer: 文本规范化器，必须与导出时使用的规则相同
+        """
+        word_filter = cls(state["words"], normalizer, state["severities"], include_defaults=False)
+        word_filter._compiled = (AhoCorasick.from_state(state["automaton"]), state["levels"])
+        return word_filter
+    
+    def find_matches(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        扫描一次文本，找出互不重叠的敏感词（同一位置开始的取最长的词）
+        
+        Args:
+            text: 要检查的文本
+            
+        Returns:
+            List[Tuple[int, int, str]]: 按位置排列的 (开始, 结束, 原文中的敏感词)
+        """
+        return [(start, end, text[start:end]) for start, end, _ in self._find(text)]
+
+    def _find(self, text: str) -> List[Tuple[int, int, int]]:
+        """在规范化文本上匹配，返回原文中的 (开始, 结束, 自动机词下标)"""
+        if not text:
+            return []
+        normalized, offsets = self.normalizer.normalize(text)
+        matches = self.automaton.find(normalized)
+        if offsets is not None:
+            # 映射回原文，匹配中间被跳过的分隔字符一并替换
+            matches = [(offsets[start], offsets[end - 1] + 1, index) for start, end, index in matches]
+        return matches
     
     def contains_sensitive_words(self, text: str) -> bool:
         """
@@ -76,9 +282,10 @@ class SensitiveWordFilter:
         Returns:
             bool: 是否包含敏感词
         """
-        if not self.pattern or not text:
+        if not text:
             return False
-        return bool(self.pattern.search(text))
+        # 找到第一个匹配即可返回
+        return next(self.automaton.iter_matches(self.normalizer.normalize(text)[0]), None) is not None
     
     def find_sensitive_words(self, text: str) -> List[str]:
         """
@@ -90,11 +297,7 @@ class SensitiveWordFilter:
         Returns:
             List[str]: 找到的敏感词列表
         """
-        if not self.pattern or not text:
-            return []
-        
-        matches = self.pattern.findall(text)
-        return list(set(matches))  # 去重
+        return list(dict.fromkeys(word for _, _, word in self.find_matches(text)))  # 去重
     
     def filter_text(self, text: str, replacement: str = '***') -> str:
         """
@@ -107,48 +310,68 @@ class SensitiveWordFilter:
         Returns:
             str: 过滤后的文本
         """
-        if not self.pattern or not text:
+        return self.replace_matches(text, self.find_matches(text), replacement)
+    
+    @staticmethod
+    def replace_matches(text: str, matches: List[Tuple[int, int, object]], replacement: str = '***') -> str:
+        """按 find_matches 的位置替换敏感词"""
+        if not matches:
             return text
-        
-        return self.pattern.sub(replacement, text)
+        parts = []
+        position = 0
+        for start, end, _ in matches:
+            parts.append(text[position:start])
+            parts.append(replacement)
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
     
     def get_filter_info(self, text: str) -> Dict:
         """
-        获取文本过滤信息
+        获取文本过滤信息（只扫描一次文本）
         
         Args:
             text: 要分析的文本
             
         Returns:
-            Dict: 包含是否包含敏感词、敏感词列表、过滤后文本等信息
+            Dict: 包含是否包含敏感词、敏感词列表、过滤后文本、敏感词位置、最高严重程度（没有敏感词时为0）等信息
         """
-        result = {
-            'has_sensitive_words': False,
-            'sensitive_words': [],
-            'filtered_text': text,
-            'original_text': text
+        levels = self.compiled[1]
+        matches = self._find(text)
+        return {
+            'has_sensitive_words': bool(matches),
+            'sensitive_words': list(dict.fromkeys(text[start:end] for start, end, _ in matches)),
+            'filtered_text': self.replace_matches(text, matches),
+            'original_text': text,
+            'matches': [(start, end) for start, end, _ in matches],
+            'severity': max((levels[index] for _, _, index in matches), default=0),
         }
-        
-        if self.contains_sensitive_words(text):
-            result['has_sensitive_words'] = True
-            result['sensitive_words'] = self.find_sensitive_words(text)
-            result['filtered_text'] = self.filter_text(text)
-        
-        return result
 
 
 class CommentContentFilter:
     """
     评论内容专用过滤器
     结合敏感词过滤和其他内容检查
+
+    check_content_cached 按内容哈希和词库版本缓存检查结果（进程内 LRU + 共享缓存），
+    刷屏时相同的内容只检查一次；同时按规范化后内容的哈希计数，作为重复内容的信号
     """
     
-    def __init__(self):
-        self.sensitive_word_filter = SensitiveWordFilter()
+    def __init__(self, sensitive_word_filter: SensitiveWordFilter = None):
+        """
+        Args:
+            sensitive_word_filter: 固定使用的敏感词过滤器，默认使用数据库词库的当前版本
+        """
+        self._sensitive_word_filter = sensitive_word_filter
         
         # 其他规则
         self.max_length = getattr(settings, 'COMMENT_MAX_LENGTH', 1000)
         self.min_length = getattr(settings, 'COMMENT_MIN_LENGTH', 1)
+
+        # 检查结果缓存；键包含词库版本，词库更新后旧结果不再被读取，不需要失效通知
+        self.cache_timeout = getattr(settings, 'COMMENT_FILTER_CACHE_TIMEOUT', 600)
+        self._memo = LocalLRUCache(getattr(settings, 'COMMENT_FILTER_MEMO_SIZE', 2000), self.cache_timeout)
+        self._memo.enable()
         
         # 垃圾内容模式
         self.spam_patterns = [
@@ -157,12 +380,92 @@ class CommentContentFilter:
             re.compile(r'[\u4e00-\u9fff]{0,2}[\w\s]*[\u4e00-\u9fff]{0,2}', re.IGNORECASE),  # 混合语言检查
         ]
     
-    def check_content(self, content: str) -> Dict:
+    @property
+    def sensitive_word_filter(self) -> SensitiveWordFilter:
+        """敏感词过滤器（词库更新后自动切换到新版本）"""
+        if self._sensitive_word_filter is not None:
+            return self._sensitive_word_filter
+        from utils.sensitive_words import get_sensitive_word_dictionary
+
+        return get_sensitive_word_dictionary().get_filter()
+
+    @staticmethod
+    def get_content_hash(text: str) -> str:
+        """内容哈希（128位 BLAKE2b）"""
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def record_seen(self, fingerprint: str) -> int:
+        """
+        记录一次内容出现
+
+        Args:
+            fingerprint: 规范化后内容的哈希
+
+        Returns:
+            int: 第一次出现后 cache_timeout 秒内的出现次数（包括本次），缓存不可用时为0
+        """
+        key = f"{settings.CACHE_KEY_PREFIX}:comments:seen:{fingerprint}"
+        for _ in range(2):
+            try:
+                count = cache.incr(key)
+                if count is not None:
+                    return count
+            except ValueError:
+                # 计数不存在
+                pass
+            if cache.add(key, 1, self.cache_timeout):
+                return 1
+        return 0
+
+    def check_content_cached(self, content: str) -> Dict:
+        """
+        带缓存的 check_content
+
+        每次调用都会计数一次（规范化后的内容相同即视为重复，如只差空格、标点或大小写）。
+        检查结果先查进程内 LRU；内容以前出现过时再查共享缓存，
+        共享缓存只保存出现过不止一次的内容，正常评论不会增加额外的读写
+        
+        Args:
+            content: 评论内容
+            
+        Returns:
+            Dict: check_content 的结果，另外包含 seen_count（重复出现的次数）
+        """
+        if self._sensitive_word_filter is not None or not content or not content.strip():
+            return dict(self.check_content(content), seen_count=0)
+
+        from utils.sensitive_words import get_sensitive_word_dictionary
+
+        version, word_filter = get_sensitive_word_dictionary().get_versioned_filter()
+        key = (
+            f"{settings.CACHE_KEY_PREFIX}:comments:filter:{version}:"
+            f"{self.min_length}-{self.max_length}:{self.get_content_hash(content)}"
+        )
+
+        # 进程内条目同时保存规范化后内容的哈希，命中时不需要再规范化
+        found, entry = self._memo.get(key)
+        if found:
+            fingerprint, result = entry
+            seen = self.record_seen(fingerprint)
+        else:
+            fingerprint = self.get_content_hash(word_filter.normalizer.normalize(content)[0])
+            seen = self.record_seen(fingerprint)
+            result = cache.get(key) if seen > 1 else None
+            if result is None:
+                result = self.check_content(content, word_filter)
+                if seen > 1:
+                    cache.set(key, result, self.cache_timeout)
+            self._memo.set(key, (fingerprint, result))
+        # 缓存中的结果被多个请求共用，返回副本
+        return dict(result, issues=list(result['issues']), seen_count=seen)
+
+    def check_content(self, content: str, word_filter: SensitiveWordFilter = None) -> Dict:
         """
         全面检查评论内容
         
         Args:
             content: 评论内容
+            word_filter: 使用的敏感词过滤器，默认为 sensitive_word_filter
             
         Returns:
             Dict: 检查结果
@@ -190,11 +493,15 @@ class CommentContentFilter:
             result['issues'].append(f'评论内容不能超过{self.max_length}个字符')
         
         # 敏感词检查
-        filter_info = self.sensitive_word_filter.get_filter_info(content)
+        filter_info = (word_filter or self.sensitive_word_filter).get_filter_info(content)
         if filter_info['has_sensitive_words']:
-            result['should_auto_approve'] = False
-            result['issues'].append('包含敏感词，需要人工审核')
             result['filtered_content'] = filter_info['filtered_text']
+            if filter_info['severity'] >= SEVERITY_BLOCK:
+                result['is_valid'] = False
+                result['issues'].append('包含禁止发布的内容')
+            elif filter_info['severity'] >= SEVERITY_REVIEW:
+                result['should_auto_approve'] = False
+                result['issues'].append('包含敏感词，需要人工审核')
         
         # 垃圾内容检查
         for pattern in self.spam_patterns[:1]:  # 只检查连续字符，简化版本
@@ -225,6 +532,6 @@ def filter_comment_content(content: str) -> Dict:
         content: 评论内容
         
     Returns:
-        Dict: 过滤结果
+        Dict: 过滤结果，seen_count 为相同内容最近出现的次数
     """
-    return get_comment_filter().check_content(content)
\ No newline at end of file
+    return get_comment_filter().check_content_cached(content)
\ No newline at end of file
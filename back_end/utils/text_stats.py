@@ -0,0 +1,68 @@
+"""
+文章文本统计工具
+计算文章摘要、字数和预计阅读时间，结果在保存文章时写入数据库，
+列表接口直接读取这些列而不需要加载正文
+"""
+
+import math
+import re
+
+# 摘要长度（字符数），与搜索结果的内容摘要保持一致
+EXCERPT_LENGTH = 200
+# 阅读速度：中文每分钟字数、英文每分钟单词数
+CJK_CHARS_PER_MINUTE = 400
+WORDS_PER_MINUTE = 200
+
+CJK_PATTERN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+WORD_PATTERN = re.compile(r"[A-Za-z0-9]+(?:['’\-][A-Za-z0-9]+)*")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def make_excerpt(content: str, length: int = EXCERPT_LENGTH) -> str:
+    """
+    生成文章摘要：合并连续空白后截取前 length 个字符
+
+    Args:
+        content: 文章内容
+        length: 摘要长度
+
+    Returns:
+        str: 摘要，被截断时以 "..." 结尾
+    """
+    text = WHITESPACE_PATTERN.sub(" ", content or "").strip()
+    if len(text) > length:
+        return text[:length] + "..."
+    return text
+
+
+def count_cjk_and_words(content: str):
+    """
+    分别统计中文字符数和英文单词数
+
+    Returns:
+        tuple: (中文字符数, 英文单词/数字数)
+    """
+    content = content or ""
+    return len(CJK_PATTERN.findall(content)), len(WORD_PATTERN.findall(content))
+
+
+def get_content_stats(content: str) -> dict:
+    """
+    计算文章的摘要、字数和预计阅读时间
+
+    字数 = 中文字符数 + 英文单词数；阅读时间按中英文各自的阅读速度估算，
+    有内容时至少为 1 分钟
+
+    Args:
+        content: 文章内容
+
+    Returns:
+        dict: {'excerpt': 摘要, 'word_count': 字数, 'reading_time': 阅读分钟数}
+    """
+    cjk, words = count_cjk_and_words(content)
+    minutes = cjk / CJK_CHARS_PER_MINUTE + words / WORDS_PER_MINUTE
+    return {
+        "excerpt": make_excerpt(content),
+        "word_count": cjk + words,
+        "reading_time": math.ceil(minutes) if cjk or words else 0,
+    }
@@ -0,0 +1,281 @@
+"""
+文章热度（trending）模块
+
+热度分数按时间指数衰减，由访问和评论事件增量更新，保存在 Redis 有序集合中：
+- 不衰减旧分数，而是放大新事件：事件权重乘以 2^((now - epoch) / 半衰期)，
+  有序集合中的相对顺序与"所有分数同时衰减"完全一致，写入只需一次 ZINCRBY
+- 放大倍数过大时以当前时间为新基准整体缩放一次（ZUNIONSTORE WEIGHTS），
+  同时删除已经衰减到可以忽略的文章，集合大小保持有界
+- 读取是 ZREVRANGE 的 O(log n + k) 操作，不需要对已发布文章做 SQL 排序
+- Redis 不可用时退化为数据库查询
+"""
+
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from utils.local_cache import get_local_cache
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingWindow(NamedTuple):
+    """热度窗口：半衰期和统计周期（秒），均为 None 表示不衰减的总热度"""
+
+    half_life: Optional[int]
+    period: Optional[int]
+
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+TRENDING_WINDOWS: Dict[str, TrendingWindow] = {
+    "24h": TrendingWindow(half_life=6 * HOUR, period=DAY),
+    "7d": TrendingWindow(half_life=42 * HOUR, period=7 * DAY),
+    "all": TrendingWindow(half_life=None, period=None),
+}
+DEFAULT_TRENDING_WINDOW = "24h"
+
+# 事件权重：一条评论相当于多少次访问
+VIEW_WEIGHT = 1
+COMMENT_WEIGHT = 5
+
+# 原子地完成"读取基准时间 -> 必要时整体缩放 -> 按放大倍数增加分数"
+# KEYS: 有序集合, 基准时间哈希
+# ARGV: 窗口名, 当前时间, 半衰期, 缩放阈值(指数), 清理阈值, 文章ID1, 权重1, 文章ID2, 权重2, ...
+DECAYED_INCR_SCRIPT = """
+local now = tonumber(ARGV[2])
+local half_life = tonumber(ARGV[3])
+local epoch = tonumber(redis.call('HGET', KEYS[2], ARGV[1]))
+if not epoch then
+    epoch = now
+    redis.call('HSET', KEYS[2], ARGV[1], now)
+end
+local exponent = (now - epoch) / half_life
+if exponent > tonumber(ARGV[4]) then
+    redis.call('ZUNIONSTORE', KEYS[1], 1, KEYS[1], 'WEIGHTS', 2 ^ (-exponent))
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[5])
+    redis.call('HSET', KEYS[2], ARGV[1], now)
+    exponent = 0
+end
+local scale = 2 ^ exponent
+for i = 6, #ARGV, 2 do
+    redis.call('ZINCRBY', KEYS[1], tonumber(ARGV[i + 1]) * scale, ARGV[i])
+end
+return 1
+"""
+
+
+class TrendingEngine:
+    """
+    文章热度引擎
+
+    每个窗口对应一个有序集合 {prefix}:trending:{window}，
+    衰减窗口的基准时间保存在哈希 {prefix}:trending:epoch 中
+    """
+
+    # Redis 故障后暂停访问 Redis 的秒数
+    REDIS_RETRY_INTERVAL = 30
+    # 放大指数超过该值时整体缩放（2^32 远小于浮点数上限，精度也足够）
+    REBASE_EXPONENT = 32
+    # 缩放时删除分数低于该值的文章（相当于不到 1/100 次访问）
+    PRUNE_SCORE = 0.01
+    # 排名在进程内一级缓存中保留的秒数（排名本身是近似值，不需要失效通知）
+    TOP_LOCAL_TIMEOUT = 5
+
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+        self._redis_retry_at = 0.0
+        self._script = None
+
+        prefix = settings.CACHE_KEY_PREFIX
+        self.epoch_key = f"{prefix}:trending:epoch"
+
+    def get_key(self, window: str) -> str:
+        """获取窗口有序集合的键"""
+        return f"{settings.CACHE_KEY_PREFIX}:trending:{window}"
+
+    def _get_redis(self):
+        """
+        获取原生 Redis 连接
+
+        Returns:
+            Redis客户端，不可用时返回 None
+        """
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            from django_redis import get_redis_connection
+
+            return get_redis_connection(self.alias)
+        except Exception:
+            # 非 django_redis 缓存后端（如测试环境的本地内存缓存）
+            return None
+
+    def _mark_redis_down(self, error: Exception):
+        """记录 Redis 故障，在重试间隔内使用数据库查询"""
+        logger.warning(f"热度 Redis 不可用，改用数据库排序: {error}")
+        self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_INTERVAL
+
+    def record_views(self, counts: Dict[int, int]):
+        """
+        记录访问事件（由访问计数写回时批量调用），只统计已发布文章
+
+        Args:
+            counts: 文章ID -> 访问次数
+        """
+        from apps.articles.models import Article
+
+        counts = {int(pk): n for pk, n in counts.items() if n > 0}
+        if not counts:
+            return
+        published = Article.objects.filter(
+            pk__in=list(counts), status=Article.Status.PUBLISHED
+        ).values_list("pk", flat=True)
+        self.record({pk: counts[pk] * VIEW_WEIGHT for pk in published})
+
+    def record_comment(self, article_id: int):
+        """记录一条评论事件"""
+        self.record({int(article_id): COMMENT_WEIGHT})
+
+    def record(self, weights: Dict[int, float], now: Optional[float] = None):
+        """
+        把事件权重累加到所有窗口
+
+        Args:
+            weights: 文章ID -> 事件权重
+            now: 事件时间戳，默认为当前时间
+        """
+        if not weights:
+            return
+        client = self._get_redis()
+        if client is None:
+            return
+
+        now = time.time() if now is None else now
+        items = []
+        for pk, weight in weights.items():
+            items.extend([str(pk), weight])
+
+        try:
+            if self._script is None:
+                self._script = client.register_script(DECAYED_INCR_SCRIPT)
+            pipe = client.pipeline(transaction=False)
+            for window, config in TRENDING_WINDOWS.items():
+                key = self.get_key(window)
+                if config.half_life is None:
+                    for pk, weight in weights.items():
+                        pipe.zincrby(key, weight, str(pk))
+                    continue
+                self._script(
+                    keys=[key, self.epoch_key],
+                    args=[window, now, config.half_life, self.REBASE_EXPONENT, self.PRUNE_SCORE, *items],
+                    client=pipe,
+                )
+            pipe.execute()
+        except Exception as e:
+            self._mark_redis_down(e)
+
+    def remove(self, *article_ids: int):
+        """从所有窗口中移除文章（文章删除或撤回为草稿时调用）"""
+        client = self._get_redis()
+        if client is None or not article_ids:
+            return
+        members = [str(pk) for pk in article_ids]
+        try:
+            pipe = client.pipeline(transaction=False)
+            for window in TRENDING_WINDOWS:
+                pipe.zrem(self.get_key(window), *members)
+            pipe.execute()
+        except Exception as e:
+            self._mark_redis_down(e)
+
+    def top(self, window: str, limit: int) -> Optional[List[int]]:
+        """
+        获取窗口内热度最高的文章ID
+
+        Args:
+            window: 窗口名
+            limit: 数量
+
+        Returns:
+            List[int]: 按热度降序的文章ID，Redis 不可用时返回 None
+        """
+        local_key = f"{self.get_key(window)}:top:{limit}"
+        found, ranked = get_local_cache().get(local_key)
+        if found:
+            return ranked
+
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            members = client.zrevrange(self.get_key(window), 0, limit - 1)
+        except Exception as e:
+            self._mark_redis_down(e)
+            return None
+        ranked = [int(pk) for pk in members]
+        get_local_cache().set(local_key, ranked, timeout=self.TOP_LOCAL_TIMEOUT)
+        return ranked
+
+    def fallback_ids(self, window: str, limit: int, exclude: Iterable[int] = ()) -> List[int]:
+        """
+        用数据库近似计算热度（Redis 不可用或冷启动时补足结果）
+
+        数据库中没有访问时间，因此窗口内的热度近似为：
+        窗口内的评论数 * 评论权重 + 窗口内发布的文章的访问次数
+
+        Args:
+            window: 窗口名
+            limit: 数量
+            exclude: 需要排除的文章ID
+
+        Returns:
+            List[int]: 文章ID
+        """
+        from apps.articles.models import Article
+
+        queryset = Article.objects.filter(status=Article.Status.PUBLISHED).exclude(pk__in=list(exclude))
+        period = TRENDING_WINDOWS[window].period
+        if period is None:
+            queryset = queryset.order_by("-view_count", "-created_at")
+        else:
+            since = timezone.now() - timedelta(seconds=period)
+            queryset = queryset.annotate(
+                trending_score=Count(
+                    "comments",
+                    filter=Q(comments__created_at__gte=since, comments__status="approved"),
+                ) * COMMENT_WEIGHT + Case(
+                    When(created_at__gte=since, then=F("view_count")),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            ).order_by("-trending_score", "-created_at")
+        return list(queryset.values_list("pk", flat=True)[:limit])
+
+    def clear(self):
+        """清空所有窗口（用于测试和数据重置）"""
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            client.delete(self.epoch_key, *[self.get_key(window) for window in TRENDING_WINDOWS])
+        except Exception as e:
+            self._mark_redis_down(e)
+
+
+# 全局热度引擎实例
+_trending_engine = None
+
+
+def get_trending_engine() -> TrendingEngine:
+    """获取热度引擎实例"""
+    global _trending_engine
+    if _trending_engine is None:
+        _trending_engine = TrendingEngine()
+    return _trending_engine
@@ -0,0 +1,433 @@
+"""
+文章访问计数缓冲模块
+
+访问计数采用写后缓冲（write-behind）策略：
+- 读请求只把增量写入 Redis 哈希（Redis 不可用时写入进程内累加器）
+- 后台刷新器按固定间隔把累计增量用一条 CASE 语句批量写回 Article.view_count
+- 详情接口返回 "数据库值 + 待刷新增量"，读路径上不再产生数据库写操作
+- 每次写回后把最新的数据库值记录到 Redis（base），详情缓存命中时无需查询数据库
+- 写回的增量同时计入文章热度（utils.trending）
+"""
+
+import atexit
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+
+from utils.cache import ProtectedCache
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCountBuffer:
+    """
+    访问计数缓冲器
+
+    Redis 中维护三个哈希：
+    - pending: 正在累加的增量
+    - flushing: 刷新过程中从 pending 原子改名得到的快照
+    - base: 最近一次写回后数据库中的 view_count
+    刷新时先 RENAME pending -> flushing，再写数据库，成功后在同一个事务中
+    更新 base 并删除 flushing。读取时 base + pending + flushing 始终等于真实计数，
+    因此缓存中的旧 view_count 在写回之后也不会导致计数倒退。
+    """
+
+    # Redis 故障后暂停访问 Redis 的秒数，避免每次请求都等待连接超时
+    REDIS_RETRY_INTERVAL = 30
+    # 每条 CASE 语句包含的最大文章数
+    FLUSH_BATCH_SIZE = 500
+
+    def __init__(self, alias: str = "default"):
+        self.alias = alias
+        self._local = Counter()
+        self._local_base = {}
+        self._local_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._redis_retry_at = 0.0
+
+        prefix = settings.CACHE_KEY_PREFIX
+        self.pending_key = f"{prefix}:view_count:pending"
+        self.flushing_key = f"{prefix}:view_count:flushing"
+        self.base_key = f"{prefix}:view_count:base"
+        self.lock_key = f"{prefix}:view_count:flush_lock"
+
+    def _get_redis(self):
+        """
+        获取原生 Redis 连接
+
+        Returns:
+            Redis客户端，不可用时返回 None
+        """
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            from django_redis import get_redis_connection
+
+            return get_redis_connection(self.alias)
+        except Exception:
+            # 非 django_redis 缓存后端（如测试环境的本地内存缓存）
+            return None
+
+    def _mark_redis_down(self, error: Exception):
+        """记录 Redis 故障，在重试间隔内改用进程内累加器"""
+        logger.warning(f"访问计数 Redis 不可用，改用进程内累加: {error}")
+        self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_INTERVAL
+
+    def incr(self, article_id: int, amount: int = 1):
+        """
+        增加文章访问计数（只写缓冲，不写数据库）
+
+        Args:
+            article_id: 文章ID
+            amount: 增量
+        """
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.hincrby(self.pending_key, str(article_id), amount)
+                return
+            except Exception as e:
+                self._mark_redis_down(e)
+
+        with self._local_lock:
+            self._local[int(article_id)] += amount
+
+    def incr_and_get(self, article_id: int, db_value: int, amount: int = 1) -> int:
+        """
+        增加访问计数并返回对外展示的访问次数，Redis 可用时只需一次往返
+
+        Args:
+            article_id: 文章ID
+            db_value: 数据库（或缓存快照）中的 view_count
+            amount: 增量
+
+        Returns:
+            int: 访问次数
+        """
+        article_id = int(article_id)
+        client = self._get_redis()
+        if client is not None:
+            field = str(article_id)
+            try:
+                pipe = client.pipeline(transaction=True)
+                pipe.hincrby(self.pending_key, field, amount)
+                pipe.hget(self.flushing_key, field)
+                pipe.hget(self.base_key, field)
+                pending, flushing, base = pipe.execute()
+            except Exception as e:
+                self._mark_redis_down(e)
+            else:
+                with self._local_lock:
+                    local_pending = self._local.get(article_id, 0)
+                    local_base = self._local_base.get(article_id, db_value)
+                base = local_base if base is None else int(base)
+                return base + local_pending + int(pending) + int(flushing or 0)
+
+        with self._local_lock:
+            self._local[article_id] += amount
+        return self.get_view_count(article_id, db_value)
+
+    def get_pending(self, article_id: int) -> int:
+        """
+        获取文章尚未写回数据库的访问增量
+
+        Args:
+            article_id: 文章ID
+
+        Returns:
+            int: 待刷新增量
+        """
+        return self.get_pending_many([article_id]).get(int(article_id), 0)
+
+    def get_pending_many(self, article_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        批量获取待刷新增量
+
+        Args:
+            article_ids: 文章ID列表
+
+        Returns:
+            Dict[int, int]: 文章ID -> 待刷新增量
+        """
+        return self._read(article_ids)[0]
+
+    def get_view_count(self, article_id: int, db_value: int) -> int:
+        """
+        获取对外展示的访问次数：数据库值 + 待刷新增量
+
+        最近一次写回时记录的 base 优先于传入的 db_value，
+        因此 db_value 可以来自缓存中的旧快照
+
+        Args:
+            article_id: 文章ID
+            db_value: 数据库（或缓存快照）中的 view_count
+
+        Returns:
+            int: 访问次数
+        """
+        article_id = int(article_id)
+        pending, base = self._read([article_id])
+        return base.get(article_id, db_value) + pending[article_id]
+
+    def _read(self, article_ids: Iterable[int]):
+        """
+        一次读取待刷新增量和写回基准值
+
+        Returns:
+            tuple: (待刷新增量字典, 基准值字典)
+        """
+        ids = [int(article_id) for article_id in article_ids]
+        with self._local_lock:
+            pending = {article_id: self._local.get(article_id, 0) for article_id in ids}
+            base = {article_id: self._local_base[article_id] for article_id in ids if article_id in self._local_base}
+
+        client = self._get_redis()
+        if client is not None and ids:
+            fields = [str(article_id) for article_id in ids]
+            try:
+                pipe = client.pipeline(transaction=True)
+                pipe.hmget(self.pending_key, fields)
+                pipe.hmget(self.flushing_key, fields)
+                pipe.hmget(self.base_key, fields)
+                pending_values, flushing_values, base_values = pipe.execute()
+                for article_id, a, b, c in zip(ids, pending_values, flushing_values, base_values):
+                    pending[article_id] += int(a or 0) + int(b or 0)
+                    if c is not None:
+                        base[article_id] = int(c)
+            except Exception as e:
+                self._mark_redis_down(e)
+
+        return pending, base
+
+    def flush(self) -> int:
+        """
+        把缓冲的访问增量批量写回数据库
+
+        Returns:
+            int: 本次写回的访问次数总和
+        """
+        with self._flush_lock:
+            with self._local_lock:
+                local_deltas = dict(self._local)
+                self._local.clear()
+
+            client, lock_token, redis_deltas = self._take_redis_snapshot()
+
+            deltas = Counter(local_deltas)
+            deltas.update(redis_deltas)
+            deltas = {pk: n for pk, n in deltas.items() if n > 0}
+
+            try:
+                bases = self._apply(deltas)
+            except Exception:
+                logger.exception("写回文章访问计数失败，增量将在下次刷新时重试")
+                # 本地增量放回累加器；Redis 快照保留在 flushing 键中，下次刷新会继续处理
+                with self._local_lock:
+                    self._local.update(local_deltas)
+                self._release_redis_snapshot(client, lock_token, None)
+                raise
+
+            with self._local_lock:
+                self._local_base.update(bases)
+            self._release_redis_snapshot(client, lock_token, bases)
+            self._record_trending(deltas)
+            return sum(deltas.values())
+
+    def _record_trending(self, deltas: Dict[int, int]):
+        """把写回的访问增量计入文章热度，失败不影响计数本身"""
+        from utils.trending import get_trending_engine
+
+        try:
+            get_trending_engine().record_views(deltas)
+        except Exception:
+            logger.exception("更新文章热度失败")
+
+    def _take_redis_snapshot(self):
+        """
+        获取刷新锁并把 pending 原子改名为 flushing
+
+        Returns:
+            tuple: (redis客户端, 锁令牌, 增量字典)
+        """
+        client = self._get_redis()
+        if client is None:
+            return None, None, {}
+
+        token = uuid.uuid4().hex
+        try:
+            # 多进程同时刷新时只有一个能拿到锁
+            if not client.set(self.lock_key, token, nx=True, ex=60):
+                return None, None, {}
+            # 上次刷新中途失败会遗留 flushing 快照，优先处理它
+            if not client.exists(self.flushing_key):
+                if not client.exists(self.pending_key):
+                    client.delete(self.lock_key)
+                    return None, None, {}
+                client.rename(self.pending_key, self.flushing_key)
+            raw = client.hgetall(self.flushing_key)
+        except Exception as e:
+            self._mark_redis_down(e)
+            return None, None, {}
+
+        return client, token, {int(pk): int(n) for pk, n in raw.items()}
+
+    def _release_redis_snapshot(self, client, token, bases):
+        """
+        删除已写回的 flushing 快照、记录新的基准值并释放刷新锁
+
+        Args:
+            bases: 写回后的 文章ID -> view_count；写回失败时为 None
+        """
+        if client is None:
+            return
+        try:
+            if bases is not None:
+                pipe = client.pipeline(transaction=True)
+                if bases:
+                    pipe.hset(self.base_key, mapping={str(pk): n for pk, n in bases.items()})
+                    # 基准值至少要比任何详情缓存（包括过期后作为旧值使用的宽限期）活得久
+                    pipe.expire(
+                        self.base_key,
+                        settings.CACHE_TIMEOUT.get('article_detail', 1800) + ProtectedCache.STALE_GRACE,
+                    )
+                pipe.delete(self.flushing_key)
+                pipe.execute()
+            if client.get(self.lock_key) == token:
+                client.delete(self.lock_key)
+        except Exception as e:
+            self._mark_redis_down(e)
+
+    def _apply(self, deltas: Dict[int, int]) -> Dict[int, int]:
+        """
+        用 CASE 语句批量更新 view_count
+
+        UPDATE articles_article
+        SET view_count = view_count + CASE id WHEN 1 THEN 3 WHEN 2 THEN 5 ... END
+        WHERE id IN (1, 2, ...)
+
+        Returns:
+            Dict[int, int]: 写回后的 文章ID -> view_count
+        """
+        if not deltas:
+            return {}
+
+        from apps.articles.models import Article
+
+        items = sorted(deltas.items())
+        bases = {}
+        with transaction.atomic():
+            for start in range(0, len(items), self.FLUSH_BATCH_SIZE):
+                batch = items[start:start + self.FLUSH_BATCH_SIZE]
+                increment = Case(
+                    *[When(pk=pk, then=Value(n)) for pk, n in batch],
+                    default=Value(0),
+                    output_field=PositiveIntegerField(),
+                )
+                batch_ids = [pk for pk, _ in batch]
+                Article.objects.filter(pk__in=batch_ids).update(
+                    view_count=F("view_count") + increment
+                )
+                bases.update(
+                    Article.objects.filter(pk__in=batch_ids).values_list("pk", "view_count")
+                )
+        return bases
+
+    def clear(self):
+        """丢弃所有未写回的增量（用于测试和数据重置）"""
+        with self._local_lock:
+            self._local.clear()
+            self._local_base.clear()
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.delete(self.pending_key, self.flushing_key, self.base_key)
+            except Exception as e:
+                self._mark_redis_down(e)
+
+
+class ViewCountFlusher(threading.Thread):
+    """
+    访问计数后台刷新线程
+
+    按 VIEW_COUNT_FLUSH_INTERVAL 间隔调用 ViewCountBuffer.flush()
+    """
+
+    def __init__(self, buffer: ViewCountBuffer, interval: float):
+        super().__init__(name="view-count-flusher", daemon=True)
+        self.buffer = buffer
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        from django.db import close_old_connections
+
+        while not self._stopped.wait(self.interval):
+            try:
+                self.buffer.flush()
+            except Exception:
+                # flush() 已记录日志，线程继续运行
+                pass
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self._stopped.set()
+
+
+# 全局缓冲器实例
+_view_count_buffer = None
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def get_view_count_buffer() -> ViewCountBuffer:
+    """获取访问计数缓冲器实例"""
+    global _view_count_buffer
+    if _view_count_buffer is None:
+        _view_count_buffer = ViewCountBuffer()
+    return _view_count_buffer
+
+
+def flush_view_counts() -> int:
+    """
+    快捷函数：立即把缓冲的访问计数写回数据库
+
+    Returns:
+        int: 写回的访问次数总和
+    """
+    return get_view_count_buffer().flush()
+
+
+def start_view_count_flusher():
+    """
+    启动访问计数后台刷新线程
+
+    由 WSGI/ASGI 入口调用，每个服务进程启动一个；间隔为 0 时不启动，
+    此时需要通过 `manage.py flush_view_counts --loop` 或定时任务刷新
+    """
+    global _flusher
+    interval = getattr(settings, "VIEW_COUNT_FLUSH_INTERVAL", 10)
+    if interval <= 0:
+        return None
+
+    with _flusher_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = ViewCountFlusher(get_view_count_buffer(), interval)
+            _flusher.start()
+            # 进程退出前写回进程内累加的增量
+            atexit.register(_flush_at_exit)
+    return _flusher
+
+
+def _flush_at_exit():
+    try:
+        flush_view_counts()
+    except Exception:
+        pass
@@ -8,7 +8,7 @@ export async function GET(request: NextRequest) {
     const { searchParams } = new URL(request.url)
     const query = searchParams.get('q')
     const type = searchParams.get('type') || 'all'
-    const ordering = searchParams.get('ordering') || '-created_at'
+    const ordering = searchParams.get('ordering') || 'relevance'
     const page = searchParams.get('page') || '1'
 
     // 验证必需的搜索参数
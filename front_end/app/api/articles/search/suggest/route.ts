@@ -0,0 +1,40 @@
+import { NextRequest, NextResponse } from 'next/server'
+
+const BACKEND_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api'
+
+export async function GET(request: NextRequest) {
+  try {
+    const { searchParams } = new URL(request.url)
+    const query = searchParams.get('q') || ''
+    const limit = searchParams.get('limit') || '8'
+
+    if (!query.trim()) {
+      return NextResponse.json({ query, suggestions: [] })
+    }
+
+    // 代理请求到后端搜索建议API
+    const backendSearchParams = new URLSearchParams({ q: query, limit })
+    const response = await fetch(`${BACKEND_URL}/articles/search/suggest/?${backendSearchParams.toString()}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+    })
+
+    if (!response.ok) {
+      return NextResponse.json(
+        { error: `搜索建议请求失败: ${response.status}` },
+        { status: response.status }
+      )
+    }
+
+    const data = await response.json()
+    return NextResponse.json(data)
+  } catch (error) {
+    console.error('搜索建议API代理错误:', error)
+    return NextResponse.json(
+      { error: '搜索建议服务暂时不可用' },
+      { status: 500 }
+    )
+  }
+}
@@ -10,7 +10,7 @@ function SearchPageContent() {
   const searchParams = useSearchParams()
   const query = searchParams.get('q') || ''
   const type = searchParams.get('type') || 'all'
-  const ordering = searchParams.get('ordering') || '-created_at'
+  const ordering = searchParams.get('ordering') || 'relevance'
 
   return (
     <div className="container mx-auto px-4 py-8 space-y-8">
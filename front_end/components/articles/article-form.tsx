@@ -32,7 +32,7 @@ export default function ArticleForm({ article, formType }: ArticleFormProps) {
   useEffect(() => {
     if (article) {
       setTitle(article.title)
-      setContent(article.content)
+      setContent(article.content ?? "")
       // 将后端的英文状态转换为前端的中文状态
       setStatus(article.status === "draft" ? "草稿" : "发布")
     }
@@ -10,7 +10,7 @@ interface ArticleItemProps {
 }
 
 export default function ArticleItem({ article }: ArticleItemProps) {
-  const summary = article.content.split("\n\n")[0].substring(0, 150) + "..." // Simple summary
+  const summary = article.excerpt ?? (article.content ?? "").split("\n\n")[0].substring(0, 150) + "..." // Simple summary
 
   return (
     <Card className="w-full hover:shadow-lg transition-shadow duration-200">
@@ -191,7 +191,7 @@ export default function ArticleStats({ userId }: ArticleStatsProps) {
                 </span>
               </div>
               <p className="text-sm text-muted-foreground line-clamp-2">
-                {stats.mostPopularArticle.content.substring(0, 100)}...
+                {(stats.mostPopularArticle.excerpt ?? stats.mostPopularArticle.content ?? "").substring(0, 100)}...
               </p>
             </div>
           </CardContent>
@@ -2,7 +2,7 @@
 
 import { useState, useRef, useEffect } from "react"
 import { useRouter } from "next/navigation"
-import { Search, X } from "lucide-react"
+import { FileText, Search, User, X } from "lucide-react"
 import { Input } from "@/components/ui/input"
 import { Button } from "@/components/ui/button"
 import {
@@ -18,6 +18,11 @@ import {
   PopoverContent,
   PopoverTrigger,
 } from "@/components/ui/popover"
+import api from "@/lib/api"
+import type { SearchSuggestion } from "@/lib/types"
+
+// 输入停顿多久后请求搜索建议（毫秒）
+const SUGGEST_DEBOUNCE_MS = 150
 
 interface SearchBoxProps {
   placeholder?: string
@@ -33,9 +38,34 @@ export default function SearchBox({
   const [query, setQuery] = useState("")
   const [isOpen, setIsOpen] = useState(false)
   const [suggestions, setSuggestions] = useState<string[]>([])
+  const [remoteSuggestions, setRemoteSuggestions] = useState<SearchSuggestion[]>([])
   const router = useRouter()
   const inputRef = useRef<HTMLInputElement>(null)
 
+  // 输入联想：停顿后再请求，只保留最后一次请求的结果
+  useEffect(() => {
+    const trimmedQuery = query.trim()
+    if (!showSuggestions || !isOpen || !trimmedQuery) {
+      setRemoteSuggestions([])
+      return
+    }
+
+    let cancelled = false
+    const timer = setTimeout(async () => {
+      try {
+        const data = await api.suggestSearch(trimmedQuery)
+        if (!cancelled) setRemoteSuggestions(data.suggestions)
+      } catch (error) {
+        if (!cancelled) setRemoteSuggestions([])
+      }
+    }, SUGGEST_DEBOUNCE_MS)
+
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+    }
+  }, [query, isOpen, showSuggestions])
+
   // 从localStorage获取搜索历史
   useEffect(() => {
     if (typeof window !== 'undefined') {
@@ -86,6 +116,16 @@ export default function SearchBox({
     }
   }
 
+  const handleSuggestionSelect = (suggestion: SearchSuggestion) => {
+    // 文章标题直接打开文章，其他建议作为关键词搜索
+    if (suggestion.type === 'title' && suggestion.article_id) {
+      router.push(`/articles/${suggestion.article_id}`)
+      setIsOpen(false)
+      return
+    }
+    handleSearch(suggestion.text)
+  }
+
   const clearSearchHistory = () => {
     if (typeof window !== 'undefined') {
       localStorage.removeItem('searchHistory')
@@ -141,6 +181,27 @@ export default function SearchBox({
                 onValueChange={setQuery}
               />
               <CommandList>
+                {remoteSuggestions.length > 0 && (
+                  <CommandGroup heading="搜索建议">
+                    {remoteSuggestions.map((suggestion) => (
+                      <CommandItem
+                        key={`${suggestion.type}-${suggestion.article_id ?? suggestion.text}`}
+                        value={`${suggestion.type}-${suggestion.article_id ?? ''}-${suggestion.text}`}
+                        onSelect={() => handleSuggestionSelect(suggestion)}
+                        className="cursor-pointer"
+                      >
+                        {suggestion.type === 'title' ? (
+                          <FileText className="mr-2 h-4 w-4" />
+                        ) : suggestion.type === 'author' ? (
+                          <User className="mr-2 h-4 w-4" />
+                        ) : (
+                          <Search className="mr-2 h-4 w-4" />
+                        )}
+                        {suggestion.text}
+                      </CommandItem>
+                    ))}
+                  </CommandGroup>
+                )}
                 {suggestions.length > 0 ? (
                   <CommandGroup heading="搜索历史">
                     {suggestions.map((suggestion, index) => (
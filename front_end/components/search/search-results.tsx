@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState, useEffect, type ReactNode } from "react"
 import Link from "next/link"
 import { formatDistanceToNow } from "date-fns"
 import { zhCN } from "date-fns/locale"
@@ -11,7 +11,7 @@ import { Button } from "@/components/ui/button"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
 import { Alert, AlertDescription } from "@/components/ui/alert"
 import api from "@/lib/api"
-import type { Article, SearchParams, SearchResponse } from "@/lib/types"
+import type { HighlightRange, SearchParams, SearchResponse, SearchResult } from "@/lib/types"
 
 interface SearchResultsProps {
   initialQuery: string
@@ -24,7 +24,7 @@ export default function SearchResults({
   initialType = "all", 
   initialOrdering = "-created_at" 
 }: SearchResultsProps) {
-  const [results, setResults] = useState<Article[]>([])
+  const [results, setResults] = useState<SearchResult[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
   const [searchInfo, setSearchInfo] = useState<any>(null)
@@ -87,19 +87,21 @@ export default function SearchResults({
     setCurrentPage(1) // 重置到第一页
   }
 
-  const highlightText = (text: string, query: string) => {
-    if (!query.trim()) return text
-    
-    const regex = new RegExp(`(${query.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')})`, 'gi')
-    const parts = text.split(regex)
-    
-    return parts.map((part, index) => 
-      regex.test(part) ? (
+  // 按后端返回的关键词位置高亮（与搜索使用相同的分词和查询语法）
+  const highlightText = (text: string, ranges: HighlightRange[] = []) => {
+    const parts: ReactNode[] = []
+    let position = 0
+    ranges.forEach(([start, end], index) => {
+      parts.push(text.slice(position, start))
+      parts.push(
         <mark key={index} className="bg-yellow-200 dark:bg-yellow-800 px-1 rounded">
-          {part}
+          {text.slice(start, end)}
         </mark>
-      ) : part
-    )
+      )
+      position = end
+    })
+    parts.push(text.slice(position))
+    return parts
   }
 
   if (loading) {
@@ -171,6 +173,7 @@ export default function SearchResults({
               <SelectValue />
             </SelectTrigger>
             <SelectContent>
+              <SelectItem value="relevance">最相关</SelectItem>
               <SelectItem value="-created_at">最新</SelectItem>
               <SelectItem value="created_at">最早</SelectItem>
               <SelectItem value="-view_count">最热门</SelectItem>
@@ -204,12 +207,12 @@ export default function SearchResults({
                       href={`/articles/${article.id}`}
                       className="text-xl font-semibold hover:text-primary transition-colors"
                     >
-                      {highlightText(article.title, initialQuery)}
+                      {highlightText(article.title, article.highlights?.title)}
                     </Link>
                     <div className="flex items-center gap-4 text-sm text-muted-foreground">
                       <div className="flex items-center gap-1">
                         <User className="h-3 w-3" />
-                        {highlightText(article.author?.username || "", initialQuery)}
+                        {highlightText(article.author?.username || "", article.highlights?.author)}
                       </div>
                       <div className="flex items-center gap-1">
                         <Calendar className="h-3 w-3" />
@@ -231,12 +234,7 @@ export default function SearchResults({
               </CardHeader>
               <CardContent>
                 <p className="text-muted-foreground line-clamp-3">
-                  {highlightText(
-                    article.content && article.content.length > 200
-                      ? article.content.substring(0, 200) + "..."
-                      : article.content || "",
-                    initialQuery
-                  )}
+                  {highlightText(article.content_summary || "", article.highlights?.content_summary)}
                 </p>
               </CardContent>
             </Card>
@@ -9,7 +9,8 @@ import type {
   EmailVerificationResponse,
   AvatarUploadResponse,
   SearchParams,
-  SearchResponse
+  SearchResponse,
+  SearchSuggestResponse
 } from './types'
 
 const API_BASE_URL = '/api'
@@ -254,6 +255,11 @@ class ApiService {
     return this.request(`/articles/search/?${searchParams.toString()}`)
   }
 
+  async suggestSearch(query: string, limit: number = 8): Promise<SearchSuggestResponse> {
+    const searchParams = new URLSearchParams({ q: query, limit: limit.toString() })
+    return this.request(`/articles/search/suggest/?${searchParams.toString()}`)
+  }
+
   // 评论相关
   async getComments(articleId: string): Promise<Comment[]> {
     return this.request(`/articles/${articleId}/comments/`)
@@ -14,12 +14,15 @@ export interface User {
 export interface Article {
   id: number
   title: string
-  content: string
+  content?: string // 列表接口不返回正文，只返回 excerpt
+  excerpt?: string // 文章摘要
   author: User
   created_at: string
   updated_at: string
   status: "draft" | "published" // 后端返回的是英文状态
   view_count: number // 文章访问次数
+  word_count?: number // 字数
+  reading_time?: number // 预计阅读分钟数
 }
 
 // 评论类型定义
@@ -100,7 +103,7 @@ export interface AvatarUploadResponse {
 export interface SearchParams {
   q: string // 搜索关键词
   type?: 'all' | 'title' | 'content' | 'author' // 搜索类型
-  ordering?: '-created_at' | 'created_at' | '-view_count' | 'view_count' | 'title' | '-title' // 排序方式
+  ordering?: 'relevance' | '-created_at' | 'created_at' | '-view_count' | 'view_count' | 'title' | '-title' // 排序方式
   page?: number // 页码
 }
 
@@ -111,16 +114,34 @@ export interface SearchInfo {
   total_results: number
 }
 
+// 关键词位置：[开始, 结束]，相对于对应字段的文本
+export type HighlightRange = [number, number]
+
+export interface SearchResult extends Omit<Article, "content" | "excerpt" | "updated_at"> {
+  content_summary: string // 正文中关键词最密集的片段
+  highlights: {
+    title: HighlightRange[]
+    content_summary: HighlightRange[]
+    author: HighlightRange[]
+  }
+}
+
 export interface SearchResponse {
   count: number
   next: string | null
   previous: string | null
-  results: Article[]
+  results: SearchResult[]
   search_info: SearchInfo
 }
 
-// 搜索建议类型
+// 搜索建议类型（title/author/query 来自后端的输入联想）
 export interface SearchSuggestion {
   text: string
-  type: 'recent' | 'popular' | 'suggestion'
+  type: 'recent' | 'popular' | 'suggestion' | 'title' | 'author' | 'query'
+  article_id?: number | null
+}
+
+export interface SearchSuggestResponse {
+  query: string
+  suggestions: SearchSuggestion[]
 }